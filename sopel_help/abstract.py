@@ -0,0 +1,490 @@
+"""Abstract help providers."""
+from sopel.tools import get_logger
+
+from sopel_help import aio, mixins, outbound, replies
+from sopel_help.errors import UnknownCommand
+
+LOGGER = get_logger('help')
+
+
+class AbstractProvider:
+    """Help provider abstraction.
+
+    A provider must implement these methods to be used as an Help Provider:
+
+    * :meth:`help_commands`: provide a list of all commands
+    * :meth:`help_command`: provide help for one command
+    """
+    manager = None
+    """The :class:`~sopel_help.managers.Manager` of this provider.
+
+    The manager sets this attribute before the provider's :meth:`setup` and
+    :meth:`configure` stages.
+    """
+    settings = None
+    """Snapshot of the help settings, as a
+    :class:`~sopel_help.settings.HelpSettings`.
+
+    The manager sets this attribute before the provider's :meth:`setup`
+    stage, and replaces it when the settings are refreshed.
+    """
+
+    def get_settings(self, bot):
+        """Get the help settings.
+
+        :param bot: Sopel bot
+        :return: the snapshot of the settings (see :attr:`settings`), or the
+                 bot's help section if there is none
+
+        The snapshot's values are parsed only once, unlike the bot's help
+        section which parses them each time they are read.
+        """
+        settings = self.settings
+        if settings is None:
+            # the provider wasn't set up by a manager
+            return bot.settings.help
+        return settings
+
+    def setup(self, bot):
+        """Setup the provider with the bot's settings.
+
+        This will be called at the plugin's setup stage. This can be used to
+        store settings, declare custom sections, and so on.
+
+        By default this a no-op method.
+        """
+
+    def configure(self, settings):
+        """Configure the bot's settings for this provider.
+
+        By default this a no-op method.
+        """
+
+    def refresh_content(self, bot):
+        """Refresh the provider's content in the background.
+
+        This is called periodically by the plugin, outside of any help
+        command, so the provider can prepare its content ahead of time.
+
+        By default this a no-op method.
+        """
+
+    def pin_help_commands(self, bot, commands):
+        """Pre-render the help of the most requested ``commands``.
+
+        This is called periodically by the manager, with the commands from
+        its :class:`~sopel_help.stats.HelpStats`.
+
+        By default this a no-op method.
+        """
+
+    def help_commands(self, bot, trigger):
+        """Handle triggered command to generate help for all commands."""
+        raise NotImplementedError
+
+    async def help_commands_async(self, bot, trigger):
+        """Coroutine version of :meth:`help_commands`.
+
+        This is run on the manager's event loop (see
+        :class:`~sopel_help.aio.EventLoopThread`). By default,
+        :meth:`help_commands` runs in the loop's pool of threads that send
+        messages (see :attr:`~sopel_help.aio.EventLoopThread.reply_executor`):
+        neither its replies nor its generation of the help run on the loop.
+        """
+        executor = None
+        if self.manager is not None:
+            executor = self.manager.loop.reply_executor
+        await aio.run_blocking(
+            self.help_commands, bot, trigger, executor=executor)
+
+    def help_command(self, bot, trigger, name):
+        """Handle triggered command to generate help for one command.
+
+        :return: the name of the command whose help was sent (its own name,
+                 even when asked for by an alias), or ``None`` when it was
+                 something else (such as a category)
+        :raise UnknownCommand: when there is no such command
+
+        Only the commands returned are counted in the manager's
+        :class:`~sopel_help.stats.HelpStats`.
+        """
+        raise NotImplementedError
+
+    def help_command_batch(self, bot, trigger, names):
+        """Handle triggered command to generate help for several commands.
+
+        :param list names: names of the commands, without duplicates
+        :return: a 2-value tuple with (commands found, unknown names)
+        :rtype: tuple
+
+        By default, this calls :meth:`help_command` for each of the first
+        ``help.batch_limit`` names, and tells the user about the unknown
+        ones. Providers can override it to send one reply for all of them.
+        """
+        found = []
+        unknown = []
+        for name in names[:max(1, self.get_settings(bot).batch_limit)]:
+            try:
+                command = self.help_command(bot, trigger, name)
+            except UnknownCommand as error:
+                unknown.append(name)
+                bot.reply(str(error))
+            else:
+                if command is not None:
+                    found.append(command)
+
+        return found, unknown
+
+
+class AbstractGeneratedProvider(mixins.PrivilegeViewsMixin,
+                                AbstractProvider):
+    """Help provider that generate help content for the user on the fly.
+
+    This abstract provider implements a workflow for the list of commands and
+    the help for one command. Subclasses must implement these methods:
+
+    * :meth:`generate_help_commands`: generate lines of help message from
+      command groups
+    * :meth:`send_help_commands`: send the lines of help to the user
+    * :meth:`generate_help_command`: generate a header, a list of body lines,
+      and a list of usage lines for one command
+    * :meth:`generate_help_category`: generate lines of help for one category
+    * :meth:`generate_help_batch`: generate one line of help per command
+
+    This abstract provider already implements the :meth:`send_help_command`
+    that sends the head/body/usage to the user.
+
+    With ``help.privilege_filter`` enabled (the default), the list of
+    commands depends on the user's privilege tier (see
+    :class:`~sopel_help.mixins.PrivilegeViewsMixin`).
+
+    The help of the most requested commands is pre-rendered (see
+    :meth:`pin_help_commands`).
+    """
+    def __init__(self):
+        super().__init__()
+        self.pinned_replies = replies.PinnedReplies()
+
+    def generate_help_commands(self, command_groups):
+        """Generate help messages for a set of commands.
+
+        :param dict command_groups: map of (category, commands)
+        :return: generator of help data for each command group
+        """
+        raise NotImplementedError
+
+    def send_help_commands(self, bot, trigger, lines):
+        """Reply to the user with the help for all commands.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param list lines: lines of help
+        """
+        raise NotImplementedError
+
+    def generate_help_command(self, command, docs, examples):
+        """Generate help message with head, body, and usage examples.
+
+        :param str command: command name, all lower-case
+        :param list docs: list of documentation line for this ``command``
+        :param list examples: list of examples for this ``command``
+        :return: a 3-value tuple with (head, body, usages)
+        """
+        raise NotImplementedError
+
+    def generate_help_category(self, command_groups, category):
+        """Generate help lines for one category of commands.
+
+        :param dict command_groups: map of (category, commands)
+        :param str category: name of the category (case-insensitive)
+        :return: the lines of help, or ``None`` if there is no such category
+        """
+        raise NotImplementedError
+
+    def generate_help_batch(self, names, heads, ignored):
+        """Generate one line of help per command of a batch.
+
+        :param list names: names of the commands, in order
+        :param dict heads: map of (command, head of its help)
+        :param list ignored: names ignored, over the batch's limit
+        :return: list of entries
+        """
+        raise NotImplementedError
+
+    def send_help_command(self, bot, trigger, command, head, body, usages):
+        """Reply to the user with the help for one command.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param str head: head message for this command
+        :param list body: body lines
+        :param list usages: usage lines
+        """
+        lines = [head] + [line for line in body + usages if line]
+        self.send_help_lines(bot, trigger, 'command %s' % command, lines)
+
+    def send_help_lines(self, bot, trigger, subject, lines):
+        """Reply to the user with lines of help, as a whole.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param str subject: subject of the help, such as ``category FUN``
+        :param list lines: lines of help
+
+        The lines go where :meth:`get_help_route` says: with the
+        :meth:`get_reply_method`, in a private message, or as a link (see
+        :meth:`publish_help_lines`). When they can't be published, they are
+        sent in a private message anyway.
+
+        When the bot is backed up (see :meth:`is_backed_up`), several lines
+        are published instead, or only the first one is sent: this downgrade
+        is logged and counted (see :meth:`record_downgrade`).
+        """
+        reply, recipient = self.get_reply_method(bot, trigger)
+        route = self.get_help_route(bot, trigger, lines)
+        degraded = (
+            route != replies.LINK and len(lines) > 1 and
+            self.is_backed_up(bot))
+
+        if route == replies.LINK or degraded:
+            # subclasses that publish content return a URL
+            # pylint: disable=assignment-from-none
+            url = self.publish_help_lines(bot, trigger, subject, lines)
+            if url:
+                if degraded:
+                    self.record_downgrade(bot, outbound.LINK, subject)
+                reply("I've published the help for %s at: %s" % (subject, url),
+                      recipient)
+                return
+            route = replies.PRIVATE
+
+        if degraded:
+            self.record_downgrade(bot, outbound.SHORT_REPLY, subject)
+            lines = lines[:1] + [
+                "I'm busy right now; ask me again later for the rest of "
+                "the help for %s." % subject]
+        elif route == replies.PRIVATE and recipient != trigger.nick:
+            reply(
+                "The help for %s is too long; "
+                "I'm sending it to you in a private message." % subject)
+            reply = bot.say
+            recipient = trigger.nick
+
+        head, *body = lines
+        reply(head, recipient)
+        for line in body:
+            bot.say(line, recipient)
+
+    def is_backed_up(self, bot):
+        """Tell if the bot is backed up with messages to send.
+
+        :param bot: Sopel bot
+        :rtype: bool
+
+        The bot is backed up when it has sent ``help.backlog_threshold``
+        messages or more in the last seconds (see
+        :func:`sopel_help.outbound.get_backlog`).
+        """
+        threshold = self.get_settings(bot).backlog_threshold
+        return 0 < threshold <= outbound.get_backlog(bot)
+
+    def record_downgrade(self, bot, mode, subject):
+        """Log and count a help reply sent in a degraded ``mode``.
+
+        :param bot: Sopel bot
+        :param str mode: one of :data:`sopel_help.outbound.MODES`
+        :param str subject: subject of the help, such as ``command help``
+
+        The downgrade is counted in the manager's
+        :class:`~sopel_help.stats.HelpStats`, if any.
+        """
+        LOGGER.info(
+            'Help for %s sent as %s: %d messages sent recently',
+            subject, mode, outbound.get_backlog(bot))
+        if self.manager is not None:
+            self.manager.stats.record_downgrade(mode)
+
+    def get_help_route(self, bot, trigger, lines):
+        """Choose the route of lines of help, from their size.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param list lines: lines of help
+        :return: one of :data:`sopel_help.replies.ROUTES`
+        :rtype: str
+
+        In a channel, the lines are sent with the reply method if they fit in
+        ``help.channel_max_bytes``, in no more than ``help.line_threshold``
+        messages. Otherwise, they are sent in a private message if they fit
+        in ``help.private_max_bytes``, or as a link.
+        """
+        settings = self.get_settings(bot)
+        size = replies.measure_reply(lines)
+        _, recipient = self.get_reply_method(bot, trigger)
+
+        if recipient != trigger.nick:
+            fits_channel = (
+                size.messages <= settings.line_threshold and
+                replies.fits_budget(size.size, settings.channel_max_bytes))
+            if fits_channel:
+                return replies.REPLY
+        if replies.fits_budget(size.size, settings.private_max_bytes):
+            return replies.PRIVATE
+        return replies.LINK
+
+    def publish_help_lines(self, bot, trigger, subject, lines):
+        """Publish lines of help that are too long to be sent.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param str subject: subject of the help, such as ``command help``
+        :param list lines: lines of help
+        :return: the URL of the published lines, or ``None``
+        :rtype: str
+
+        By default, nothing is published: the lines are sent in a private
+        message instead.
+        """
+        # pylint: disable=unused-argument
+        return None
+
+    def get_reply_method(self, bot, trigger):
+        """Define the reply method and its recipient.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        """
+        reply = bot.reply
+        recipient = trigger.sender
+        reply_method = self.get_settings(bot).reply_method
+
+        if trigger.is_privmsg or reply_method == 'query':
+            reply = bot.say
+            recipient = trigger.nick
+        elif reply_method == 'notice':
+            reply = bot.notice
+            recipient = trigger.nick
+
+        return reply, recipient
+
+    def get_command_doc(self, bot, name):
+        """Retrieve the command, its description and list of examples."""
+        command = name.strip().lower()
+
+        if command not in bot.doc:
+            raise UnknownCommand('Unknown command "%s"' % command)
+
+        return [command] + list(bot.doc[command])
+
+    def get_command_docs(self, bot, names):
+        """Retrieve several commands, their description and examples.
+
+        :param bot: Sopel bot
+        :param list names: names of the commands
+        :return: a 2-value tuple with (list of ``[command, docs, examples]``,
+                 list of unknown names)
+        :rtype: tuple
+
+        Unlike :meth:`get_command_doc`, the bot's documentation is built only
+        once for all the commands.
+        """
+        doc = bot.doc
+        found = []
+        unknown = []
+        for name in names:
+            command = name.strip().lower()
+            if command in doc:
+                found.append([command] + list(doc[command]))
+            else:
+                unknown.append(command)
+        return found, unknown
+
+    def help_commands(self, bot, trigger):
+        """Handle triggered command to generate help for all commands."""
+        lines = self.generate_help_commands(
+            self.get_command_groups(bot, trigger))
+        self.send_help_commands(bot, trigger, lines)
+
+    def pin_help_commands(self, bot, commands):
+        self.pinned_replies.pin(bot, commands, self.generate_help_command)
+
+    def help_command(self, bot, trigger, name):
+        """Handle triggered command to generate help for one command.
+
+        When there is no such command, but there is such a category in the
+        user's list of commands, the commands of this category are sent
+        instead: when a command and a category have the same name, the
+        command wins.
+
+        :return: the name of the command (not the alias asked for), or
+                 ``None`` for a category
+        """
+        name = name.strip().lower()
+        command = replies.get_command_name(bot, name)
+        if command is None:
+            lines = self.generate_help_category(
+                self.get_command_groups(bot, trigger), name)
+            if lines:
+                self.send_help_lines(
+                    bot, trigger, 'category %s' % name.upper(), lines)
+                return None
+
+        reply = self.pinned_replies.get(bot, command)
+        if reply is None:
+            _, docs, examples = self.get_command_doc(bot, name)
+            reply = self.generate_help_command(name, docs, examples)
+        self.send_help_command(bot, trigger, name, *reply)
+        return command
+
+    def help_command_batch(self, bot, trigger, names):
+        """Handle triggered command to generate help for several commands.
+
+        :param list names: names of the commands, without duplicates
+        :return: a 2-value tuple with (commands found, unknown names)
+        :rtype: tuple
+
+        Up to ``help.batch_limit`` commands are looked up at once, and their
+        help is summed up in one line each (see :meth:`generate_help_batch`).
+        These lines are packed into as few messages as possible, and sent as
+        a whole (see :meth:`send_help_lines`).
+        """
+        limit = max(1, self.get_settings(bot).batch_limit)
+        names, ignored = names[:limit], names[limit:]
+
+        # aliases are counted (and pinned) by their command's name
+        commands = {
+            name: replies.get_command_name(bot, name)
+            for name in names
+        }
+        pinned = {}
+        for name in names:
+            reply = self.pinned_replies.get(bot, commands[name])
+            if reply is not None:
+                pinned[name] = reply
+
+        missing = [name for name in names if name not in pinned]
+        found, unknown = self.get_command_docs(bot, missing)
+        heads = {
+            command: self.generate_help_command(command, docs, examples)[0]
+            for command, docs, examples in found
+        }
+        heads.update((name, reply[0]) for name, reply in pinned.items())
+
+        entries = self.generate_help_batch(names, heads, ignored)
+        messages = replies.pack_messages(
+            entries, replies.MAX_MESSAGE_LENGTH - len(trigger.nick) - 2)
+        self.send_help_lines(bot, trigger, 'these commands', messages)
+
+        return [commands[name] for name in names if name in heads], unknown
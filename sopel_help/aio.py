@@ -0,0 +1,162 @@
+"""Asyncio event loop and coroutines of the help providers."""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+
+
+async def run_blocking(func, *args, executor=None):
+    """Run a blocking function from a coroutine, in an executor.
+
+    :param func: the blocking function to run
+    :param args: positional arguments for ``func``
+    :param executor: the executor to use (optional; defaults to the loop's
+                     executor)
+    :type executor: :class:`concurrent.futures.Executor`
+    :return: the result of ``func``
+
+    This is the way to call the synchronous API (HTTP requests, SQLite, file
+    writes) without blocking the event loop. Like :func:`asyncio.to_thread`,
+    ``func`` runs in a copy of the coroutine's context (see
+    :mod:`contextvars`).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        executor, functools.partial(context.run, func, *args))
+
+
+class EventLoopThread:
+    """Asyncio event loop, running in its own background thread.
+
+    :param str name: name of the thread (optional)
+
+    Coroutines are submitted from any thread with :meth:`submit`, and run
+    concurrently on the same loop. Synchronous code uses :meth:`run` as an
+    adapter: it waits for the coroutine's result.
+
+    Blocking calls made by coroutines with :func:`run_blocking` use a pool of
+    at most :attr:`DEFAULT_MAX_WORKERS` threads. Sending messages to IRC can
+    wait for Sopel's flood protection: it's done in a separate pool (see
+    :attr:`reply_executor`), so it never holds the threads of the publishers.
+    """
+    DEFAULT_MAX_WORKERS = 8
+    """Maximum number of threads for blocking calls."""
+    DEFAULT_MAX_REPLY_WORKERS = 4
+    """Maximum number of threads to send messages."""
+    DEFAULT_STOP_TIMEOUT = 5
+    """How long (in seconds) to wait for the thread when stopping."""
+
+    def __init__(self, name='help-event-loop'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._reply_executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        """Tell if the event loop is running."""
+        loop = self._loop
+        return loop is not None and loop.is_running()
+
+    @property
+    def reply_executor(self):
+        """Executor of the blocking calls that send messages to IRC.
+
+        This is ``None`` until the loop is started.
+        """
+        return self._reply_executor
+
+    def _run_forever(self, loop, executors, started):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            for executor in executors:
+                executor.shutdown(wait=False)
+
+    def start(self):
+        """Start the event loop, if it isn't running yet."""
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.DEFAULT_MAX_WORKERS,
+                thread_name_prefix='%s-blocking' % self.name)
+            loop.set_default_executor(executor)
+            reply_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.DEFAULT_MAX_REPLY_WORKERS,
+                thread_name_prefix='%s-reply' % self.name)
+            started = threading.Event()
+            thread = threading.Thread(
+                target=self._run_forever,
+                args=(loop, (executor, reply_executor), started),
+                name=self.name,
+                daemon=True)
+            thread.start()
+            started.wait()
+
+            self._loop = loop
+            self._thread = thread
+            self._reply_executor = reply_executor
+
+    def stop(self):
+        """Stop the event loop, and wait for its thread to end.
+
+        Pending coroutines are cancelled.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+
+            self._loop = None
+            self._thread = None
+            self._reply_executor = None
+
+        def cancel_all():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.stop()
+
+        loop.call_soon_threadsafe(cancel_all)
+        if thread is not threading.current_thread():
+            thread.join(self.DEFAULT_STOP_TIMEOUT)
+
+    def submit(self, coro):
+        """Submit a coroutine to the event loop.
+
+        :param coro: the coroutine to run
+        :return: a future of the coroutine's result
+        :rtype: :class:`concurrent.futures.Future`
+
+        The loop is started if it isn't running yet.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the event loop, and wait for its result.
+
+        :param coro: the coroutine to run
+        :param float timeout: how long (in seconds) to wait (optional)
+        :return: the coroutine's result
+        :raise RuntimeError: when called from the event loop's thread
+        :raise concurrent.futures.TimeoutError: when the timeout expires
+
+        This is the adapter for synchronous callers, such as Sopel's plugin
+        callables.
+        """
+        thread = self._thread
+        if thread is not None and thread is threading.current_thread():
+            coro.close()
+            raise RuntimeError('Cannot wait for a coroutine from its loop.')
+
+        return self.submit(coro).result(timeout)
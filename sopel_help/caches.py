@@ -0,0 +1,574 @@
+"""Caches for the help plugin."""
+import asyncio
+import collections
+import contextlib
+import heapq
+import itertools
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from sopel_help import aio
+
+
+class SharedPublishCache:
+    """Publish cache shared by several processes, stored in a SQLite file.
+
+    :param str filename: path to the SQLite database file
+
+    Several bot instances on the same host can use the same file: one of them
+    publishes the content for a given signature, and the others reuse its URL.
+    To prevent concurrent uploads of the same content, an instance must hold
+    the :meth:`lock` of a signature while publishing it.
+    """
+    LOCK_DURATION = 60
+    """How long (in seconds) a lock is held before it is considered stale."""
+    LOCK_POLL_INTERVAL = 0.2
+    """How long (in seconds) to wait before checking a lock again."""
+    CONNECT_TIMEOUT = 10
+    """How long (in seconds) to wait for the database to be unlocked."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.owner = '%s:%d:%d' % (
+            socket.gethostname(), os.getpid(), id(self))
+        self._schema_lock = threading.Lock()
+        self._has_schema = False
+
+    def _connect(self):
+        # isolation_level=None: transactions are explicitly managed
+        connection = sqlite3.connect(
+            self.filename,
+            timeout=self.CONNECT_TIMEOUT,
+            isolation_level=None)
+
+        if not self._has_schema:
+            with self._schema_lock:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS publish_cache ('
+                    'signature TEXT PRIMARY KEY, '
+                    'value TEXT NOT NULL, '
+                    'expires_at REAL)')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS publish_lock ('
+                    'signature TEXT PRIMARY KEY, '
+                    'owner TEXT NOT NULL, '
+                    'expires_at REAL NOT NULL)')
+                self._has_schema = True
+
+        return contextlib.closing(connection)
+
+    def get(self, signature, margin=0, now=None):
+        """Get the value and its expiry from the given ``signature``.
+
+        :param str signature: cache signature
+        :param float margin: how long (in seconds) before its expiry a value
+                             is not valid anymore (optional)
+        :param float now: current timestamp (optional)
+        :return: a 2-value tuple with (value, timestamp of expiry) if the
+                 signature is still valid; ``None`` otherwise
+        """
+        now = time.time() if now is None else now
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT value, expires_at FROM publish_cache '
+                'WHERE signature = ?',
+                (signature,)).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at - now <= margin:
+            return None
+
+        return value, expires_at
+
+    def set(self, signature, value, expires_at=None):
+        """Store the ``value`` and its expiry for the given ``signature``.
+
+        :param str signature: cache signature
+        :param str value: value to cache
+        :param float expires_at: timestamp at which the value expires
+                                 (optional)
+        """
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO publish_cache '
+                '(signature, value, expires_at) VALUES (?, ?, ?)',
+                (signature, value, expires_at))
+
+    def purge(self, now=None):
+        """Remove expired values and stale locks.
+
+        :param float now: current timestamp (optional)
+        """
+        now = time.time() if now is None else now
+        with self._connect() as connection:
+            connection.execute(
+                'DELETE FROM publish_cache WHERE expires_at <= ?', (now,))
+            connection.execute(
+                'DELETE FROM publish_lock WHERE expires_at <= ?', (now,))
+
+    def acquire(self, signature, now=None):
+        """Try to acquire the lock for the given ``signature``.
+
+        :param str signature: cache signature
+        :param float now: current timestamp (optional)
+        :return: ``True`` if the lock is acquired, ``False`` if another
+                 process holds it
+        :rtype: bool
+        """
+        now = time.time() if now is None else now
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    'DELETE FROM publish_lock '
+                    'WHERE signature = ? AND expires_at <= ?',
+                    (signature, now))
+                cursor = connection.execute(
+                    'INSERT OR IGNORE INTO publish_lock '
+                    '(signature, owner, expires_at) VALUES (?, ?, ?)',
+                    (signature, self.owner, now + self.LOCK_DURATION))
+                acquired = cursor.rowcount == 1
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+        return acquired
+
+    def release(self, signature):
+        """Release the lock for the given ``signature``, if held.
+
+        :param str signature: cache signature
+        """
+        with self._connect() as connection:
+            connection.execute(
+                'DELETE FROM publish_lock WHERE signature = ? AND owner = ?',
+                (signature, self.owner))
+
+    @contextlib.contextmanager
+    def lock(self, signature, timeout=None):
+        """Hold the lock for the given ``signature``.
+
+        :param str signature: cache signature
+        :param float timeout: how long (in seconds) to wait for the lock
+                              (optional; defaults to :attr:`LOCK_DURATION`)
+        :return: a context manager that gives ``True`` if the lock is
+                 acquired, or ``False`` if it timed out
+
+        While another process holds the lock, this waits for it to be released
+        (or to become stale). Callers should check the cache again once they
+        get the lock: the other process may have stored a value meanwhile.
+        """
+        timeout = self.LOCK_DURATION if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        acquired = self.acquire(signature)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(self.LOCK_POLL_INTERVAL)
+            acquired = self.acquire(signature)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(signature)
+
+    @contextlib.asynccontextmanager
+    async def lock_async(self, signature, timeout=None):
+        """Coroutine version of :meth:`lock`.
+
+        :param str signature: cache signature
+        :param float timeout: how long (in seconds) to wait for the lock
+                              (optional; defaults to :attr:`LOCK_DURATION`)
+        :return: an asynchronous context manager that gives ``True`` if the
+                 lock is acquired, or ``False`` if it timed out
+
+        Waiting for the lock doesn't block the event loop, and the database
+        is queried in the loop's executor (see
+        :func:`~sopel_help.aio.run_blocking`).
+        """
+        timeout = self.LOCK_DURATION if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        acquired = await aio.run_blocking(self.acquire, signature)
+        while not acquired and time.monotonic() < deadline:
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+            acquired = await aio.run_blocking(self.acquire, signature)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await aio.run_blocking(self.release, signature)
+
+
+def get_size(value):
+    """Estimate the memory size of a ``value``, in bytes.
+
+    :param value: the value to measure
+    :return: the size of ``value``, including the items it contains
+    :rtype: int
+
+    Strings, numbers, and containers (tuples, lists, sets, and dicts) are
+    measured deeply; other objects are measured alone.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            get_size(key) + get_size(item) for key, item in value.items())
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(get_size(item) for item in value)
+    return size
+
+
+CacheStats = collections.namedtuple(
+    'CacheStats', ('name', 'entries', 'size', 'hits', 'misses', 'evictions'))
+"""Statistics of a :class:`MemoryCache`."""
+
+
+class MemoryCache:
+    """In-memory cache, whose size counts toward its registry's budget.
+
+    :param str name: name of the cache
+    :param cache_registry: the registry of the cache
+    :type cache_registry: :class:`CacheRegistry`
+
+    Use :meth:`CacheRegistry.register` to get a cache. Its values can be
+    evicted at any time, when the registry needs room: a value must be cheap
+    enough to compute again.
+
+    Each cache has its own lock: reading a value doesn't lock the registry,
+    nor the other caches.
+    """
+    def __init__(self, name, cache_registry):
+        self.name = name
+        self.registry = cache_registry
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # map of (key, [value, size, hits, priority, sequence number])
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Get the value of ``key``, and count a hit or a miss.
+
+        :param key: the key of the value
+        :param default: the value to return if there is none (optional)
+        :return: the cached value, or ``default``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            entry[2] += 1
+            entry[3] = self.registry.get_priority(entry[1], entry[2])
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Get the value of ``key``, without counting a hit or a miss.
+
+        :param key: the key of the value
+        :param default: the value to return if there is none (optional)
+        :return: the cached value, or ``default``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key, value):
+        """Store the ``value`` of ``key``.
+
+        :param key: the key of the value
+        :param value: the value to cache
+
+        Less valuable entries of the registry's caches are evicted to make
+        room if needed. A value larger than the whole budget isn't stored.
+        """
+        size = get_size(key) + get_size(value)
+        if not self.registry.fits(size):
+            self.pop(key)
+            return
+
+        priority = self.registry.get_priority(size, 1)
+        sequence = self.registry.next_sequence()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+            self._entries[key] = [value, size, 1, priority, sequence]
+            self.size += size
+
+        self.registry.push_entry(priority, sequence, self, key)
+
+    def pop(self, key, default=None):
+        """Remove ``key`` from the cache.
+
+        :param key: the key of the value
+        :param default: the value to return if there is none (optional)
+        :return: the removed value, or ``default``
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self.size -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        """Remove all the values of the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def get_priorities(self):
+        """Get the priority of each entry of the cache.
+
+        :return: list of ``(priority, sequence number, key)``
+        :rtype: list
+        """
+        with self._lock:
+            return [
+                (entry[3], entry[4], key)
+                for key, entry in self._entries.items()
+            ]
+
+    def evict(self, key, priority, sequence):
+        """Evict the entry of ``key``, if it's still the lowest one.
+
+        :param key: the key of the entry
+        :param float priority: priority of the entry, as known by the registry
+        :param int sequence: sequence number of the entry
+        :return: ``None`` if the entry was evicted, or the entry's current
+                 priority if it was used since; ``False`` if there is no such
+                 entry anymore
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[4] != sequence:
+                return False
+            if entry[3] > priority:
+                return entry[3]
+
+            del self._entries[key]
+            self.size -= entry[1]
+            self.evictions += 1
+            return None
+
+    def get_stats(self):
+        """Get the statistics of the cache.
+
+        :rtype: :class:`CacheStats`
+        """
+        with self._lock:
+            return CacheStats(
+                self.name,
+                len(self._entries),
+                self.size,
+                self.hits,
+                self.misses,
+                self.evictions)
+
+
+class CacheRegistry:
+    """Registry of in-memory caches, with one memory budget for all of them.
+
+    :param int budget: maximum size of all the caches, in bytes (optional)
+
+    When the caches grow over the :attr:`budget`, the least valuable entries
+    are evicted first, whatever their cache. The value of an entry grows
+    with its hits, and shrinks with its size: large values used once go
+    first. Priorities are raised to the priority of the last evicted entry
+    when an entry is stored or used, so entries that were popular long ago
+    don't stay forever (this is the GreedyDual-Size-Frequency policy).
+
+    The entries are kept in a heap of priorities. A hit raises the priority
+    of an entry in its cache only: the heap is updated when the entry comes
+    up for eviction, so reading a value never locks the registry.
+    """
+    DEFAULT_BUDGET = 8 * 1024 * 1024
+    """Default maximum size of all the caches, in bytes."""
+
+    def __init__(self, budget=None):
+        self.lock = threading.Lock()
+        self._budget = budget or self.DEFAULT_BUDGET
+        self._caches = {}
+        self._inflation = 0
+        # heap of (priority, sequence number, cache, key)
+        self._heap = []
+        self._sequence = itertools.count()
+
+    @property
+    def budget(self):
+        """Maximum size of all the caches, in bytes.
+
+        Setting a lower budget evicts entries at once.
+        """
+        return self._budget
+
+    @budget.setter
+    def budget(self, value):
+        self._budget = value
+        self.enforce_budget()
+
+    @property
+    def size(self):
+        """Size of all the caches, in bytes."""
+        return sum(cache.size for cache in list(self._caches.values()))
+
+    def register(self, name):
+        """Get the cache named ``name``, created if needed.
+
+        :param str name: name of the cache
+        :rtype: :class:`MemoryCache`
+        """
+        with self.lock:
+            cache = self._caches.get(name)
+            if cache is None:
+                cache = self._caches[name] = MemoryCache(name, self)
+            return cache
+
+    def get_priority(self, size, hits):
+        """Get the priority of an entry: lower priorities are evicted first.
+
+        :param int size: size of the entry, in bytes
+        :param int hits: number of times the entry was used
+        :rtype: float
+        """
+        return self._inflation + hits / max(size, 1)
+
+    def next_sequence(self):
+        """Get a new sequence number, to tell entries of the same key apart.
+
+        :rtype: int
+        """
+        return next(self._sequence)
+
+    def fits(self, size):
+        """Tell if an entry of ``size`` bytes can be cached at all.
+
+        :param int size: size of the entry, in bytes
+        :rtype: bool
+        """
+        return size <= self._budget
+
+    def push_entry(self, priority, sequence, cache, key):
+        """Add a new entry of a ``cache`` to the heap, and enforce the budget.
+
+        :param float priority: priority of the entry
+        :param int sequence: sequence number of the entry
+        :param cache: the cache of the entry
+        :type cache: :class:`MemoryCache`
+        :param key: the key of the entry
+        """
+        with self.lock:
+            heapq.heappush(self._heap, (priority, sequence, cache, key))
+            self._enforce_budget()
+            if len(self._heap) > 2 * self._count_entries() + 64:
+                self._rebuild_heap()
+
+    def _count_entries(self):
+        return sum(len(cache) for cache in self._caches.values())
+
+    def _rebuild_heap(self):
+        # drop the heap items of the entries removed or replaced since
+        self._heap = [
+            (priority, sequence, cache, key)
+            for cache in self._caches.values()
+            for priority, sequence, key in cache.get_priorities()
+        ]
+        heapq.heapify(self._heap)
+
+    def _enforce_budget(self):
+        evicted = 0
+        while self._heap and self.size > self._budget:
+            priority, sequence, cache, key = heapq.heappop(self._heap)
+            current = cache.evict(key, priority, sequence)
+            if current is False:
+                # already removed, or replaced by a newer entry
+                continue
+            if current is not None:
+                # used since it was pushed: put it back at its place
+                heapq.heappush(self._heap, (current, sequence, cache, key))
+                continue
+
+            self._inflation = priority
+            evicted += 1
+
+        return evicted
+
+    def enforce_budget(self):
+        """Evict the least valuable entries until the caches fit the budget.
+
+        :return: the number of entries evicted
+        :rtype: int
+        """
+        with self.lock:
+            return self._enforce_budget()
+
+    def get_stats(self):
+        """Get the statistics of each cache.
+
+        :return: list of :class:`CacheStats`, sorted by cache name
+        :rtype: list
+        """
+        with self.lock:
+            caches = [self._caches[name] for name in sorted(self._caches)]
+        return [cache.get_stats() for cache in caches]
+
+
+def format_size(size):
+    """Format a size in bytes, such as ``12.5 KiB``.
+
+    :param int size: the size, in bytes
+    :rtype: str
+    """
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024 or unit == 'MiB':
+            break
+        size /= 1024
+    if unit == 'B':
+        return '%d B' % size
+    return '%.1f %s' % (size, unit)
+
+
+def format_stats(stats):
+    """Format the statistics of a cache for a message.
+
+    :param stats: the statistics of the cache
+    :type stats: :class:`CacheStats`
+    :return: the formatted statistics
+    :rtype: str
+    """
+    lookups = stats.hits + stats.misses
+    hit_rate = stats.hits / lookups if lookups else 0
+    return '%s: %d entries, %s, %.0f%% hits (%d/%d), %d evictions' % (
+        stats.name,
+        stats.entries,
+        format_size(stats.size),
+        hit_rate * 100,
+        stats.hits,
+        lookups,
+        stats.evictions,
+    )
+
+
+registry = CacheRegistry()
+"""Registry of the help plugin's in-memory caches."""
@@ -0,0 +1,233 @@
+"""Sopel Help Command Line Interface (CLI): ``sopel-help``"""
+import argparse
+import concurrent.futures
+import inspect
+import os
+import sys
+import time
+
+from sopel import bot as sopel_bot
+from sopel import config as sopel_config
+from sopel import plugins, tools
+from sopel.cli import utils
+
+from sopel_help import config, documents, exports, providers, sites
+from sopel_help.managers import split_provider_names
+
+ERR_CODE = 1
+"""Error code: program exited with an error"""
+
+TARGETS = ['html', 'json', 'site']
+"""Artifacts the ``build`` action can generate."""
+
+
+def build_parser():
+    """Configure an argument parser for ``sopel-help``.
+
+    :return: the argument parser
+    :rtype: :class:`argparse.ArgumentParser`
+    """
+    parser = argparse.ArgumentParser(
+        description='Sopel help tool')
+
+    subparsers = parser.add_subparsers(
+        help='Action to perform',
+        dest='action')
+
+    # sopel-help build [targets]
+    build_subparser = subparsers.add_parser(
+        'build',
+        formatter_class=argparse.RawTextHelpFormatter,
+        help='Build help artifacts without running the bot',
+        description=inspect.cleandoc("""
+            Build help artifacts from the commands of the enabled plugins,
+            without connecting to IRC.
+
+            By default, the artifacts are the ones of the configured help
+            provider: ``html`` for ``local``, ``site`` for ``site``, plus
+            ``json`` when ``help.origin_json_index`` is enabled.
+        """))
+    utils.add_common_arguments(build_subparser)
+    build_subparser.add_argument(
+        'targets',
+        nargs='*',
+        metavar='target',
+        help='Artifacts to build: %s' % ', '.join(TARGETS))
+    build_subparser.add_argument(
+        '-o', '--output-dir',
+        dest='output_dir',
+        help='Override the output directory (help.origin_output_dir)')
+    build_subparser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        dest='jobs',
+        help='Number of processes used to render pages')
+
+    return parser
+
+
+def load_bot(settings):
+    """Load the bot and its plugins' commands, without connecting to IRC.
+
+    :param settings: Sopel's configuration
+    :type settings: :class:`sopel.config.Config`
+    :return: the bot, with its plugins' commands registered
+    :rtype: :class:`sopel.bot.Sopel`
+    :raise RuntimeError: when a plugin can't be loaded
+
+    The plugins are loaded and registered, but not set up: this doesn't
+    connect to any database or service they may require.
+    """
+    settings.define_section('help', config.HelpSection)
+    bot = sopel_bot.Sopel(settings)
+
+    usable_plugins = plugins.get_usable_plugins(settings)
+    for name, (plugin, is_enabled) in usable_plugins.items():
+        if not is_enabled:
+            continue
+
+        try:
+            plugin.load()
+            plugin.register(bot)
+        except Exception as error:
+            raise RuntimeError(
+                'Cannot load plugin %s: %s' % (name, error)) from error
+
+    return bot
+
+
+def get_default_targets(settings):
+    """Get the artifacts of the configured help provider.
+
+    :param settings: Sopel's configuration
+    :type settings: :class:`sopel.config.Config`
+    :return: list of targets
+    :rtype: list
+    """
+    outputs = split_provider_names(settings.help.output)
+    targets = []
+    if 'local' in outputs:
+        targets.append('html')
+    if 'site' in outputs:
+        targets.append('site')
+    if targets and settings.help.origin_json_index:
+        targets.append('json')
+    return targets
+
+
+def build_html(bot, executor):  # pylint: disable=unused-argument
+    """Build the single HTML page of the ``local`` provider."""
+    provider = providers.LocalFile()
+    provider.setup(bot)
+    lines = provider.generate_help_commands(bot.command_groups)
+    provider.save_content(provider.stream_render(bot, None, lines))
+
+
+def build_json(bot, executor):  # pylint: disable=unused-argument
+    """Build the JSON index and its version file."""
+    exporter = exports.JSONIndexExporter(
+        bot.settings.help.origin_output_dir,
+        bot.settings.help.origin_json_name)
+    exporter.export(documents.get_bot_document(bot))
+
+
+def build_site(bot, executor):
+    """Build the pages of the static site."""
+    builder = sites.StaticSiteBuilder(
+        bot.settings.help.origin_output_dir,
+        bot.settings.help.origin_output_name,
+        executor=executor)
+    builder.build(documents.get_bot_document(bot))
+
+
+BUILDERS = {
+    'html': build_html,
+    'json': build_json,
+    'site': build_site,
+}
+
+
+def handle_build(options):
+    """Build help artifacts.
+
+    :param options: parsed arguments
+    :type options: :class:`argparse.Namespace`
+    :return: 0 if everything went fine; 1 otherwise
+    :rtype: int
+    """
+    unknown_targets = set(options.targets) - set(TARGETS)
+    if unknown_targets:
+        tools.stderr('Unknown target(s): %s; choose from: %s' % (
+            ', '.join(sorted(unknown_targets)), ', '.join(TARGETS)))
+        return ERR_CODE
+
+    start = time.perf_counter()
+    settings = utils.load_settings(options)
+    bot = load_bot(settings)
+    if options.output_dir:
+        bot.settings.help.origin_output_dir = options.output_dir
+    print('Loaded commands in %.3fs' % (time.perf_counter() - start))
+
+    targets = options.targets or get_default_targets(settings)
+    if not targets:
+        tools.stderr(
+            'Nothing to build for help provider "%s"; '
+            'please give a target: %s' % (
+                settings.help.output, ', '.join(TARGETS)))
+        return ERR_CODE
+
+    # only the site has enough pages to render in parallel
+    executor = None
+    if 'site' in targets and options.jobs > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=options.jobs)
+
+    status = 0
+    try:
+        for target in targets:
+            target_start = time.perf_counter()
+            try:
+                BUILDERS[target](bot, executor)
+            except Exception as error:  # pylint: disable=broad-except
+                tools.stderr('Error building %s: %s' % (target, error))
+                status = ERR_CODE
+                continue
+            print('Built %s in %.3fs' % (
+                target, time.perf_counter() - target_start))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print('Done in %.3fs' % (time.perf_counter() - start))
+    return status
+
+
+def main(argv=None):
+    """Console entry point for ``sopel-help``."""
+    parser = build_parser()
+    options = parser.parse_args(argv)
+
+    if not options.action:
+        parser.print_help()
+        return ERR_CODE
+
+    try:
+        if options.action == 'build':
+            return handle_build(options)
+    except KeyboardInterrupt:
+        tools.stderr('Bye!')
+        return ERR_CODE
+    except sopel_config.ConfigurationNotFound as err:
+        tools.stderr(err)
+        tools.stderr('Use `sopel-config init` to create a new config file.')
+        return ERR_CODE
+    except (sopel_config.ConfigurationError, RuntimeError) as err:
+        tools.stderr(err)
+        return ERR_CODE
+
+    return ERR_CODE
+
+
+if __name__ == '__main__':
+    sys.exit(main())
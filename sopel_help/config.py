@@ -2,7 +2,84 @@
 
 from sopel import config
 
-from sopel_help.managers import manager
+from sopel_help.managers import (
+    manager,
+    split_channel_output,
+    split_provider_names,
+)
+
+
+class ProviderChainAttribute(config.types.ChoiceAttribute):
+    """A config attribute for an ordered, comma-separated list of providers.
+
+    Each name must be one of the available ``choices``. The value is returned
+    as a normalized string, such as ``0x0, clbin, base``; use
+    :func:`sopel_help.managers.split_provider_names` to get the list of names.
+    """
+    def parse(self, value):
+        """Check each provider name of ``value`` against the ``choices``.
+
+        :param str value: the value loaded from the config file
+        :return: the normalized ``value``, if it is valid
+        :rtype: str
+        :raise ValueError: if ``value`` is empty or if one of its names is not
+                           one of the valid ``choices``
+        """
+        names = split_provider_names(value)
+        if not names:
+            raise ValueError('Value must not be empty')
+
+        for name in names:
+            if name not in self.choices:
+                raise ValueError('Values must be in {}'.format(self.choices))
+
+        return ', '.join(names)
+
+    def serialize(self, value):
+        """Make sure ``value`` is valid and safe to write in the config file.
+
+        :param value: the value needing to be saved
+        :type value: str or list
+        :return: the normalized ``value``, if it is valid
+        :rtype: str
+        :raise ValueError: if one of the names is not one of the valid
+                           ``choices``
+        """
+        if not isinstance(value, str):
+            value = ', '.join(value)
+        return self.parse(value)
+
+
+class ChannelOutputsAttribute(config.types.ListAttribute):
+    """A config attribute for a list of per-channel provider chains.
+
+    Each item is a channel and its providers, such as ``#channel:local``, or
+    ``#channel:0x0, clbin`` for a chain; each provider name must be one of the
+    available ``choices``. Use :func:`sopel_help.managers.split_channel_output`
+    to get the channel and the list of names of an item.
+    """
+    def __init__(self, name, choices, default=None):
+        super().__init__(name, default=default)
+        self.choices = choices
+
+    def parse(self, value):
+        """Check each item of ``value``.
+
+        :param str value: the value loaded from the config file
+        :return: the list of items, if they are valid
+        :rtype: list
+        :raise ValueError: if an item has no channel, no provider, or if one of
+                           its providers is not one of the valid ``choices``
+        """
+        items = super().parse(value)
+        for item in items:
+            _, names = split_channel_output(item)
+            for name in names:
+                if name not in self.choices:
+                    raise ValueError(
+                        'Values must be in {}'.format(self.choices))
+
+        return items
 
 
 class HelpSection(config.types.StaticSection):
@@ -13,10 +90,30 @@ class HelpSection(config.types.StaticSection):
         'notice',
     ]
 
-    output = config.types.ChoiceAttribute('output',
-                                          manager.provider_names,
-                                          default='base')
-    """The help provider to use for output."""
+    output = ProviderChainAttribute('output',
+                                    manager.provider_names,
+                                    default='base')
+    """The help provider to use for output.
+
+    This can be an ordered, comma-separated list of providers, such as
+    ``0x0, clbin``: when a provider fails to publish the list of commands, the
+    next one is used instead. The ``base`` provider is always the last resort.
+    """
+    channel_outputs = ChannelOutputsAttribute('channel_outputs',
+                                              manager.provider_names)
+    """Help providers to use in some channels, instead of :attr:`output`.
+
+    Each item is a channel and its providers, such as ``#channel:local``;
+    each item must be quoted in the config file, or the ``#`` would start a
+    comment::
+
+        [help]
+        channel_outputs =
+            "#large-channel:local"
+            "#other-channel:0x0, clbin"
+
+    Other channels, and private messages, use :attr:`output`.
+    """
     reply_method = config.types.ChoiceAttribute('reply_method',
                                                 REPLY_METHODS,
                                                 default='channel')
@@ -37,14 +134,207 @@ class HelpSection(config.types.StaticSection):
         default='/var/www/html')
     """Where the file will be put on the server to publish the content."""
 
+    origin_template = config.types.FilenameAttribute(
+        'origin_template',
+        default=None)
+    """Path to an HTML template for the help file (optional).
+
+    The template must contain a ``{content}`` placeholder, replaced by the
+    list of commands; the rest of the template is kept as-is. The file is
+    reloaded when it changes.
+    """
+
+    origin_json_index = config.types.BooleanAttribute(
+        'origin_json_index',
+        default=False)
+    """Also export the commands as a JSON index next to the HTML file."""
+
+    origin_json_name = config.types.ValidatedAttribute(
+        'origin_json_name',
+        default='help.json')
+    """How is named the JSON index file.
+
+    A version file is written next to it, with the ``.version`` extension
+    instead (``help.version`` by default).
+    """
+
+    hedged_outputs = config.types.ListAttribute(
+        'hedged_outputs',
+        default=['0x0', 'clbin'])
+    """Publishers to use at the same time with the ``hedged`` provider.
+
+    The content is sent to all of them at once, and the first URL is used.
+    """
+
+    publish_attempts = config.types.ValidatedAttribute(
+        'publish_attempts',
+        parse=int,
+        default=3)
+    """How many times to try to publish content on transient errors."""
+
+    publish_deadline = config.types.ValidatedAttribute(
+        'publish_deadline',
+        parse=float,
+        default=10.0)
+    """Time budget (in seconds) for all the publishing attempts.
+
+    No new attempt is made when it would start after this deadline.
+    """
+
+    publish_liveness_check = config.types.BooleanAttribute(
+        'publish_liveness_check',
+        default=False)
+    """Check that a published URL still exists before sending it.
+
+    The check is a ``HEAD`` request, made only when the URL is close to its
+    expiry, if known.
+    """
+
+    publish_cache_file = config.types.FilenameAttribute(
+        'publish_cache_file',
+        default=None)
+    """SQLite file to share published URLs with other bot instances.
+
+    Bot instances on the same host with the same file publish each content
+    only once, and reuse each other's URL.
+    """
+
+    publish_async = config.types.BooleanAttribute(
+        'publish_async',
+        default=False)
+    """Send the list of commands from the help plugin's event loop.
+
+    The ``.help`` command returns at once, and the providers publish the
+    list of commands from a background asyncio event loop: slow pastebin
+    services don't hold Sopel's threads.
+    """
+
+    publish_max_size = config.types.ValidatedAttribute(
+        'publish_max_size',
+        parse=int,
+        default=0)
+    """Maximum size (in bytes) of a document to publish.
+
+    Larger help content is split into several documents, published with an
+    index document that links to each of them. Set to ``0`` to use the
+    service's known limit, if any.
+    """
+
+    privilege_filter = config.types.BooleanAttribute(
+        'privilege_filter',
+        default=True)
+    """List only the commands that the user can run.
+
+    The list of commands depends on the user's privilege tier: ``user``,
+    ``voice``, ``halfop``, ``op`` (from the user's privileges in the
+    channel), ``admin``, or ``owner`` (of the bot). A command whose examples
+    are all marked for the bot's owner (or admins) is listed only for them.
+
+    Providers that publish one file for everyone (``local`` and ``site``)
+    always list all the commands.
+    """
+
+    command_privileges = config.types.ListAttribute(
+        'command_privileges')
+    """Tier required by commands, as a list of ``command:tier``.
+
+    For example, ``kick:op`` lists the ``kick`` command only for channel
+    operators, and higher tiers. This overrides the tier given by the
+    command's examples.
+    """
+
+    batch_limit = config.types.ValidatedAttribute(
+        'batch_limit',
+        parse=int,
+        default=5)
+    """How many commands can be looked up at once, as in ``.help seen tell``.
+
+    The other commands of the request are ignored.
+    """
+
+    pinned_replies = config.types.ValidatedAttribute(
+        'pinned_replies',
+        parse=int,
+        default=10)
+    """How many of the most requested commands have their help pre-rendered.
+
+    The help of these commands is generated ahead of time, and kept until
+    the next refresh. Set to ``0`` to disable it.
+    """
+
+    channel_max_bytes = config.types.ValidatedAttribute(
+        'channel_max_bytes',
+        parse=int,
+        default=1200)
+    """Maximum size (in bytes) of a help reply sent in a channel.
+
+    Larger replies are sent in a private message instead. Set to ``0`` for no
+    limit but :attr:`line_threshold`.
+    """
+
+    private_max_bytes = config.types.ValidatedAttribute(
+        'private_max_bytes',
+        parse=int,
+        default=4000)
+    """Maximum size (in bytes) of a help reply sent in a private message.
+
+    Larger replies are published online, and the user gets a link instead,
+    when the provider publishes content (such as ``0x0`` or ``clbin``); other
+    providers send them in a private message anyway. Set to ``0`` for no
+    limit.
+    """
+
+    backlog_threshold = config.types.ValidatedAttribute(
+        'backlog_threshold',
+        parse=int,
+        default=0)
+    """How many messages the bot can send in 10s before help is degraded.
+
+    When the bot has sent that many messages (to anyone) in the last 10
+    seconds, help replies switch to a cheaper mode: the list of categories
+    instead of the list of commands, a link instead of a long reply (with a
+    provider that publishes content), or only the first line of the reply.
+    Each downgrade is logged and counted (see ``.helpstats``).
+
+    The messages sent by the help plugin count too, such as the list of
+    commands sent in private. Disabled by default (``0``).
+    """
+
+    drip_rate = config.types.ValidatedAttribute(
+        'drip_rate',
+        parse=float,
+        default=0)
+    """How many lines of the list of commands to send per second.
+
+    With a rate, the ``base`` provider sends the list of commands from a
+    background thread, one recipient at a time in round-robin order, instead
+    of all at once: the bot's other messages aren't held up. A user can stop
+    it with ``.help stop``, and it stops when the user quits. Set to ``0`` to
+    send the list at once.
+    """
+
+    cache_max_bytes = config.types.ValidatedAttribute(
+        'cache_max_bytes',
+        parse=int,
+        default=8388608)
+    """Maximum size (in bytes) of the help plugin's in-memory caches.
+
+    This budget is shared by all the caches (the help documents, their
+    rendered blocks, and the privilege views): when they grow over it, the
+    least valuable entries are evicted first. The bot's owner can see the
+    caches with ``.helpcaches``. Defaults to 8 MiB.
+    """
+
     line_threshold = config.types.ValidatedAttribute(
         'line_threshold',
         parse=int,
         default=3)
-    """How many lines can be sent in a channel for a command help.
+    """How many messages can be sent in a channel for a command help.
 
-    This is the size of messages (in number of lines) before the command help
-    is sent as private messages instead of messages to a channel.
+    This is the size of the reply (in number of messages, a line longer than
+    a message being sent as several messages) before the command help is
+    sent as private messages instead of messages to a channel. See also
+    :attr:`channel_max_bytes`.
 
     This has no effect when :attr:`reply_method` is set to ``notice`` or
     ``query``, as these methods don't send their messages in a channel.
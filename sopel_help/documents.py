@@ -0,0 +1,304 @@
+"""Format-independent help documents and their renderers."""
+import functools
+import hashlib
+import html
+import itertools
+import json
+import threading
+
+from sopel_help import caches, replies, wrapping
+
+RENDERED_BLOCKS = caches.registry.register('rendered blocks')
+"""Cache of the rendered blocks of the help documents."""
+DOCUMENTS = caches.registry.register('documents')
+"""Cache of the help documents (see :func:`get_document`)."""
+
+
+class HelpDocument:
+    """Help document for a set of commands, independent of any format.
+
+    :param categories: sequence of ``(category, commands)``, where
+                       ``commands`` is a sequence of command names
+    :type categories: tuple
+    :param details: sequence of ``(command, docs, examples, aliases)``
+                    (optional)
+    :type details: tuple
+
+    Categories are sorted by name, and each category's commands are sorted
+    and unique. A document is immutable: use :func:`get_document` to get the
+    document of a bot's command groups, built once and then cached.
+
+    Each renderer (:meth:`render_text`, :meth:`render_html`,
+    :meth:`render_markdown`, and :meth:`render_json`) walks the document to
+    generate its output as a stream of blocks; use :meth:`render` to get the
+    rendered blocks from a cache instead.
+    """
+    def __init__(self, categories, details=None):
+        self.categories = tuple(
+            (category, tuple(sorted(set(commands))))
+            for category, commands in sorted(categories)
+        )
+        self.details = {
+            command: (tuple(docs), tuple(examples), tuple(aliases))
+            for command, docs, examples, aliases in details or ()
+        }
+        self._lock = threading.Lock()
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self) +
+            caches.get_size(self.categories) +
+            caches.get_size(self.details))
+
+    @functools.cached_property
+    def version(self):
+        """Version of the document, derived from its content."""
+        hasher = hashlib.sha1()
+        for category, commands in self.categories:
+            line = '%s:%s\n' % (category, ','.join(commands))
+            hasher.update(line.encode('utf-8'))
+        for command, details in sorted(self.details.items()):
+            line = '%s:%r\n' % (command, details)
+            hasher.update(line.encode('utf-8'))
+        return hasher.hexdigest()
+
+    @functools.cached_property
+    def category_index(self):
+        """Case-insensitive index of the categories.
+
+        This is a map of (lower-case category, position in
+        :attr:`categories`).
+        """
+        return {
+            category.lower(): position
+            for position, (category, _) in enumerate(self.categories)
+        }
+
+    def get_category_block(self, category, output_format, **kwargs):
+        """Get the rendered block of one category.
+
+        :param str category: name of the category (case-insensitive)
+        :param str output_format: one of ``text``, ``html``, or ``markdown``
+        :param kwargs: options of the renderer
+        :return: the rendered block of the category, or ``None`` if there is
+                 no such category
+        :rtype: str
+        :raise ValueError: when the format is unknown
+
+        The block is taken from the rendered blocks of the whole document
+        (see :meth:`render`), so it is rendered only once.
+        """
+        position = self.category_index.get(category.lower())
+        if position is None:
+            return None
+        return self.render(output_format, **kwargs)[position]
+
+    def render(self, output_format, **kwargs):
+        """Render the document, or get its rendered blocks from the cache.
+
+        :param str output_format: one of ``text``, ``html``, ``markdown``,
+                                  or ``json``
+        :param kwargs: options of the renderer
+        :return: the rendered blocks
+        :rtype: tuple
+        :raise ValueError: when the format is unknown
+
+        The rendered blocks are cached in :data:`RENDERED_BLOCKS`, shared by
+        the documents with the same :attr:`version`. They can be evicted to
+        keep the caches within their memory budget (see
+        :class:`sopel_help.caches.CacheRegistry`): then they are rendered
+        again.
+        """
+        key = (self.version, output_format, tuple(sorted(kwargs.items())))
+        blocks = RENDERED_BLOCKS.get(key)
+        if blocks is not None:
+            return blocks
+
+        try:
+            renderer = getattr(self, RENDERERS[output_format])
+        except KeyError:
+            raise ValueError(
+                'Unknown help format %r' % output_format) from None
+
+        with self._lock:
+            blocks = RENDERED_BLOCKS.peek(key)
+            if blocks is None:
+                blocks = tuple(renderer(**kwargs))
+                RENDERED_BLOCKS.set(key, blocks)
+
+        return blocks
+
+    def render_text(self, width=70, unit=wrapping.CHARS):
+        """Render each category as plain text.
+
+        :param int width: maximum length of a line
+        :param str unit: unit of ``width``, one of
+                         :data:`sopel_help.wrapping.UNITS`
+        :return: generator of text blocks, one per category
+        :raise ValueError: when the unit is unknown
+
+        Command names are never broken across lines; see
+        :func:`sopel_help.wrapping.wrap_tokens`.
+        """
+        if not self.categories:
+            return
+
+        name_length = max(
+            6, max(len(category) for category, _ in self.categories))
+        indent = ' ' * (name_length + 2)
+
+        for category, commands in self.categories:
+            # adjust category label to the max length
+            label = category.upper().ljust(name_length) + '  '
+            lines = wrapping.wrap_tokens(
+                commands,
+                width,
+                prefix=label,
+                indent=indent,
+                unit=unit)
+            yield '\n'.join(lines)
+
+    def render_html(self):
+        """Render each category as HTML.
+
+        :return: generator of HTML blocks, one per category
+        """
+        for category, commands in self.categories:
+            title = html.escape(category)
+            anchor = 'plugin-%s' % title.lower()
+
+            lines = [
+                '<h2 id="{anchor}">'
+                '<a href="#{anchor}">{title}</a>'
+                '</h2>'.format(anchor=anchor, title=title.upper()),
+                '<ul>'
+            ] + [
+                '<li>%s</li>' % html.escape(command)
+                for command in commands
+            ] + [
+                '</ul>'
+            ]
+            yield ''.join(lines)
+
+    def render_markdown(self):
+        """Render each category as Markdown.
+
+        :return: generator of Markdown blocks, one per category
+        """
+        for category, commands in self.categories:
+            lines = ['## %s' % category.upper(), ''] + [
+                '* `%s`' % command.replace('`', '\\`')
+                for command in commands
+            ]
+            yield '\n'.join(lines)
+
+    def render_json(self):
+        """Render the document as compact JSON.
+
+        :return: generator of JSON chunks
+
+        The JSON document is an object with:
+
+        * ``version``: the document's :attr:`version`
+        * ``categories``: an object of categories, each with its list of
+          commands
+        * ``commands``: an object of commands, each with its ``category``,
+          and if known, its ``doc`` lines, ``examples``, and ``aliases``
+        """
+        commands = {}
+        for category, names in self.categories:
+            for name in names:
+                command = {'category': category}
+                if name in self.details:
+                    docs, examples, aliases = self.details[name]
+                    command.update({
+                        'doc': list(docs),
+                        'examples': list(examples),
+                        'aliases': list(aliases),
+                    })
+                commands[name] = command
+
+        encoder = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+        yield from encoder.iterencode({
+            'version': self.version,
+            'categories': {
+                category: list(names)
+                for category, names in self.categories
+            },
+            'commands': commands,
+        })
+
+
+RENDERERS = {
+    'text': 'render_text',
+    'html': 'render_html',
+    'markdown': 'render_markdown',
+    'json': 'render_json',
+}
+"""Map of (output format, name of the renderer method)."""
+
+
+def _build_document(categories, details=None):
+    key = (categories, details)
+    document = DOCUMENTS.get(key)
+    if document is None:
+        document = HelpDocument(categories, details)
+        DOCUMENTS.set(key, document)
+    return document
+
+
+def get_document(command_groups):
+    """Get the help document of a set of commands.
+
+    :param dict command_groups: map of (category, commands)
+    :return: the help document
+    :rtype: :class:`HelpDocument`
+
+    The document is built only once for the same set of commands, and then
+    taken from :data:`DOCUMENTS`; its rendered outputs are cached too (see
+    :meth:`HelpDocument.render`).
+    """
+    categories = tuple(
+        (category, tuple(sorted(set(commands))))
+        for category, commands in sorted(command_groups.items())
+    )
+    return _build_document(categories)
+
+
+def get_bot_document(bot):
+    """Get the help document of a bot's commands, with their details.
+
+    :param bot: Sopel bot
+    :return: the help document
+    :rtype: :class:`HelpDocument`
+
+    Unlike :func:`get_document`, the document also contains the
+    documentation, examples, and aliases of each command.
+    """
+    rules = replies.get_rules(bot)
+
+    categories = {}
+    details = []
+    plugin_commands = itertools.chain(
+        rules.get_all_commands(),
+        rules.get_all_nick_commands(),
+    )
+    for plugin, commands in plugin_commands:
+        categories.setdefault(plugin, set()).update(commands.keys())
+        details.extend(
+            (
+                name,
+                tuple(command.get_doc().splitlines()),
+                tuple(usage['text'] for usage in command.get_usages()),
+                tuple(command.aliases),
+            )
+            for name, command in commands.items()
+        )
+
+    return _build_document(
+        tuple(
+            (category, tuple(sorted(commands)))
+            for category, commands in sorted(categories.items())
+        ),
+        tuple(sorted(details)),
+    )
@@ -0,0 +1,13 @@
+"""Errors of the help plugin."""
+
+
+class PublishingError(Exception):
+    """Generic publishing error."""
+
+
+class RetryablePublishingError(PublishingError):
+    """Transient publishing error: a new attempt may succeed."""
+
+
+class UnknownCommand(Exception):
+    """Command is unknown."""
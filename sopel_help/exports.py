@@ -0,0 +1,97 @@
+"""Export help documents to files."""
+import os
+import tempfile
+
+
+def save_atomic(filename, chunks):
+    """Save ``chunks`` of text into ``filename``, atomically.
+
+    :param str filename: path of the file to save
+    :param chunks: iterable of text chunks to write
+    :return: the ``filename``
+    :rtype: str
+
+    The chunks are written into a temporary file in the same directory, which
+    then replaces ``filename``: readers never see a partial file.
+    """
+    directory = os.path.dirname(filename) or '.'
+    descriptor, tmp_filename = tempfile.mkstemp(
+        dir=directory, prefix='.%s.' % os.path.basename(filename))
+    try:
+        with open(descriptor, 'w', encoding='utf-8') as tmpfd:
+            for chunk in chunks:
+                tmpfd.write(chunk)
+        # mkstemp creates files readable by their owner only
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
+
+    return filename
+
+
+class JSONIndexExporter:
+    """Exporter of a help document as a JSON index, with a version file.
+
+    :param str output_dir: directory where to save the files
+    :param str output_name: name of the JSON file
+
+    The version file is named after the JSON file, with a ``.version``
+    extension (for example ``help.version`` for ``help.json``), and contains
+    the version of the exported document. Clients can poll this small file,
+    and fetch the JSON index only when it changes.
+    """
+    def __init__(self, output_dir, output_name='help.json'):
+        self.output_dir = output_dir
+        self.output_name = output_name
+        self.version_name = '%s.version' % os.path.splitext(output_name)[0]
+        self._version = None
+
+    @property
+    def filename(self):
+        """Path of the JSON index file."""
+        return os.path.join(self.output_dir, self.output_name)
+
+    @property
+    def version_filename(self):
+        """Path of the version file."""
+        return os.path.join(self.output_dir, self.version_name)
+
+    def get_exported_version(self):
+        """Get the version of the exported document, if any.
+
+        :return: the version of the document, or ``None``
+        :rtype: str
+        """
+        if self._version is None:
+            filename = self.version_filename
+            try:
+                with open(filename, encoding='utf-8') as versionfd:
+                    self._version = versionfd.read().strip() or None
+            except FileNotFoundError:
+                return None
+
+        return self._version
+
+    def export(self, document):
+        """Export the ``document``, if it changed since the last export.
+
+        :param document: help document to export
+        :type document: :class:`sopel_help.documents.HelpDocument`
+        :return: ``True`` if the files are written, ``False`` if they are
+                 already up-to-date
+        :rtype: bool
+
+        The JSON index is written first, then the version file, both
+        atomically (see :func:`save_atomic`).
+        """
+        version = document.version
+        if version == self.get_exported_version():
+            return False
+
+        save_atomic(self.filename, document.render('json'))
+        save_atomic(self.version_filename, [version, '\n'])
+        self._version = version
+
+        return True
@@ -0,0 +1,135 @@
+"""Hedged publishing: several publishers at once."""
+import asyncio
+import collections
+import time
+
+from sopel.tools import get_logger
+
+from sopel_help import providers
+from sopel_help.errors import PublishingError, RetryablePublishingError
+
+LOGGER = get_logger('help')
+
+
+class HedgedPublisher(providers.AbstractPublisher):
+    """Publishing provider using several publishers at once.
+
+    This provider sends the content to every publisher listed by the setting
+    ``help.hedged_outputs`` at the same time (``0x0`` and ``clbin`` by
+    default), and uses the first URL it gets. The other publishers are
+    ignored: their results (or their errors) are discarded.
+
+    Any error of a publisher (not only a :exc:`PublishingError`) counts as
+    this publisher's failure: a :exc:`PublishingError` is raised only when
+    every publisher failed.
+
+    The publishers race as coroutines (see
+    :meth:`~sopel_help.providers.AbstractPublisher.publish_document_async`)
+    on the manager's event loop: the race itself doesn't use a thread.
+
+    The winner is recorded in :attr:`wins` and in the
+    :class:`~sopel_help.managers.Manager`'s health records, and publishers
+    with an open circuit are not used until they recover.
+    """
+    def __init__(self):
+        super().__init__()
+        self.publishers = []
+        self.wins = collections.Counter()
+
+    def setup(self, bot):
+        if self.manager is None:
+            raise RuntimeError('Hedged publisher requires a manager.')
+
+        self.publishers = []
+        for name in self.get_settings(bot).hedged_outputs:
+            publisher = self.manager.load_provider(name)
+            if not isinstance(publisher, providers.AbstractPublisher):
+                raise RuntimeError(
+                    'Help provider %r is not a publisher' % name)
+            publisher.manager = self.manager
+            publisher.settings = self.settings
+            publisher.setup(bot)
+            self.publishers.append((name, publisher))
+
+    def configure(self, settings):
+        """Configure the bot's settings for this provider.
+
+        Allow the user to configure ``help.hedged_outputs``.
+        """
+        settings.help.configure_setting(
+            'hedged_outputs',
+            'Which publishers should be used at the same time?'
+        )
+
+    def get_publishers(self):
+        """Get the publishers to use, as a list of ``(name, publisher)``.
+
+        Publishers with an open circuit are skipped, unless none of them is
+        available.
+        """
+        available = [
+            (name, publisher)
+            for name, publisher in self.publishers
+            if self.manager.get_health(name).available()
+        ]
+        return available or list(self.publishers)
+
+    async def _timed_publish(self, publisher, bot, trigger, content):
+        start = time.monotonic()
+        try:
+            document = await publisher.publish_document_async(
+                bot, trigger, content)
+        except PublishingError as error:
+            return None, error, time.monotonic() - start
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.exception('Unexpected error from a hedged publisher')
+            return None, error, time.monotonic() - start
+        return document, None, time.monotonic() - start
+
+    def publish(self, bot, trigger, content):
+        url, _ = self.publish_document(bot, trigger, content)
+        return url
+
+    def publish_document(self, bot, trigger, content):
+        return self.run_coroutine(
+            self.publish_document_async(bot, trigger, content))
+
+    async def publish_document_async(self, bot, trigger, content):
+        publishers = self.get_publishers()
+        if not publishers:
+            raise PublishingError('No publisher to use')
+
+        errors = []
+        # each task keeps the publishing deadline (if any) of this context
+        tasks = {
+            asyncio.ensure_future(
+                self._timed_publish(publisher, bot, trigger, content)): name
+            for name, publisher in publishers
+        }
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    document, error, latency = task.result()
+
+                    if error is None:
+                        self.manager.get_health(name).record_success(latency)
+                        self.wins[name] += 1
+                        LOGGER.debug('Hedged publishing won by %r', name)
+                        return document
+
+                    self.manager.get_health(name).record_failure(latency)
+                    errors.append(error)
+        finally:
+            # don't wait for the losers: their results are ignored
+            for task in pending:
+                task.cancel()
+
+        error_class = PublishingError
+        if all(isinstance(err, RetryablePublishingError) for err in errors):
+            error_class = RetryablePublishingError
+        raise error_class('All publishers failed')
@@ -1,34 +1,274 @@
 """Sopel Help Managers."""
+import itertools
+import threading
+import time
 
 import importlib_metadata
+from sopel.tools import Identifier, get_logger
 
+from sopel_help import caches
+from sopel_help.aio import EventLoopThread
+from sopel_help.providers import PublishingError
+from sopel_help.scheduler import HelpScheduler
+from sopel_help.settings import HelpSettings
+from sopel_help.stats import HelpStats
+
+LOGGER = get_logger('help')
 PROVIDERS_ENTRY_POINT = 'sopel_help.providers'
+FALLBACK_PROVIDER = 'base'
+
+
+def split_provider_names(value):
+    """Split a comma-separated list of provider names.
+
+    :param str value: provider names, such as ``0x0, clbin``
+    :return: the list of names, in order, without duplicates
+    :rtype: list
+    """
+    names = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def split_channel_output(value):
+    """Split a channel's provider chain into the channel and provider names.
+
+    :param str value: channel and provider names, such as ``#channel:local``
+    :return: a 2-value tuple with (channel, list of names)
+    :rtype: tuple
+    :raise ValueError: when there is no channel or no provider name
+    """
+    channel, _, names = value.rpartition(':')
+    channel = channel.strip()
+    names = split_provider_names(names)
+    if not channel or not names:
+        raise ValueError(
+            'Invalid channel output %r: use "#channel:provider"' % value)
+    return channel, names
+
+
+class ProviderHealth:
+    """Health of a provider: successes, failures, and latency.
+
+    :param str name: name of the provider
+
+    This implements a basic circuit breaker: after
+    :attr:`FAILURE_THRESHOLD` consecutive failures the circuit is open, and
+    the provider is not :meth:`available` until :attr:`RECOVERY_TIMEOUT`
+    seconds have passed. Then one attempt is allowed (half-open circuit): a
+    success closes the circuit, and a failure opens it again.
+
+    While this attempt is running, the provider is not available to other
+    callers. If the attempt never records its result, another one is allowed
+    after :attr:`RECOVERY_TIMEOUT` seconds.
+    """
+    FAILURE_THRESHOLD = 3
+    """Number of consecutive failures that open the circuit."""
+    RECOVERY_TIMEOUT = 300
+    """Number of seconds before an open circuit allows a new attempt."""
+    LATENCY_SMOOTHING = 0.3
+    """Weight of the last measure in the average latency."""
+
+    def __init__(self, name):
+        self.name = name
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None
+        self.opened_at = None
+        self.probed_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Tell if the circuit is open (i.e. the provider is failing)."""
+        return self.opened_at is not None
+
+    def available(self, now=None):
+        """Tell if the provider can be used.
+
+        :param float now: current monotonic time (optional)
+        :rtype: bool
+
+        When the circuit is half-open, only the first caller gets ``True``:
+        it must then record the result of its attempt.
+        """
+        if self.opened_at is None:
+            return True
+
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            opened_at = self.opened_at
+            if opened_at is None:
+                return True
+
+            if now - opened_at < self.RECOVERY_TIMEOUT:
+                return False
+
+            probed_at = self.probed_at
+            if (probed_at is not None and
+                    now - probed_at < self.RECOVERY_TIMEOUT):
+                # another caller is already trying
+                return False
+
+            self.probed_at = now
+            return True
+
+    def _update_latency(self, latency):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_SMOOTHING * (latency - self.latency)
+
+    def record_success(self, latency):
+        """Record a success and close the circuit.
+
+        :param float latency: time taken by the provider, in seconds
+        """
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probed_at = None
+            self._update_latency(latency)
+
+    def record_failure(self, latency, now=None):
+        """Record a failure, and open the circuit if required.
+
+        :param float latency: time taken by the provider, in seconds
+        :param float now: current monotonic time (optional)
+        """
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._update_latency(latency)
+
+            if (self.opened_at is not None or
+                    self.consecutive_failures >= self.FAILURE_THRESHOLD):
+                # open the circuit, or open it again after a failed attempt
+                self.opened_at = time.monotonic() if now is None else now
+                self.probed_at = None
 
 
 class Manager:
-    """Manager of the Help provider."""
+    """Manager of the Help provider.
+
+    The manager keeps a pool of providers, each set up once, and a chain of
+    providers for each channel with its own ``help.channel_outputs``: picking
+    the chain of a help command (see :meth:`get_chain`) is a dict lookup.
+
+    The manager keeps the statistics of the help commands in its ``stats``
+    attribute (see :class:`~sopel_help.stats.HelpStats`): the help of the
+    most requested commands is pre-rendered by the providers when their
+    content is refreshed.
+
+    The manager also owns the event loop of the providers' coroutines, as a
+    :class:`~sopel_help.aio.EventLoopThread` in its ``loop`` attribute: the
+    loop is started the first time a coroutine is submitted.
+    """
     @property
     def provider(self):
-        """Help provider."""
+        """Help provider.
+
+        This is the first provider of the chain set by ``help.output``.
+        """
         if self._provider is None:
             raise RuntimeError('Help provider is not configured yet.')
         return self._provider
 
+    @property
+    def providers(self):
+        """Chain of help providers, as a list of ``(name, provider)``.
+
+        The chain always ends with the ``base`` provider.
+        """
+        if self._provider is None:
+            raise RuntimeError('Help provider is not configured yet.')
+        return list(self._providers.items())
+
+    @property
+    def pool(self):
+        """Pool of set up providers, as a map of (name, provider)."""
+        return dict(self._pool)
+
     @property
     def provider_names(self):
         """Names of the available providers."""
-        if self._provider_list is None:
-            entry_points = importlib_metadata.entry_points(
-                group=PROVIDERS_ENTRY_POINT)
-            self._provider_list = [
-                entry_point.name
-                for entry_point in entry_points
-            ]
-        return self._provider_list
+        return list(self.get_registry().keys())
 
     def __init__(self):
+        self.settings = None
         self._provider = None
-        self._provider_list = None
+        self._providers = {}
+        self._pool = {}
+        self._channel_chains = {}
+        self._health = {}
+        self._registry = None
+        self._provider_classes = {}
+        self._registry_lock = threading.Lock()
+        self.loop = EventLoopThread()
+        self.stats = HelpStats()
+        self.scheduler = HelpScheduler()
+
+    def get_registry(self):
+        """Get the registry of provider entry points.
+
+        :return: a map of (name, entry point)
+        :rtype: dict
+
+        The registry is built once, the first time it is required, by walking
+        the installed distributions' metadata. Use :meth:`refresh` to discard
+        it and build it again (e.g. after installing a new provider).
+        """
+        registry = self._registry
+        if registry is None:
+            with self._registry_lock:
+                if self._registry is None:
+                    entry_points = importlib_metadata.entry_points(
+                        group=PROVIDERS_ENTRY_POINT)
+                    self._registry = {
+                        entry_point.name: entry_point
+                        for entry_point in entry_points
+                    }
+                registry = self._registry
+        return registry
+
+    def refresh(self):
+        """Discard the registry of providers and their loaded classes.
+
+        The registry will be built again the next time it is required.
+        """
+        with self._registry_lock:
+            self._registry = None
+            self._provider_classes = {}
+
+    def get_provider_class(self, name):
+        """Get the provider class (or factory) registered as ``name``.
+
+        :param str name: name of the provider
+        :return: the provider's class
+        :raise RuntimeError: when there is no such provider
+
+        The entry point is loaded only once; its result is then memoized until
+        the next :meth:`refresh`.
+        """
+        try:
+            return self._provider_classes[name]
+        except KeyError:
+            pass
+
+        try:
+            entry_point = self.get_registry()[name]
+        except KeyError:
+            raise RuntimeError('Cannot find help provider %r' % name) from None
+
+        provider_maker = entry_point.load()
+        self._provider_classes[name] = provider_maker
+
+        return provider_maker
 
     def load_provider(self, name):
         """Load provider from a name.
@@ -40,50 +280,259 @@ class Manager:
         The provider will be loaded from an entry point and then instantiated
         to be returned as is (no setup, no configure).
         """
-        # 1. get EntryPoints matching the group and name
-        entry_points = importlib_metadata.entry_points(
-            group=PROVIDERS_ENTRY_POINT, name=name)
+        provider_maker = self.get_provider_class(name)
 
-        # 2. get just the EntryPoint matching `name`
-        try:
-            entry_point = entry_points[name]
-        except KeyError:
-            raise RuntimeError('Cannot find help provider %r' % name) from None
+        return provider_maker()
 
-        # 3. load the entry point
-        provider_maker = entry_point.load()
+    def get_provider_chain(self, settings):
+        """Get the names of the providers to use, in order.
 
-        return provider_maker()
+        :param settings: the bot's settings
+        :return: the list of provider names, ending with ``base``
+        :rtype: list
+        """
+        return self.complete_chain(split_provider_names(settings.help.output))
+
+    def get_channel_chains(self, settings):
+        """Get the names of the providers to use in each channel, in order.
+
+        :param settings: the bot's settings
+        :return: a map of (channel, list of provider names, ending with
+                 ``base``)
+        :rtype: dict
+        """
+        chains = {}
+        for value in settings.help.channel_outputs:
+            channel, names = split_channel_output(value)
+            chains[Identifier(channel)] = self.complete_chain(names)
+        return chains
+
+    @staticmethod
+    def complete_chain(names):
+        """Complete a chain of provider names with the fallback provider.
+
+        :param list names: names of the providers
+        :return: the list of provider names, ending with ``base``
+        :rtype: list
+        """
+        names = list(names)
+        if FALLBACK_PROVIDER not in names:
+            names.append(FALLBACK_PROVIDER)
+        return names
+
+    def get_health(self, name):
+        """Get the health record of the provider ``name``.
+
+        :param str name: name of the provider
+        :rtype: :class:`ProviderHealth`
+        """
+        try:
+            return self._health[name]
+        except KeyError:
+            return self._health.setdefault(name, ProviderHealth(name))
 
     def setup(self, bot):
         """Setup the manager from the bot's settings.
 
-        The goal of the setup phase is to fetch the right provider based on the
-        settings provided, load the entry point, setup the provider, and store
-        it so :attr:`provider` is available.
+        The goal of the setup phase is to fetch the right providers based on
+        the settings provided, load their entry points, setup the providers,
+        and store them so :attr:`provider` and :attr:`providers` are
+        available.
+
+        Each provider is set up only once, even when it is in the chain of
+        several channels.
+
+        The help settings are parsed once, into a snapshot shared by all the
+        providers (see :class:`~sopel_help.settings.HelpSettings`). Use
+        :meth:`refresh_settings` to take a new snapshot.
         """
-        # 1. get bot's settings's help section's "provider" option
-        name = bot.settings.help.output
+        # 1. get bot's settings's help section's "provider" options
+        names = self.get_provider_chain(bot.settings)
+        channel_chains = self.get_channel_chains(bot.settings)
 
-        # 2. load the proper provider
-        provider = self.load_provider(name)
+        # 2. load the proper providers, or reuse the ones already loaded
+        pool = {}
+        for name in itertools.chain(names, *channel_chains.values()):
+            if name not in pool:
+                provider = self._pool.get(name)
+                if provider is None:
+                    provider = self.load_provider(name)
+                pool[name] = provider
 
-        # 3. setup the provider
-        provider.setup(bot)
+        # 3. setup the providers, with a snapshot of the settings
+        settings = HelpSettings.from_section(bot.settings.help)
+        updated = []
+        try:
+            for provider in pool.values():
+                updated.append(provider)
+                provider.manager = self
+                provider.settings = settings
+                provider.setup(bot)
+        except Exception:
+            self._restore_providers(bot, updated)
+            raise
 
-        # 4. store it
-        self._provider = provider
+        # 4. store them
+        self.settings = settings
+        if settings.drip_rate > 0:
+            self.scheduler.rate = settings.drip_rate
+        if settings.cache_max_bytes > 0:
+            caches.registry.budget = settings.cache_max_bytes
+        self._pool = pool
+        self._channel_chains = {
+            channel: [(name, pool[name]) for name in chain]
+            for channel, chain in channel_chains.items()
+        }
+        self._providers = {name: pool[name] for name in names}
+        self._provider = pool[names[0]]
+
+    def _restore_providers(self, bot, providers):
+        # set up the providers of the current pool again with the current
+        # settings; the other providers are not used, so they are left as-is
+        current = set(map(id, self._pool.values()))
+        for provider in providers:
+            if id(provider) not in current:
+                continue
+            provider.settings = self.settings
+            try:
+                provider.setup(bot)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('Cannot restore help provider %r', provider)
+
+    def refresh_settings(self, bot):
+        """Take a new snapshot of the settings, and set up the providers.
+
+        :param bot: Sopel bot
+        :raise ValueError: when a setting is invalid
+        :raise RuntimeError: when a provider can't be found
+
+        Providers already in the pool are set up again with the new settings,
+        and keep their state (such as the URLs they published). On error, the
+        current settings and providers are kept: the providers already set up
+        with the new settings are set up again with the current ones.
+        """
+        self.setup(bot)
+
+    def get_chain(self, trigger):
+        """Get the chain of providers for a ``trigger``.
+
+        :param trigger: Trigger line
+        :type: :class:`sopel.trigger.Trigger`
+        :return: the list of ``(name, provider)`` to use, in order
+
+        This is the chain of the trigger's channel if it has one (see
+        ``help.channel_outputs``), or the default chain (see
+        :attr:`providers`) otherwise.
+        """
+        chain = self._channel_chains.get(trigger.sender)
+        if chain is None:
+            return self.providers
+        return chain
+
+    def get_provider(self, trigger):
+        """Get the provider for a ``trigger``.
+
+        :param trigger: Trigger line
+        :type: :class:`sopel.trigger.Trigger`
+        :return: the first provider of the trigger's chain (see
+                 :meth:`get_chain`)
+        """
+        return self.get_chain(trigger)[0][1]
 
     def configure(self, settings):
-        """Configure the provider from the settings."""
+        """Configure the providers from the settings."""
         # 1. get settings's help section's "provider" option
-        name = settings.help.output
+        for name in self.get_provider_chain(settings):
+            # 2. load the proper provider
+            provider = self.load_provider(name)
+            provider.manager = self
+
+            # 3. configure it
+            provider.configure(settings)
+
+    def refresh_content(self, bot):
+        """Refresh the content of the help provider in the background.
+
+        :param bot: Sopel bot
+
+        The first provider of each chain (the default one, and the ones of
+        ``help.channel_outputs``) is refreshed. Errors are logged, not raised:
+        the content will be generated again when required by a help command.
+
+        These providers also pre-render the help of the
+        ``help.pinned_replies`` most requested commands (see
+        :meth:`~sopel_help.providers.AbstractProvider.pin_help_commands`).
+        """
+        chains = [self.providers] + list(self._channel_chains.values())
+        commands = self.stats.get_top_commands(self.settings.pinned_replies)
+        names = []
+        for chain in chains:
+            name, provider = chain[0]
+            if name in names:
+                continue
+            names.append(name)
+
+            provider.pin_help_commands(bot, commands)
+            try:
+                provider.refresh_content(bot)
+            except PublishingError:
+                LOGGER.warning(
+                    'Cannot refresh help content of %r; '
+                    'will try again later.', name)
+
+    def help_commands(self, bot, trigger):
+        """Generate help for all commands, falling back down the chain.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+
+        This is the synchronous adapter of :meth:`help_commands_async`: it
+        runs the coroutine on the manager's event loop, and waits for it.
+        """
+        self.loop.run(self.help_commands_async(bot, trigger))
+
+    async def help_commands_async(self, bot, trigger):
+        """Coroutine version of :meth:`help_commands`.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+
+        Each provider of the trigger's chain (see :meth:`get_chain`) is tried
+        in order, skipping the ones with an open circuit (see
+        :class:`ProviderHealth`), until one of them doesn't raise a
+        :exc:`~sopel_help.providers.PublishingError`. The last provider is
+        always tried, and its error is not caught.
+
+        Each provider's coroutine (see
+        :meth:`~sopel_help.providers.AbstractProvider.help_commands_async`)
+        runs on the manager's event loop.
+        """
+        chain = self.get_chain(trigger)
+        last_name = chain[-1][0]
 
-        # 2. load the proper provider
-        provider = self.load_provider(name)
+        for name, provider in chain:
+            health = self.get_health(name)
+            if name != last_name and not health.available():
+                LOGGER.debug('Skipping help provider %r (circuit open)', name)
+                continue
 
-        # 3. configure it
-        provider.configure(settings)
+            start = time.monotonic()
+            try:
+                await provider.help_commands_async(bot, trigger)
+            except PublishingError:
+                health.record_failure(time.monotonic() - start)
+                if name == last_name:
+                    raise
+                LOGGER.warning(
+                    'Help provider %r failed; falling back to the next one',
+                    name)
+            else:
+                health.record_success(time.monotonic() - start)
+                return
 
 
 manager = Manager()  # pylint: disable=invalid-name
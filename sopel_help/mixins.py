@@ -1,32 +1,55 @@
 """Mixins for providers."""
-import html
-import textwrap
+import asyncio
+import threading
+import time
+
+from sopel_help import caches, documents, privileges, wrapping
 
 
 class PlainTextGeneratorMixin:
     """Generator Mixin of plain text."""
     DEFAULT_WRAP_WIDTH = 70
+    DEFAULT_WRAP_UNIT = wrapping.BYTES
+    """Unit of the wrap width: lines are sent to IRC, limited in bytes."""
 
     def get_wrap_width(self):
         """Get wrap width parameter."""
         return self.DEFAULT_WRAP_WIDTH
 
+    def get_wrap_unit(self):
+        """Get wrap unit parameter (see :data:`sopel_help.wrapping.UNITS`)."""
+        return self.DEFAULT_WRAP_UNIT
+
     def generate_help_commands(self, command_groups):
         """Generate help messages for a set of commands.
 
         :param dict command_groups: map of (category, commands)
-        :return: generator of help text for each command group
+        :return: help text for each command group
         """
-        name_length = max(6, max(len(k) for k in command_groups.keys()))
-        indent = ' ' * (name_length + 2)
+        document = documents.get_document(command_groups)
+        return document.render(
+            'text',
+            width=self.get_wrap_width(),
+            unit=self.get_wrap_unit())
 
-        for category, commands in sorted(command_groups.items()):
-            # adjust category label to the max length
-            label = category.upper().ljust(name_length)
-            text = '  '.join([label] + sorted(set(commands)))
-            text_wrapped = textwrap.wrap(
-                text, width=self.get_wrap_width(), subsequent_indent=indent)
-            yield '\n'.join(text_wrapped)
+    def generate_help_category(self, command_groups, category):
+        """Generate help lines for one category of commands.
+
+        :param dict command_groups: map of (category, commands)
+        :param str category: name of the category (case-insensitive)
+        :return: the lines of help for this category, or ``None`` if there
+                 is no such category
+        :rtype: list
+        """
+        document = documents.get_document(command_groups)
+        block = document.get_category_block(
+            category,
+            'text',
+            width=self.get_wrap_width(),
+            unit=self.get_wrap_unit())
+        if block is None:
+            return None
+        return block.splitlines()
 
     def generate_help_command(self, command, docs, examples):
         """Generate help message with head, body, and usage examples.
@@ -58,6 +81,99 @@ class PlainTextGeneratorMixin:
 
         return head.strip(), body, usages
 
+    def generate_help_batch(self, names, heads, ignored):
+        """Generate one line of help per command of a batch.
+
+        :param list names: names of the commands, in order
+        :param dict heads: map of (command, head of its help)
+        :param list ignored: names ignored, over the batch's limit
+        :return: list of entries
+        :rtype: list
+
+        A command is summed up by the head of its help, such as
+        ``seen: Reports when a user was last seen.``.
+        """
+        entries = [
+            '%s: %s' % (name, heads[name])
+            if name in heads else 'Unknown command "%s"' % name
+            for name in names
+        ]
+        if ignored:
+            entries.append('Too many commands; ignored: %s' % ', '.join(
+                ignored))
+        return entries
+
+
+class PrivilegeViewsMixin:
+    """Mixin for the listing of commands of each privilege tier.
+
+    With ``help.privilege_filter`` enabled (the default), the list of
+    commands depends on the user's privilege tier (see
+    :mod:`sopel_help.privileges`), unless :attr:`FILTER_PRIVILEGES` is
+    ``False``. Each tier is a view of the help content.
+
+    This mixin requires the :meth:`get_settings` method of
+    :class:`~sopel_help.providers.AbstractProvider`.
+    """
+    FILTER_PRIVILEGES = True
+    """Whether this provider lists only the commands of the user's tier."""
+
+    def has_privilege_filter(self, bot):
+        """Tell if the list of commands depends on the user's privileges.
+
+        :param bot: Sopel bot
+        :rtype: bool
+        """
+        return (
+            self.FILTER_PRIVILEGES and self.get_settings(bot).privilege_filter)
+
+    def get_views(self, bot):
+        """Get the listing of commands of each view of the help content.
+
+        :param bot: Sopel bot
+        :return: list of ``(view, command groups)``
+        :rtype: list
+
+        Without privilege filtering, there is only one view, ``None``, with
+        all the commands.
+        """
+        if not self.has_privilege_filter(bot):
+            return [(None, bot.command_groups)]
+
+        return privileges.get_views(
+            bot, self.get_settings(bot).command_privileges).items()
+
+    def get_view(self, bot, trigger):
+        """Get the view of the help content for a ``trigger``.
+
+        :param bot: Sopel bot
+        :param trigger: Trigger line
+        :return: the user's privilege tier, or ``None`` without privilege
+                 filtering
+        """
+        if not self.has_privilege_filter(bot):
+            return None
+
+        return privileges.get_trigger_tier(bot, trigger)
+
+    def get_command_groups(self, bot, trigger):
+        """Get the commands to list for a ``trigger``.
+
+        :param bot: Sopel bot
+        :param trigger: Trigger line
+        :return: map of (category, commands)
+        :rtype: dict
+
+        The listing of each view is computed once and cached (see
+        :func:`sopel_help.privileges.get_views`).
+        """
+        view = self.get_view(bot, trigger)
+        if view is None:
+            return bot.command_groups
+
+        return privileges.get_views(
+            bot, self.get_settings(bot).command_privileges).get(view)
+
 
 class HTMLGeneratorMixin(PlainTextGeneratorMixin):
     """Generator Mixin of HTML text."""
@@ -65,23 +181,356 @@ class HTMLGeneratorMixin(PlainTextGeneratorMixin):
         """Generate help messages for a set of commands.
 
         :param dict command_groups: map of (category, commands)
-        :return: generator of help text for each command group
-        """
-        for category, commands in sorted(command_groups.items()):
-            # adjust category label to the max length
-
-            title = html.escape(category)
-            anchor = 'plugin-%s' % title.lower()
-
-            lines = [
-                '<h2 id="{anchor}">'
-                '<a href="#{anchor}">{title}</a>'
-                '</h2>'.format(anchor=anchor, title=title.upper()),
-                '<ul>'
-            ] + [
-                '<li>%s</li>' % html.escape(command)
-                for command in sorted(set(commands))
-            ] + [
-                '</ul>'
-            ]
-            yield ''.join(lines)
+        :return: help text for each command group
+        """
+        document = documents.get_document(command_groups)
+        return document.render('html')
+
+
+class ChunkedPublishingMixin:
+    """Publishing Mixin that splits large content into chunks.
+
+    This mixin requires the methods of
+    :class:`~sopel_help.providers.AbstractPublisher` to sign and to publish
+    content. Each chunk is published on its own, and an index document links
+    to all of them.
+    """
+    DEFAULT_CHUNK_WORKERS = 4
+    """Maximum number of chunks uploaded at once."""
+    MAX_CONTENT_SIZE = None
+    """Maximum size of a document for the service, in bytes (if known)."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunk_cache = {}
+
+    def get_max_content_size(self, bot):
+        """Get the maximum size of a document, in bytes.
+
+        :param bot: Sopel bot
+        :return: the maximum size, or ``None`` if there is no limit
+        :rtype: int
+
+        The setting ``help.publish_max_size`` overrides the service's limit
+        (:attr:`MAX_CONTENT_SIZE`).
+        """
+        max_size = self.get_settings(bot).publish_max_size
+        return max_size or self.MAX_CONTENT_SIZE
+
+    def split_chunks(self, lines, max_size):
+        """Split help ``lines`` into documents of at most ``max_size`` bytes.
+
+        :param list lines: lines of help, one per group of commands
+        :param int max_size: maximum size of a chunk, in bytes
+        :return: list of chunks, as rendered text documents
+        :rtype: list
+
+        Groups of commands are kept together as much as possible. A group too
+        large for a chunk is split between its lines.
+        """
+        group_separator = self.group_separator
+        chunks = []
+        parts = []
+        size = 0
+
+        def blocks():
+            for line in lines:
+                if len(line.encode('utf-8')) <= max_size:
+                    yield line, group_separator
+                    continue
+                # the group is too large: split it between its lines
+                separator = group_separator
+                for subline in line.split('\n'):
+                    yield subline, separator
+                    separator = '\n'
+
+        for block, separator in blocks():
+            block_size = len(block.encode('utf-8'))
+            needed = block_size
+            if parts:
+                needed += len(separator.encode('utf-8'))
+            if parts and size + needed > max_size:
+                chunks.append(''.join(parts))
+                parts = []
+                size = 0
+                needed = block_size
+
+            if parts:
+                parts.append(separator)
+            parts.append(block)
+            size += needed
+
+        if parts:
+            chunks.append(''.join(parts))
+
+        return chunks
+
+    def render_index(self, bot, trigger, urls):
+        # pylint: disable=unused-argument
+        """Render the index document that links to each chunk.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param list urls: URL of each chunk
+        :return: the index document
+        :rtype: str
+        """
+        total = len(urls)
+        return '\n'.join(
+            'Part %d/%d: %s' % (index, total, url)
+            for index, url in enumerate(urls, start=1)
+        )
+
+    async def publish_chunk_async(self, bot, trigger, chunk, date):
+        """Publish one chunk of help, or reuse its cached URL.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str chunk: Content of the chunk
+        :param date: date of the cache signature
+        :type date: :class:`datetime.date`
+        :return: a 2-value tuple with (signature, document), where document
+                 is a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        """
+        signature = self.make_cache_signature(bot, chunk, date)
+        document = self._chunk_cache.get(signature)
+        if document is not None:
+            _, expires_at = document
+            if expires_at is None or expires_at - time.time() > (
+                    self.DEFAULT_EXPIRY_MARGIN):
+                return signature, document
+
+        return signature, await self.get_or_publish_async(
+            bot, trigger, chunk, signature)
+
+    def publish_chunks(self, bot, trigger, chunks, date):
+        """Publish chunks of help in parallel, then their index.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param list chunks: Content of each chunk
+        :param date: date of the cache signature
+        :type date: :class:`datetime.date`
+        :return: a 2-value tuple with (URL of the index, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when a chunk can't be published
+
+        This is the synchronous adapter of :meth:`publish_chunks_async`.
+        """
+        return self.run_coroutine(
+            self.publish_chunks_async(bot, trigger, chunks, date))
+
+    async def publish_chunks_async(self, bot, trigger, chunks, date):
+        """Coroutine version of :meth:`publish_chunks`.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param list chunks: Content of each chunk
+        :param date: date of the cache signature
+        :type date: :class:`datetime.date`
+        :return: a 2-value tuple with (URL of the index, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when a chunk can't be published
+
+        The chunks are uploaded concurrently on the event loop, at most
+        :attr:`DEFAULT_CHUNK_WORKERS` at once. Chunks whose content didn't
+        change since the last time are not published again. The index
+        expires with the first chunk to expire.
+        """
+        semaphore = asyncio.Semaphore(self.DEFAULT_CHUNK_WORKERS)
+
+        async def publish(chunk):
+            async with semaphore:
+                return await self.publish_chunk_async(
+                    bot, trigger, chunk, date)
+
+        results = await asyncio.gather(*[publish(chunk) for chunk in chunks])
+
+        # keep only the last chunks: they are the ones likely to be reused
+        self._chunk_cache = dict(results)
+
+        index = self.render_index(
+            bot, trigger, [url for _, (url, _) in results])
+        index_signature = self.make_cache_signature(bot, index, date)
+        url, expires_at = await self.get_or_publish_async(
+            bot, trigger, index, index_signature)
+
+        expiries = [
+            value
+            for value in [expires_at] + [
+                chunk_expiry for _, (_, chunk_expiry) in results]
+            if value is not None
+        ]
+
+        return url, min(expiries) if expiries else None
+
+
+class PublishCacheMixin:
+    """Publishing Mixin that caches the URL of published content.
+
+    The cache has one slot per view of the help content (for example, one
+    per privilege tier; see :mod:`sopel_help.privileges`), so each view keeps
+    its own URL. Values are stored by signature: views with the same content
+    share the same value, and a value is dropped when no slot refers to it.
+
+    This mixin requires the :attr:`DEFAULT_EXPIRY_MARGIN`, the
+    :attr:`DEFAULT_LIVENESS_WINDOW`, and the :meth:`get_settings` method of
+    :class:`~sopel_help.providers.AbstractPublisher`.
+    """
+    def __init__(self):
+        super().__init__()
+        # map of (view, signature), and map of (signature, (value, expiry))
+        self._cache_slots = {}
+        self._pending_cache_slots = {}
+        self._cache_values = {}
+        self._cache_lock = threading.Lock()
+        self._shared_cache = None
+
+    def get_shared_cache(self, bot):
+        """Get the publish cache shared with other bot instances.
+
+        :param bot: Sopel bot
+        :return: the shared cache if ``help.publish_cache_file`` is set;
+                 ``None`` otherwise
+        :rtype: :class:`sopel_help.caches.SharedPublishCache`
+        """
+        filename = self.get_settings(bot).publish_cache_file
+        if not filename:
+            return None
+
+        shared_cache = self._shared_cache
+        if shared_cache is None or shared_cache.filename != filename:
+            shared_cache = caches.SharedPublishCache(filename)
+            self._shared_cache = shared_cache
+
+        return shared_cache
+
+    def get_cache_entry(self, view=None, pending=False):
+        """Get the cache entry of a ``view``.
+
+        :param view: view of the help content (optional)
+        :param bool pending: get the entry prepared ahead of time instead
+                             (optional)
+        :return: a 3-value tuple with (signature, value, expires_at)
+        :rtype: tuple
+        """
+        slots = self._pending_cache_slots if pending else self._cache_slots
+        signature = slots.get(view)
+        value, expires_at = self._cache_values.get(signature, (None, None))
+        return signature, value, expires_at
+
+    def _prune_cache(self):
+        # must be called with the cache lock
+        used = set(self._cache_slots.values())
+        used.update(self._pending_cache_slots.values())
+        for signature in set(self._cache_values) - used:
+            del self._cache_values[signature]
+
+    def _get_cache_entry(self, signature):
+        if signature is None:
+            return None
+
+        if signature in self._pending_cache_slots.values():
+            with self._cache_lock:
+                for view, pending in list(self._pending_cache_slots.items()):
+                    if pending == signature:
+                        self._cache_slots[view] = signature
+                        del self._pending_cache_slots[view]
+                self._prune_cache()
+
+        value = self._cache_values.get(signature)
+        if value is None:
+            return None
+
+        return (signature,) + value
+
+    def get_cached_value(self, signature, now=None):
+        """Get the cached value from the given ``signature``.
+
+        :param str signature: cache signature
+        :param float now: current timestamp (optional)
+        :return: the cached value if the signature is still valid;
+                 ``None`` otherwise
+
+        If the signature matches a value prepared ahead of time (see
+        :meth:`prepare_cache`), this value replaces the cached value of its
+        views.
+
+        A value that expires within :attr:`DEFAULT_EXPIRY_MARGIN` seconds is
+        not valid anymore.
+        """
+        cache_entry = self._get_cache_entry(signature)
+        if cache_entry is None:
+            return None
+
+        _, value, expires_at = cache_entry
+        now = time.time() if now is None else now
+        if expires_at is not None and expires_at - now <= (
+                self.DEFAULT_EXPIRY_MARGIN):
+            return None
+
+        return value
+
+    def get_cached_expiry(self, signature):
+        """Get the expiry of the cached value from the given ``signature``.
+
+        :param str signature: cache signature
+        :return: the timestamp at which the cached value expires, if known;
+                 ``None`` otherwise
+        :rtype: float
+        """
+        cache_entry = self._get_cache_entry(signature)
+        if cache_entry is None:
+            return None
+
+        return cache_entry[2]
+
+    def needs_liveness_check(self, bot, signature, url):
+        """Tell if a cached URL must be checked before it's sent.
+
+        :param bot: Sopel bot
+        :param str signature: cache signature of the content
+        :param str url: the cached URL (if any)
+        :rtype: bool
+
+        A URL is checked when ``help.publish_liveness_check`` is enabled and
+        the URL is close to its expiry (if known).
+        """
+        if not url or not self.get_settings(bot).publish_liveness_check:
+            return False
+
+        expires_at = self.get_cached_expiry(signature)
+        return expires_at is not None and expires_at - time.time() <= (
+            self.DEFAULT_LIVENESS_WINDOW)
+
+    def save_cache(self, signature, value, expires_at=None, view=None):
+        """Save the generated URL with its signature.
+
+        :param str signature: cache signature
+        :param str value: value to cache
+        :param float expires_at: timestamp at which the value expires
+                                 (optional)
+        :param view: view of the help content (optional)
+        """
+        with self._cache_lock:
+            self._cache_values[signature] = (value, expires_at)
+            self._cache_slots[view] = signature
+            self._prune_cache()
+
+    def prepare_cache(self, signature, value, expires_at=None, view=None):
+        """Save a URL generated ahead of time with its signature.
+
+        :param str signature: cache signature
+        :param str value: value to cache
+        :param float expires_at: timestamp at which the value expires
+                                 (optional)
+        :param view: view of the help content (optional)
+
+        The prepared value doesn't replace the cached value of its view until
+        it is requested with its signature (see :meth:`get_cached_value`).
+        """
+        with self._cache_lock:
+            self._cache_values[signature] = (value, expires_at)
+            self._pending_cache_slots[view] = signature
+            self._prune_cache()
@@ -0,0 +1,42 @@
+"""Outbound backlog of the bot, and the degraded modes of help replies."""
+import time
+
+SHORT_LIST = 'short-list'
+LINK = 'link'
+SHORT_REPLY = 'short-reply'
+
+MODES = (SHORT_LIST, LINK, SHORT_REPLY)
+"""Degraded modes of a help reply, when the bot is backed up.
+
+* ``short-list``: the list of commands is replaced by the list of categories
+* ``link``: the help is published, and the user gets a link instead
+* ``short-reply``: only the first line of the help is sent
+"""
+
+DEFAULT_WINDOW = 10
+"""Time window (in seconds) of the outbound backlog."""
+
+
+def get_backlog(bot, window=DEFAULT_WINDOW, now=None):
+    """Count the messages recently sent by the bot, to every recipient.
+
+    :param bot: Sopel bot
+    :param int window: time window, in seconds
+    :param float now: current timestamp (optional)
+    :return: the number of messages sent in the last ``window`` seconds
+    :rtype: int
+
+    The messages are taken from the bot's flood protection stack, which
+    keeps the last messages sent to each recipient. The stack's lock is not
+    acquired, as it is held while the bot waits to send: a bot that doesn't
+    keep such a stack has no backlog.
+    """
+    now = time.time() if now is None else now
+    since = now - window
+    stacks = list((getattr(bot, 'stack', None) or {}).values())
+    return sum(
+        1
+        for stack in stacks
+        for sent_at, _ in list(stack.get('messages', ()))
+        if sent_at >= since
+    )
@@ -1,9 +1,18 @@
 """Sopel Help plugin"""
 from sopel import plugin
+from sopel.tools import get_logger
 
-from sopel_help import config, providers
+from sopel_help import caches, config, providers, replies, stats
 from sopel_help.managers import manager
 
+LOGGER = get_logger('help')
+REFRESH_INTERVAL = 600
+"""Interval (in seconds) between refreshes of the help content."""
+STATS_INTERVAL = 3600
+"""Interval (in seconds) between dumps of the help statistics."""
+STATS_LIMIT = 10
+"""Number of commands shown by the help statistics."""
+
 
 def setup(bot):
     """Setup plugin."""
@@ -11,6 +20,12 @@ def setup(bot):
     manager.setup(bot)
 
 
+def shutdown(bot):  # pylint: disable=unused-argument
+    """Shutdown plugin."""
+    manager.loop.stop()
+    manager.scheduler.stop()
+
+
 def configure(settings):
     """Configure plugin."""
     settings.define_section('help', config.HelpSection)
@@ -36,16 +51,121 @@ def configure(settings):
     manager.configure(settings)
 
 
+def _log_help_error(future):
+    if future.cancelled() or future.exception() is None:
+        return
+
+    error = future.exception()
+    LOGGER.error(
+        'Cannot send help for all commands: %s', error,
+        exc_info=(type(error), error, error.__traceback__))
+
+
 @plugin.commands('help', 'h')
 @plugin.example('.help', user_help=True)
 @plugin.example('.help help', user_help=True)
 def sopel_help(bot, trigger):
     """Generate help for Sopel's commands."""
-    if trigger.group(2):
+    names = replies.split_command_names(trigger.group(2) or '')
+    if names == ['stop'] and manager.scheduler.pending(trigger.nick):
+        dropped = manager.scheduler.cancel(trigger.nick)
+        bot.reply('Stopped sending help (%d lines dropped).' % dropped)
+    elif len(names) > 1:
+        provider = manager.get_provider(trigger)
+        commands, unknown = provider.help_command_batch(bot, trigger, names)
+        for name in commands:
+            manager.stats.record_lookup(name)
+        for name in unknown:
+            manager.stats.record_miss(name)
+    elif names:
+        provider = manager.get_provider(trigger)
+        name = names[0]
         try:
-            manager.provider.help_command(bot, trigger, trigger.group(2))
+            command = provider.help_command(bot, trigger, name)
         except providers.UnknownCommand as error:
-            reply, recipient = manager.provider.get_reply_method(bot, trigger)
+            manager.stats.record_miss(name)
+            reply, recipient = provider.get_reply_method(bot, trigger)
             reply(str(error), recipient)
+        else:
+            # categories are not pinned: only commands are counted
+            if command is not None:
+                manager.stats.record_lookup(command)
+    elif manager.settings.publish_async:
+        # don't wait for the publishers: errors are logged
+        future = manager.loop.submit(manager.help_commands_async(bot, trigger))
+        future.add_done_callback(_log_help_error)
     else:
-        manager.provider.help_commands(bot, trigger)
+        manager.help_commands(bot, trigger)
+
+
+@plugin.event('QUIT')
+@plugin.rule('.*')
+@plugin.thread(False)
+@plugin.unblockable
+def help_quit(bot, trigger):  # pylint: disable=unused-argument
+    """Drop the help lines scheduled for a user who quits."""
+    manager.scheduler.cancel(trigger.nick)
+
+
+@plugin.commands('helpreload')
+@plugin.example('.helpreload', owner=True, user_help=True)
+@plugin.require_owner
+def help_reload(bot, trigger):  # pylint: disable=unused-argument
+    """Reload the help settings and set up the help providers again."""
+    try:
+        manager.refresh_settings(bot)
+    except (ValueError, RuntimeError) as error:
+        bot.reply('Cannot reload the help settings: %s' % error)
+        return
+
+    bot.reply('Help settings reloaded.')
+
+
+def _get_stats_lines():
+    return [
+        'Most requested commands: %s' % stats.format_counts(
+            manager.stats.lookups.most_common(STATS_LIMIT)),
+        'Most requested unknown commands: %s' % stats.format_counts(
+            manager.stats.misses.most_common(STATS_LIMIT)),
+        'Downgraded replies: %s' % stats.format_counts(
+            manager.stats.downgrades.most_common(STATS_LIMIT)),
+    ]
+
+
+@plugin.commands('helpstats')
+@plugin.example('.helpstats', owner=True, user_help=True)
+@plugin.require_owner
+def help_stats(bot, trigger):
+    """Show the most requested commands, the unknown ones, and downgrades.
+
+    Counts decay over time: recent requests count more than old ones.
+    """
+    for line in _get_stats_lines():
+        bot.say(line, trigger.nick)
+
+
+@plugin.commands('helpcaches')
+@plugin.example('.helpcaches', owner=True, user_help=True)
+@plugin.require_owner
+def help_caches(bot, trigger):
+    """Show the size, hit rate, and evictions of each help cache."""
+    bot.say(
+        'Help caches: %s of %s' % (
+            caches.format_size(caches.registry.size),
+            caches.format_size(caches.registry.budget)),
+        trigger.nick)
+    for cache_stats in caches.registry.get_stats():
+        bot.say(caches.format_stats(cache_stats), trigger.nick)
+
+
+@plugin.interval(STATS_INTERVAL)
+def dump_help_stats(bot):  # pylint: disable=unused-argument
+    """Log the help statistics."""
+    for line in _get_stats_lines():
+        LOGGER.info(line)
+
+
+@plugin.interval(REFRESH_INTERVAL)
+def refresh_help(bot):
+    """Refresh published help ahead of time."""
+    manager.refresh_content(bot)
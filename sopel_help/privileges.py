@@ -0,0 +1,238 @@
+"""Privilege tiers, and help listings filtered for each of them."""
+import functools
+import itertools
+import threading
+
+from sopel import plugin
+from sopel.tools import get_logger
+
+from sopel_help import caches, replies
+
+LOGGER = get_logger('help')
+
+VIEWS = caches.registry.register('privilege views')
+"""Cache of the help views (see :func:`get_views`)."""
+
+USER = 'user'
+VOICE = 'voice'
+HALFOP = 'halfop'
+OP = 'op'
+ADMIN = 'admin'
+OWNER = 'owner'
+
+TIERS = (USER, VOICE, HALFOP, OP, ADMIN, OWNER)
+"""Privilege tiers, from the lowest to the highest."""
+
+CHANNEL_TIERS = (
+    (plugin.OP, OP),
+    (plugin.HALFOP, HALFOP),
+    (plugin.VOICE, VOICE),
+)
+"""Channel privilege levels and their tier, from the highest."""
+
+
+def get_trigger_tier(bot, trigger):
+    """Get the privilege tier of the user who triggered a command.
+
+    :param bot: Sopel bot
+    :param trigger: Trigger line
+    :return: one of :data:`TIERS`
+    :rtype: str
+
+    The bot's owner and admins have the highest tiers. Otherwise, the tier
+    depends on the user's privileges in the channel: in private, the user
+    has the lowest tier.
+    """
+    if trigger.owner:
+        return OWNER
+    if trigger.admin:
+        return ADMIN
+    if trigger.is_privmsg or trigger.sender not in bot.channels:
+        return USER
+
+    privileges = bot.channels[trigger.sender].privileges
+    level = privileges.get(trigger.nick, 0) or 0
+    for required, tier in CHANNEL_TIERS:
+        if level >= required:
+            return tier
+
+    return USER
+
+
+def get_usages_tier(usages):
+    """Get the tier required by a command from its usage examples.
+
+    :param list usages: usages of the command, as given by Sopel
+    :return: one of :data:`TIERS`
+    :rtype: str
+
+    A command is for the bot's owner (or admins) only when all its examples
+    are marked as such: one example for everyone is enough to list it for
+    everyone.
+    """
+    if not usages:
+        return USER
+
+    if all(usage.get('is_owner') for usage in usages):
+        return OWNER
+    if all(usage.get('is_owner') or usage.get('is_admin')
+           for usage in usages):
+        return ADMIN
+
+    return USER
+
+
+@functools.lru_cache(maxsize=4)
+def parse_command_privileges(values):
+    """Parse the ``help.command_privileges`` setting.
+
+    :param tuple values: sequence of ``command:tier``
+    :return: sequence of ``(command, tier)``
+    :rtype: tuple
+
+    Invalid values are logged (once) and ignored.
+    """
+    result = {}
+    for value in values or ():
+        command, _, tier = value.rpartition(':')
+        command = command.strip().lower()
+        tier = tier.strip().lower()
+        if not command or tier not in TIERS:
+            LOGGER.warning('Invalid help command privilege: %r', value)
+            continue
+        result[command] = tier
+
+    return tuple(sorted(result.items()))
+
+
+class HelpViews:
+    """Listings of commands for each privilege tier.
+
+    :param categories: sequence of ``(category, commands)``
+    :type categories: tuple
+    :param command_tiers: sequence of ``(command, tier)``; commands without
+                          a tier are for everyone
+    :type command_tiers: tuple
+
+    The listing of each tier is computed once, when the views are built: a
+    tier's listing contains the commands of its tier and of lower tiers, and
+    categories without such commands are omitted. Use :func:`get_views` to
+    get the views of a bot's commands, built once and then cached.
+    """
+    def __init__(self, categories, command_tiers):
+        self.command_tiers = dict(command_tiers)
+        ranks = {tier: rank for rank, tier in enumerate(TIERS)}
+        self._views = {}
+        for rank, tier in enumerate(TIERS):
+            view = {}
+            for category, commands in categories:
+                allowed = [
+                    command
+                    for command in commands
+                    if ranks[self.command_tiers.get(command, USER)] <= rank
+                ]
+                if allowed:
+                    view[category] = allowed
+            self._views[tier] = view
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self) +
+            caches.get_size(self.command_tiers) +
+            caches.get_size(self._views))
+
+    def get(self, tier):
+        """Get the listing of commands of a ``tier``.
+
+        :param str tier: one of :data:`TIERS`
+        :return: map of (category, commands)
+        :rtype: dict
+        """
+        return self._views[tier]
+
+    def items(self):
+        """Get the listing of each tier.
+
+        :return: list of ``(tier, command groups)``, from the lowest tier
+        :rtype: list
+        """
+        return [(tier, self._views[tier]) for tier in TIERS]
+
+
+def _build_views(categories, command_tiers):
+    key = (categories, command_tiers)
+    views = VIEWS.get(key)
+    if views is None:
+        views = HelpViews(categories, command_tiers)
+        VIEWS.set(key, views)
+    return views
+
+
+def _get_commands_state(plugin_commands):
+    # Sopel keeps the commands of a plugin in one dict, replaced when the
+    # plugin is reloaded: the dicts (kept alive so their ids aren't reused)
+    # and their sizes tell if the commands changed, without reading them
+    plugin_commands = tuple(plugin_commands)
+    state = tuple(
+        (plugin_name, id(commands), len(commands))
+        for plugin_name, commands in plugin_commands
+    )
+    return state, plugin_commands
+
+
+_LAST_VIEWS = {}
+_LAST_VIEWS_LOCK = threading.Lock()
+
+
+def get_views(bot, command_privileges=None):
+    """Get the help views of a bot's commands.
+
+    :param bot: Sopel bot
+    :param tuple command_privileges: sequence of ``command:tier`` (optional;
+                                     defaults to ``help.command_privileges``)
+    :return: the help views
+    :rtype: :class:`HelpViews`
+
+    The tier of a command comes from its usage examples (see
+    :func:`get_usages_tier`), unless ``help.command_privileges`` sets it.
+    The views are built only once for the same commands and tiers, and then
+    taken from a cache: until a plugin's commands change, a call doesn't
+    read the commands again.
+    """
+    rules = replies.get_rules(bot)
+
+    if command_privileges is None:
+        command_privileges = bot.settings.help.command_privileges
+    command_privileges = tuple(command_privileges or ())
+
+    state, plugin_commands = _get_commands_state(itertools.chain(
+        rules.get_all_commands(),
+        rules.get_all_nick_commands(),
+    ))
+    key = (id(rules), command_privileges, state)
+    with _LAST_VIEWS_LOCK:
+        if _LAST_VIEWS.get('key') == key:
+            return _LAST_VIEWS['views']
+
+    categories = {}
+    command_tiers = {}
+    for plugin_name, commands in plugin_commands:
+        categories.setdefault(plugin_name, set()).update(commands.keys())
+        for name, command in commands.items():
+            tier = get_usages_tier(command.get_usages())
+            if tier != USER:
+                command_tiers[name] = tier
+
+    command_tiers.update(parse_command_privileges(command_privileges))
+
+    views = _build_views(
+        tuple(
+            (category, tuple(sorted(commands)))
+            for category, commands in sorted(categories.items())
+        ),
+        tuple(sorted(command_tiers.items())),
+    )
+    with _LAST_VIEWS_LOCK:
+        _LAST_VIEWS.update(
+            key=key, views=views, refs=(rules, plugin_commands))
+    return views
@@ -1,212 +1,97 @@
 """Help providers."""
+import asyncio
+import datetime
 import hashlib
 import os
+import random
 import socket
+import time
 import urllib
 
-import requests
-
 from sopel.tools import get_logger
 
-from sopel_help import mixins
+from sopel_help import (
+    aio,
+    documents,
+    exports,
+    mixins,
+    outbound,
+    replies,
+    templates,
+    web,
+    wrapping,
+)
+# the abstract providers and the errors are also available from this module
+# pylint: disable=unused-import
+from sopel_help.abstract import (  # noqa: F401
+    AbstractGeneratedProvider,
+    AbstractProvider,
+)
+from sopel_help.errors import (  # noqa: F401
+    PublishingError,
+    RetryablePublishingError,
+    UnknownCommand,
+)
+
+# pylint: enable=unused-import
 
 LOGGER = get_logger('help')
 
 
-class PublishingError(Exception):
-    """Generic publishing error."""
-
-
-class UnknownCommand(Exception):
-    """Command is unknown."""
-
-
-def _post_content(*args, **kwargs):
-    # ensure we always timeout
-    timeout = kwargs.pop('timeout', 30)
-    try:
-        response = requests.post(*args, timeout=timeout, **kwargs)
-        response.raise_for_status()
-    except (
-            requests.exceptions.Timeout,
-            requests.exceptions.TooManyRedirects,
-            requests.exceptions.RequestException,
-            requests.exceptions.HTTPError
-    ) as err:
-        # We re-raise all expected exception types to a generic "posting error"
-        # that's easy for callers to expect, and then we pass the original
-        # exception through to provide some debugging info
-        LOGGER.exception('Error during POST request')
-        raise PublishingError(
-            'Could not communicate with publishing service'
-        ) from err
-
-    # successful response is left to the caller to handle
-    return response
-
-
-class AbstractProvider:
-    """Help provider abstraction.
-
-    A provider must implement these methods to be used as an Help Provider:
+class Base(mixins.PlainTextGeneratorMixin, AbstractGeneratedProvider):
+    """Base help provider for the help plugin.
 
-    * :meth:`help_commands`: provide a list of all commands
-    * :meth:`help_command`: provide help for one command
+    When the bot is backed up (see :meth:`is_backed_up`), the list of
+    commands is replaced by the list of categories, sent in private like the
+    list of commands: each category can be listed with ``.help <category>``.
     """
-    def setup(self, bot):
-        """Setup the provider with the bot's settings.
-
-        This will be called at the plugin's setup stage. This can be used to
-        store settings, declare custom sections, and so on.
-
-        By default this a no-op method.
-        """
-
-    def configure(self, settings):
-        """Configure the bot's settings for this provider.
-
-        By default this a no-op method.
-        """
-
     def help_commands(self, bot, trigger):
         """Handle triggered command to generate help for all commands."""
-        raise NotImplementedError
-
-    def help_command(self, bot, trigger, name):
-        """Handle triggered command to generate help for one command."""
-        raise NotImplementedError
-
-
-class AbstractGeneratedProvider(AbstractProvider):
-    """Help provider that generate help content for the user on the fly.
-
-    This abstract provider implements a workflow for the list of commands and
-    the help for one command. Subclasses must implement these methods:
-
-    * :meth:`generate_help_commands`: generate lines of help message from
-      command groups
-    * :meth:`send_help_commands`: send the lines of help to the user
-    * :meth:`generate_help_command`: generate a header, a list of body lines,
-      and a list of usage lines for one command
-
-    This abstract provider already implements the :meth:`send_help_command`
-    that sends the head/body/usage to the user.
-    """
-    def generate_help_commands(self, command_groups):
-        """Generate help messages for a set of commands.
-
-        :param dict command_groups: map of (category, commands)
-        :return: generator of help data for each command group
-        """
-        raise NotImplementedError
-
-    def send_help_commands(self, bot, trigger, lines):
-        """Reply to the user with the help for all commands.
-
-        :param bot: Wrapped bot object
-        :type bot: :class:`sopel.bot.SopelWrapper`
-        :param trigger: Trigger to reply to
-        :type: :class:`sopel.trigger.Trigger`
-        :param list lines: lines of help
-        """
-        raise NotImplementedError
-
-    def generate_help_command(self, command, docs, examples):
-        """Generate help message with head, body, and usage examples.
-
-        :param str command: command name, all lower-case
-        :param list docs: list of documentation line for this ``command``
-        :param list examples: list of examples for this ``command``
-        :return: a 3-value tuple with (head, body, usages)
-        """
-        raise NotImplementedError
-
-    def send_help_command(self, bot, trigger, command, head, body, usages):
-        """Reply to the user with the help for one command.
-
-        :param bot: Wrapped bot object
-        :type bot: :class:`sopel.bot.SopelWrapper`
-        :param trigger: Trigger to reply to
-        :type: :class:`sopel.trigger.Trigger`
-        :param str head: head message for this command
-        :param list body: body lines
-        :param list usages: usage lines
-        """
+        if not self.is_backed_up(bot):
+            super().help_commands(bot, trigger)
+            return
+
+        self.record_downgrade(bot, outbound.SHORT_LIST, 'all commands')
+        categories = sorted(
+            category.upper()
+            for category in self.get_command_groups(bot, trigger))
         reply, recipient = self.get_reply_method(bot, trigger)
-        message_length = len([head] + body) + int(bool(usages))
-
-        # check if help message is too long for a channel
-        too_long = message_length > bot.settings.help.line_threshold
-        if recipient != trigger.nick and too_long:
+        if not trigger.is_privmsg:
             reply(
-                "The help for command %s is too long; "
-                "I'm sending it to you in a private message." % command)
-            reply = bot.say
-            recipient = trigger.nick
-
-        reply(head, recipient)
-        for line in body:
-            if line:
-                bot.say(line, recipient)
-        for line in usages:
-            if line:
-                bot.say(line, recipient)
-
-    def get_reply_method(self, bot, trigger):
-        """Define the reply method and its recipient.
-
-        :param bot: Wrapped bot object
-        :type bot: :class:`sopel.bot.SopelWrapper`
-        :param trigger: Trigger to reply to
-        :type: :class:`sopel.trigger.Trigger`
-        """
-        reply = bot.reply
-        recipient = trigger.sender
-
-        if trigger.is_privmsg or bot.settings.help.reply_method == 'query':
-            reply = bot.say
-            recipient = trigger.nick
-        elif bot.settings.help.reply_method == 'notice':
-            reply = bot.notice
-            recipient = trigger.nick
-
-        return reply, recipient
-
-    def get_command_doc(self, bot, name):
-        """Retrieve the command, its description and list of examples."""
-        command = name.strip().lower()
+                "I'm busy right now; I'll send you a short list in private.",
+                recipient)
 
-        if command not in bot.doc:
-            raise UnknownCommand('Unknown command "%s"' % command)
+        bot.say(
+            "Ask me for the commands of one of these categories with "
+            "%shelp <category>:" % bot.settings.core.help_prefix,
+            trigger.nick)
+        for message in replies.pack_messages(categories):
+            bot.say(message, trigger.nick)
 
-        return [command] + list(bot.doc[command])
-
-    def help_commands(self, bot, trigger):
-        """Handle triggered command to generate help for all commands."""
-        lines = self.generate_help_commands(bot.command_groups)
-        self.send_help_commands(bot, trigger, lines)
-
-    def help_command(self, bot, trigger, name):
-        """Handle triggered command to generate help for one command."""
-        command, docs, examples = self.get_command_doc(bot, name)
-        head, body, usages = self.generate_help_command(
-            command, docs, examples)
-        self.send_help_command(bot, trigger, command, head, body, usages)
-
-
-class Base(mixins.PlainTextGeneratorMixin, AbstractGeneratedProvider):
-    """Base help provider for the help plugin."""
     def send_help_commands(self, bot, trigger, lines):
-        """Send the list of commands in private message."""
+        """Send the list of commands in private message.
+
+        With ``help.drip_rate``, the lines are scheduled on the manager's
+        :class:`~sopel_help.scheduler.HelpScheduler` instead of being sent
+        at once.
+        """
         reply, recipient = self.get_reply_method(bot, trigger)
         if trigger.is_privmsg:
             reply('Here is my list of commands:', recipient)
         else:
             reply('I\'ll send you a list of commands in private.', recipient)
 
-        for help_line in lines:
-            for line in help_line.split('\n'):
-                bot.say(line.rstrip(), trigger.nick)
+        lines = [
+            line.rstrip()
+            for help_line in lines
+            for line in help_line.split('\n')
+        ]
+        if self.get_settings(bot).drip_rate > 0 and self.manager is not None:
+            self.manager.scheduler.schedule(bot, trigger.nick, lines)
+            return
+
+        for line in lines:
+            bot.say(line, trigger.nick)
 
 
 class LocalFile(mixins.HTMLGeneratorMixin, AbstractGeneratedProvider):
@@ -230,17 +115,60 @@ class LocalFile(mixins.HTMLGeneratorMixin, AbstractGeneratedProvider):
 
     Then you have to configure an origin server that can serve this HTML file,
     like apache, nginx, or lighttpd.
+
+    With ``help.origin_json_index`` enabled, this provider also exports the
+    commands as a JSON index (named by ``help.origin_json_name``) next to the
+    HTML file, with a version file (see
+    :class:`sopel_help.exports.JSONIndexExporter`). The index is written only
+    when the commands change.
+
+    To change the look of the HTML file, set ``help.origin_template`` to the
+    path of an HTML template with a ``{content}`` placeholder (see
+    :class:`sopel_help.templates.TemplateFile`).
+
+    The HTML file is the same for all users: it lists all the commands,
+    whatever the user's privileges.
     """
+    FILTER_PRIVILEGES = False
+
     def __init__(self):
         super().__init__()
         self.base_url = None
         self.output_name = None
         self.output_dir = None
+        self.json_exporter = None
+        self.template_file = None
 
     def setup(self, bot):
-        self.base_url = bot.settings.help.origin_base_url
-        self.output_name = bot.settings.help.origin_output_name
-        self.output_dir = bot.settings.help.origin_output_dir
+        settings = self.get_settings(bot)
+        self.base_url = settings.origin_base_url
+        self.output_name = settings.origin_output_name
+        self.output_dir = settings.origin_output_dir
+
+        if settings.origin_template:
+            self.template_file = templates.TemplateFile(
+                settings.origin_template)
+            # fail early on a missing or invalid template
+            self.template_file.load()
+
+        if settings.origin_json_index:
+            self.json_exporter = exports.JSONIndexExporter(
+                self.output_dir, settings.origin_json_name)
+
+    def export_json(self, bot):
+        """Export the JSON index, if enabled and if the commands changed.
+
+        :param bot: Sopel bot
+        :return: ``True`` if the JSON index is written
+        :rtype: bool
+        """
+        if self.json_exporter is None:
+            return False
+
+        return self.json_exporter.export(documents.get_bot_document(bot))
+
+    def refresh_content(self, bot):
+        self.export_json(bot)
 
     def configure(self, settings):
         """Configure the bot's settings for this provider.
@@ -267,7 +195,8 @@ class LocalFile(mixins.HTMLGeneratorMixin, AbstractGeneratedProvider):
     def save_content(self, content):
         """Save ``content`` to the output dir.
 
-        :param str content: HTML content to save to a local directory
+        :param content: HTML content to save to a local directory, or an
+                        iterable of text chunks
         :return: the name of the file
         :rtype: str
 
@@ -278,13 +207,15 @@ class LocalFile(mixins.HTMLGeneratorMixin, AbstractGeneratedProvider):
 
         Note that if the file already exists, its content will be replaced.
         """
-        filename = os.path.join(self.output_dir, self.output_name)
-        with open(filename, 'w', encoding='utf-8') as helpfd:
-            helpfd.write(content)
+        if isinstance(content, str):
+            content = [content]
+
+        exports.save_atomic(
+            os.path.join(self.output_dir, self.output_name), content)
 
         return self.output_name
 
-    def render(self, bot, trigger, lines):  # pylint: disable=unused-argument
+    def render(self, bot, trigger, lines):
         """Render ``lines`` as an HTML document.
 
         :param bot: Wrapped bot object
@@ -293,60 +224,74 @@ class LocalFile(mixins.HTMLGeneratorMixin, AbstractGeneratedProvider):
         :type: :class:`sopel.trigger.Trigger`
         :param list lines: lines of help
         """
-        template = """<!DOCTYPE html>
-        <html>
-            <head>
-                <title>Sopel Help</title>
-                <meta charset="utf-8">
-                <meta content="light dark" name="color-scheme">
-            </head>
-            <body>
-            <h1>Sopel Help</h1>
-            {content}
-            </body>
-        </html>
-        """
+        return ''.join(self.stream_render(bot, trigger, lines))
 
-        content = '\n'.join(
-            '<div>%s</div>' % line
-            for line in lines
-        )
+    def stream_render(self, bot, trigger, lines):
+        # pylint: disable=unused-argument
+        """Render ``lines`` as an HTML document, as a stream.
+
+        :param bot: Wrapped bot object
+        :type bot: :class:`sopel.bot.SopelWrapper`
+        :param trigger: Trigger to reply to
+        :type: :class:`sopel.trigger.Trigger`
+        :param list lines: lines of help
+        :return: generator of text chunks
+
+        The document uses the template from ``help.origin_template`` if set,
+        or the default template otherwise.
+        """
+        template = templates.DEFAULT_TEMPLATE
+        if self.template_file is not None:
+            template = self.template_file.get_template()
 
-        return template.format(content=content)
+        return template.stream('<div>%s</div>' % line for line in lines)
 
     def send_help_commands(self, bot, trigger, lines):
-        content = self.render(bot, trigger, lines)
+        content = self.stream_render(bot, trigger, lines)
         filename = self.save_content(content)
         url = urllib.parse.urljoin(self.base_url, filename)
+        self.export_json(bot)
 
         reply, recipient = self.get_reply_method(bot, trigger)
         reply("I've published a list of my commands at: %s" % url, recipient)
 
 
 class AbstractPublisher(mixins.PlainTextGeneratorMixin,
+                        mixins.PublishCacheMixin,
+                        mixins.ChunkedPublishingMixin,
                         AbstractGeneratedProvider):
     """Abstract provider that publish doc on a pastebin-like service."""
     DEFAULT_WRAP_WIDTH = 70
+    DEFAULT_WRAP_UNIT = wrapping.WIDTH
+    """Unit of the wrap width: published text is read in a browser."""
     DEFAULT_THRESHOLD = 3
     DEFAULT_GROUP_SEPARATOR = '\n\n'
+    DEFAULT_RETRY_DELAY = 0.5
+    DEFAULT_RETRY_MAX_DELAY = 4
+    DEFAULT_REFRESH_AHEAD = datetime.timedelta(hours=1)
+    DEFAULT_EXPIRY_MARGIN = 600
+    DEFAULT_LIVENESS_WINDOW = 86400
+    DEFAULT_LIVENESS_TIMEOUT = 5
+    RETENTION = None
+    """How long the service keeps published content (if known)."""
 
     def __init__(self):
         super().__init__()
         self.group_separator = self.DEFAULT_GROUP_SEPARATOR
-        self._cached_value = None
-        self._cached_signature = None
 
-    def get_cached_value(self, signature):
-        """Get the cached value from the given ``signature``.
+    def run_coroutine(self, coro):
+        """Run a coroutine of this publisher, and wait for its result.
 
-        :param str signature: cache signature
-        :return: the cached value if the signature is still valid;
-                 ``None`` otherwise
-        """
-        if signature != self._cached_signature:
-            return None
+        :param coro: the coroutine to run
+        :return: the coroutine's result
 
-        return self._cached_value
+        The coroutine runs on the manager's event loop (or on a new loop
+        without a manager). This is how the synchronous methods (such as
+        :meth:`publish_with_retry`) adapt their coroutine.
+        """
+        if self.manager is None:
+            return asyncio.run(coro)
+        return self.manager.loop.run(coro)
 
     def get_cache_signature(self, bot, trigger, content):
         """Generate a cache signature from given parameters.
@@ -363,10 +308,22 @@ class AbstractPublisher(mixins.PlainTextGeneratorMixin,
 
         Then it uses a basic sha1 algorithm to sign it all.
         """
+        return self.make_cache_signature(bot, content, trigger.time.date())
+
+    def make_cache_signature(self, bot, content, date):
+        """Generate a cache signature for ``content`` at a given ``date``.
+
+        :param bot: Sopel bot
+        :param str content: Help content to sign
+        :param date: date of the signature
+        :type date: :class:`datetime.date`
+
+        See :meth:`get_cache_signature`.
+        """
         payload = (
-            ('output', bot.settings.help.output),
+            ('output', self.get_settings(bot).output),
             ('content', content),
-            ('date', trigger.time.date().isoformat()),
+            ('date', date.isoformat()),
         )
         hasher = hashlib.sha1()
         for key, value in payload:
@@ -376,30 +333,111 @@ class AbstractPublisher(mixins.PlainTextGeneratorMixin,
 
         return hasher.hexdigest()
 
-    def save_cache(self, signature, value):
-        """Save the generated URL with its signature.
+    def check_liveness(self, url):
+        """Check that a published ``url`` still exists.
 
-        :param str signature: cache signature
-        :param str value: value to cache
+        :param str url: the URL to check
+        :return: ``True`` if the URL can be reached, ``False`` otherwise
+        :rtype: bool
+
+        This sends a ``HEAD`` request to the URL.
         """
-        self._cached_value = value
-        self._cached_signature = signature
+        return web.check_url(url, self.DEFAULT_LIVENESS_TIMEOUT)
+
+    def refresh_content(self, bot, now=None):
+        """Publish the list of commands before the cache rotates.
+
+        :param bot: Sopel bot
+        :param now: current UTC date and time (optional)
+        :type now: :class:`datetime.datetime`
+
+        The content is published for the date in
+        :attr:`DEFAULT_REFRESH_AHEAD`, and the URL is prepared so the cache
+        can switch to it when the date changes. If nothing is cached for the
+        current date yet, the URL is cached right away.
+
+        Each view of the help content (see :meth:`get_views`) gets its own
+        URL, and views with the same commands share the same document.
+
+        Expired values of the shared cache, if any, are purged.
+        """
+        if now is None:
+            now = datetime.datetime.now(
+                datetime.timezone.utc).replace(tzinfo=None)
+
+        shared_cache = self.get_shared_cache(bot)
+        if shared_cache is not None:
+            shared_cache.purge()
+
+        date = (now + self.DEFAULT_REFRESH_AHEAD).date()
+        refresh_until = (now + self.DEFAULT_REFRESH_AHEAD).replace(
+            tzinfo=datetime.timezone.utc).timestamp()
+        published = {}
+
+        for view, command_groups in self.get_views(bot):
+            lines = list(self.generate_help_commands(command_groups))
+            content = self.render(bot, None, lines)
+            signature = self.make_cache_signature(bot, content, date)
+
+            if any(
+                signature == cached_signature and (
+                    expires_at is None or expires_at > refresh_until)
+                for cached_signature, _, expires_at in (
+                    self.get_cache_entry(view),
+                    self.get_cache_entry(view, pending=True),
+                )
+            ):
+                # already published, and still valid for a while
+                continue
+
+            if signature not in published:
+                published[signature] = self.publish_content(
+                    bot, None, lines, content, signature, date)
+            url, expires_at = published[signature]
+
+            current_signature = self.make_cache_signature(
+                bot, content, now.date())
+            if signature == current_signature:
+                self.save_cache(signature, url, expires_at, view=view)
+            else:
+                self.prepare_cache(signature, url, expires_at, view=view)
 
     def send_help_commands(self, bot, trigger, lines):
         """Publish doc online and reply with the URL."""
+        lines = list(lines)
         content = self.render(bot, trigger, lines)
 
         signature = self.get_cache_signature(bot, trigger, content)
         url = self.get_cached_value(signature)
 
+        # check that a URL close to its expiry is still there
+        if self.needs_liveness_check(bot, signature, url):
+            if not self.check_liveness(url):
+                url = None
+
         # if cached URL doesn't exist or is invalid, let's generate a new one
         if not url:
-            url = self.publish(bot, trigger, content)
-            self.save_cache(signature, url)
+            url, expires_at = self.publish_content(
+                bot, trigger, lines, content, signature, trigger.time.date())
+            self.save_cache(
+                signature, url, expires_at, view=self.get_view(bot, trigger))
 
         reply, recipient = self.get_reply_method(bot, trigger)
         reply("I've published a list of my commands at: %s" % url, recipient)
 
+    def publish_help_lines(self, bot, trigger, subject, lines):
+        """Publish lines of help that are too long to be sent.
+
+        The lines are published as a whole. If they can't be published, the
+        error is logged, and ``None`` is returned.
+        """
+        try:
+            url, _ = self.publish_with_retry(bot, trigger, '\n'.join(lines))
+        except PublishingError:
+            LOGGER.warning('Cannot publish the help for %s', subject)
+            return None
+        return url
+
     def render(self, bot, trigger, lines):  # pylint: disable=unused-argument
         """Render document lines as a single text document."""
         return self.group_separator.join(lines)
@@ -412,47 +450,359 @@ class AbstractPublisher(mixins.PlainTextGeneratorMixin,
         :param str content: Content to publish online
         :return: The URL to access the published content
         :rtype: str
+        :raise PublishingError: when the content can't be published; raise a
+                                :exc:`RetryablePublishingError` when a new
+                                attempt may succeed
         """
         raise NotImplementedError
 
+    def publish_document(self, bot, trigger, content):
+        """Publish the content and return the URL with its expiry.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :return: a 2-value tuple with (URL, timestamp of expiry); the expiry
+                 is ``None`` if unknown
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        By default, this uses :meth:`publish` and the service's
+        :attr:`RETENTION`. Subclasses can override this method when the
+        service reports the expiry itself.
+        """
+        url = self.publish(bot, trigger, content)
+        expires_at = None
+        if self.RETENTION is not None:
+            expires_at = time.time() + self.RETENTION.total_seconds()
+
+        return url, expires_at
+
+    def publish_content(self, bot, trigger, lines, content, signature, date):
+        """Publish the help content, in chunks if required.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param list lines: lines of help
+        :param str content: the help content rendered from ``lines``
+        :param str signature: cache signature of the content
+        :param date: date of the cache signature
+        :type date: :class:`datetime.date`
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        When the content is larger than the service allows (see
+        :meth:`get_max_content_size`), it is split into chunks (see
+        :meth:`split_chunks`), and the URL returned is the one of the index
+        (see :meth:`publish_chunks`).
+        """
+        max_size = self.get_max_content_size(bot)
+        if max_size is None or len(content.encode('utf-8')) <= max_size:
+            return self.get_or_publish(bot, trigger, content, signature)
+
+        chunks = self.split_chunks(lines, max_size)
+        LOGGER.info('Help content too large; publishing %d chunks',
+                    len(chunks))
+        return self.publish_chunks(bot, trigger, chunks, date)
+
+    def get_or_publish(self, bot, trigger, content, signature):
+        """Get the shared URL for ``signature``, or publish the content.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :param str signature: cache signature of the content
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        This is the synchronous adapter of :meth:`get_or_publish_async` (see
+        :meth:`run_coroutine`).
+        """
+        return self.run_coroutine(
+            self.get_or_publish_async(bot, trigger, content, signature))
+
+    async def get_or_publish_async(self, bot, trigger, content, signature):
+        """Coroutine version of :meth:`get_or_publish`.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :param str signature: cache signature of the content
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        Without a shared cache (see :meth:`get_shared_cache`), this publishes
+        the content with :meth:`publish_with_retry_async`. Otherwise, the URL
+        published by another bot instance is used if there is one; if not,
+        this instance publishes the content while holding the signature's
+        lock, so only one instance uploads it.
+
+        Waiting for the lock and publishing share the same deadline (see
+        :meth:`get_publish_deadline`): when another instance holds the lock
+        until the deadline, this raises a :exc:`RetryablePublishingError`
+        instead of uploading the content too.
+        """
+        shared_cache = self.get_shared_cache(bot)
+        if shared_cache is None:
+            return await self.publish_with_retry_async(bot, trigger, content)
+
+        margin = self.DEFAULT_EXPIRY_MARGIN
+        document = await aio.run_blocking(shared_cache.get, signature, margin)
+        if document is not None:
+            return document
+
+        deadline = self.get_publish_deadline(bot)
+        timeout = max(0, deadline - time.monotonic())
+        with web.publish_deadline(deadline):
+            async with shared_cache.lock_async(signature, timeout) as acquired:
+                # another instance may have published it while we waited
+                document = await aio.run_blocking(
+                    shared_cache.get, signature, margin)
+                if document is not None:
+                    return document
+
+                if not acquired:
+                    LOGGER.warning(
+                        'Timed out waiting for another instance to publish %s',
+                        signature)
+                    raise RetryablePublishingError(
+                        'Timed out waiting for the shared cache lock')
+
+                document = await self.publish_with_retry_async(
+                    bot, trigger, content)
+                await aio.run_blocking(shared_cache.set, signature, *document)
+
+        return document
+
+    def get_retry_delay(self, attempt):
+        """Get the delay before a new attempt, in seconds.
+
+        :param int attempt: number of the failed attempt (starting at 1)
+        :rtype: float
+
+        The delay grows exponentially from :attr:`DEFAULT_RETRY_DELAY`, up to
+        :attr:`DEFAULT_RETRY_MAX_DELAY`, with a random jitter (full jitter).
+        """
+        delay = min(
+            self.DEFAULT_RETRY_MAX_DELAY,
+            self.DEFAULT_RETRY_DELAY * 2 ** (attempt - 1))
+        return random.uniform(0, delay)
+
+    def get_publish_deadline(self, bot):
+        """Get the deadline of all the publishing attempts.
+
+        :param bot: Sopel bot
+        :return: the time (see :func:`time.monotonic`) by which all the
+                 attempts must end, from the ``help.publish_deadline``
+        :rtype: float
+
+        Within an earlier deadline (see
+        :func:`sopel_help.web.publish_deadline`), the earlier one is used.
+        """
+        deadline = time.monotonic() + self.get_settings(bot).publish_deadline
+        current = web.PUBLISH_DEADLINE.get()
+        if current is not None:
+            deadline = min(deadline, current)
+        return deadline
+
+    def get_retry_delays(self, bot, deadline):
+        """Get the delay before each publishing attempt, in seconds.
+
+        :param bot: Sopel bot
+        :param float deadline: deadline of all the attempts (see
+                               :meth:`get_publish_deadline`)
+        :return: generator of delays; the first one is ``None`` (there is no
+                 delay before the first attempt)
+
+        The next delay is computed when a new attempt is required: the
+        generator stops after ``help.publish_attempts`` attempts, or when the
+        next delay would exceed the ``deadline``.
+        """
+        return self._iter_retry_delays(
+            max(1, self.get_settings(bot).publish_attempts), deadline)
+
+    def _iter_retry_delays(self, attempts, deadline):
+        yield None
+        for attempt in range(1, attempts):
+            delay = self.get_retry_delay(attempt)
+            if delay >= deadline - time.monotonic():
+                return
+
+            LOGGER.info(
+                'Publishing attempt %d failed; retrying in %.2fs',
+                attempt, delay)
+            yield delay
+
+    def publish_with_retry(self, bot, trigger, content):
+        """Publish the content, with new attempts on transient errors.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        This is the synchronous adapter of :meth:`publish_with_retry_async`
+        (see :meth:`run_coroutine`).
+        """
+        return self.run_coroutine(
+            self.publish_with_retry_async(bot, trigger, content))
+
+    async def publish_with_retry_async(self, bot, trigger, content):
+        """Coroutine version of :meth:`publish_with_retry`.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        See :meth:`publish_document_async`. When it raises a
+        :exc:`RetryablePublishingError`, a new attempt is made after a delay
+        (see :meth:`get_retry_delay`), up to ``help.publish_attempts``
+        attempts. No new attempt is made when its
+        delay would exceed the ``help.publish_deadline`` (in seconds) for all
+        attempts, and each request times out no later than this deadline
+        (see :func:`sopel_help.web.publish_deadline`). Other errors are raised
+        immediately.
+
+        Waiting between attempts doesn't block the event loop.
+        """
+        deadline = self.get_publish_deadline(bot)
+        error = None
+        with web.publish_deadline(deadline):
+            for delay in self.get_retry_delays(bot, deadline):
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                try:
+                    return await self.publish_document_async(
+                        bot, trigger, content)
+                except RetryablePublishingError as err:
+                    error = err
+
+        raise error
+
+    async def publish_document_async(self, bot, trigger, content):
+        """Coroutine version of :meth:`publish_document`.
+
+        :param bot: Sopel wrapper
+        :param trigger: Trigger for this help command
+        :param str content: Content to publish online
+        :return: a 2-value tuple with (URL, timestamp of expiry)
+        :rtype: tuple
+        :raise PublishingError: when the content can't be published
+
+        By default, :meth:`publish_document` runs in the loop's executor (see
+        :func:`~sopel_help.aio.run_blocking`). Publishers with a native
+        asyncio client override this coroutine instead.
+        """
+        return await aio.run_blocking(
+            self.publish_document, bot, trigger, content)
+
 
 class CLBinPublisher(AbstractPublisher):
     """Publishing provider using clbin.com"""
     def publish(self, bot, trigger, content):
-        response = _post_content('https://clbin.com/', data={
+        response = web.post_content('https://clbin.com/', data={
             'clbin': content
         })
         return response.text.strip()
 
 
 class NullPointerPublisher(AbstractPublisher):
-    """Publishing provider using 0x0.st"""
+    """Publishing provider using 0x0.st
+
+    The service reports the expiry of the content in its ``X-Expires``
+    header, in milliseconds since the epoch.
+    """
+    MAX_CONTENT_SIZE = 512 * 1024 * 1024
+
     def publish(self, bot, trigger, content):
-        response = _post_content('https://0x0.st/', data={
+        url, _ = self.publish_document(bot, trigger, content)
+        return url
+
+    def publish_document(self, bot, trigger, content):
+        response = web.post_content('https://0x0.st/', data={
             'file': content
         })
-        return response.text.strip()
+
+        expires_at = None
+        try:
+            expires_at = int(response.headers['X-Expires']) / 1000
+        except (KeyError, ValueError):
+            LOGGER.debug('No valid expiry from 0x0.st')
+
+        return response.text.strip(), expires_at
 
 
 class TermBinPublisher(AbstractPublisher):
-    """Publishing provider using termbin.com"""
+    """Publishing provider using termbin.com
+
+    Its coroutine (see :meth:`publish_document_async`) talks to termbin with
+    asyncio's streams, without using a thread of the loop's executor.
+    """
+    RETENTION = datetime.timedelta(days=30)
+    HOST = 'termbin.com'
+    PORT = 9999
+    DEFAULT_TIMEOUT = 10
+
+    def parse_response(self, response):
+        """Get the URL from termbin's ``response``.
+
+        :param bytes response: the data sent back by termbin
+        :return: the URL of the content
+        :rtype: str
+        """
+        return response.decode('utf-8').strip('\x00').strip()
+
     def publish(self, bot, trigger, content):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # the bot may NOT wait forever for a response; that would be bad
-        sock.settimeout(10)
+        sock.settimeout(web.get_timeout(self.DEFAULT_TIMEOUT))
         try:
-            sock.connect(('termbin.com', 9999))
-            sock.sendall(content)
+            sock.connect((self.HOST, self.PORT))
+            sock.sendall(content.encode('utf-8'))
             sock.shutdown(socket.SHUT_WR)
-            response = ""
+            response = b''
             while 1:
                 data = sock.recv(1024)
-                if data == "":
+                if not data:
                     break
                 response += data
-            sock.close()
         except socket.error as err:
             LOGGER.exception('Error during communication with termbin')
-            raise PublishingError('Error uploading to termbin') from err
+            error_class = PublishingError
+            if isinstance(err, (socket.timeout, ConnectionError)):
+                error_class = RetryablePublishingError
+            raise error_class('Error uploading to termbin') from err
+        finally:
+            sock.close()
+
+        return self.parse_response(response)
+
+    async def publish_document_async(self, bot, trigger, content):
+        expires_at = time.time() + self.RETENTION.total_seconds()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.HOST, self.PORT),
+                web.get_timeout(self.DEFAULT_TIMEOUT))
+            try:
+                writer.write(content.encode('utf-8'))
+                writer.write_eof()
+                response = await asyncio.wait_for(
+                    reader.read(), web.get_timeout(self.DEFAULT_TIMEOUT))
+            finally:
+                writer.close()
+        except (asyncio.TimeoutError, OSError) as err:
+            LOGGER.exception('Error during communication with termbin')
+            error_class = PublishingError
+            if isinstance(err, (asyncio.TimeoutError, ConnectionError)):
+                error_class = RetryablePublishingError
+            raise error_class('Error uploading to termbin') from err
 
-        return response
+        return self.parse_response(response), expires_at
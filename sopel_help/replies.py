@@ -0,0 +1,208 @@
+"""Replies of the help for one or several commands."""
+import collections
+import itertools
+
+from sopel_help import wrapping
+
+MAX_MESSAGE_LENGTH = 400
+"""Maximum length (in bytes) of a message, like Sopel's ``bot.say``."""
+SEPARATOR = ' | '
+"""Separator of the entries packed into one message."""
+
+REPLY = 'reply'
+PRIVATE = 'private'
+LINK = 'link'
+
+ROUTES = (REPLY, PRIVATE, LINK)
+"""Routes of a reply: with the reply method, in private, or as a link."""
+
+ReplySize = collections.namedtuple('ReplySize', ('size', 'messages'))
+"""Size of a reply: its length in bytes, and its number of messages."""
+
+
+def get_rules(bot):
+    """Get the rules manager of a bot.
+
+    :param bot: Sopel bot
+    :return: the bot's rules manager
+    :rtype: :class:`sopel.plugins.rules.Manager`
+
+    Sopel 8 exposes its rules manager; Sopel 7 doesn't.
+    """
+    rules = getattr(bot, 'rules', None)
+    if rules is None:
+        rules = bot._rules_manager  # pylint: disable=protected-access
+    return rules
+
+
+def has_command(bot, name):
+    """Tell if the bot has a command (or nick command) named ``name``.
+
+    :param bot: Sopel bot
+    :param str name: name of the command, or one of its aliases
+    :rtype: bool
+
+    Unlike a lookup in ``bot.doc``, this doesn't build the documentation of
+    every command.
+    """
+    rules = get_rules(bot)
+    return rules.has_command(name) or rules.has_nick_command(name)
+
+
+def get_command_name(bot, name):
+    """Get the name of the bot's command named (or aliased) ``name``.
+
+    :param bot: Sopel bot
+    :param str name: name of the command, or one of its aliases
+    :return: the name of the command, or ``None`` if there is no such command
+    :rtype: str
+
+    Aliases of the same command all give the command's own name, so they are
+    counted (and pinned) as one command.
+    """
+    rules = get_rules(bot)
+    if (rules.has_command(name, follow_alias=False) or
+            rules.has_nick_command(name, follow_alias=False)):
+        return name
+
+    for _, commands in itertools.chain(
+            rules.get_all_commands(), rules.get_all_nick_commands()):
+        for command in commands.values():
+            if name in command.aliases:
+                return command.name
+
+    return None
+
+
+class PinnedReplies:
+    """Pre-rendered replies of the help for a few commands.
+
+    The replies are generated when they are pinned (see :meth:`pin`), and
+    replaced all at once the next time: there are never more replies than
+    commands pinned.
+
+    A pinned reply is used only while the bot still has its command: the
+    replies of commands removed since then (for example, by reloading a
+    plugin) are ignored.
+
+    Pinned replies don't count in the budget of the cache registry (see
+    :mod:`sopel_help.caches`): they are bounded by the ``help.pinned_replies``
+    setting, and they must stay until the next pin, so they can't be evicted.
+    """
+    def __init__(self):
+        self._replies = {}
+
+    def __len__(self):
+        return len(self._replies)
+
+    def __contains__(self, command):
+        return command in self._replies
+
+    def pin(self, bot, commands, generate):
+        """Pre-render the replies of ``commands``, and unpin the others.
+
+        :param bot: Sopel bot
+        :param list commands: names of the commands to pin
+        :param generate: function to generate the reply of a command, from
+                         its name, docs, and examples; the reply is a
+                         3-value tuple with (head, body, usages)
+        :return: the names of the commands pinned
+        :rtype: list
+
+        Unknown commands are ignored.
+        """
+        commands = [command for command in commands if command]
+        doc = bot.doc if commands else {}
+        replies = {}
+        for command in commands:
+            if command in doc:
+                docs, examples = doc[command]
+                replies[command] = generate(
+                    command, list(docs), list(examples))
+
+        self._replies = replies
+        return list(replies)
+
+    def get(self, bot, command):
+        """Get the pinned reply of ``command``.
+
+        :param bot: Sopel bot
+        :param str command: name of the command, all lower-case
+        :return: a 3-value tuple with (head, body, usages), or ``None`` if
+                 the command isn't pinned (or doesn't exist anymore)
+        :rtype: tuple
+        """
+        reply = self._replies.get(command)
+        if reply is None or not has_command(bot, command):
+            return None
+        return reply
+
+
+def measure_reply(lines):
+    """Measure the encoded size of a reply.
+
+    :param list lines: the lines of the reply
+    :return: the size of the reply
+    :rtype: :class:`ReplySize`
+
+    The size is the length of the lines encoded in UTF-8. A line longer than
+    :data:`MAX_MESSAGE_LENGTH` is sent as several messages: they are all
+    counted.
+    """
+    size = 0
+    messages = 0
+    for line in lines:
+        length = wrapping.get_byte_length(line)
+        size += length
+        messages += max(1, -(-length // MAX_MESSAGE_LENGTH))
+
+    return ReplySize(size, messages)
+
+
+def fits_budget(size, budget):
+    """Tell if a reply of ``size`` bytes fits in a byte ``budget``.
+
+    :param int size: size of the reply, in bytes
+    :param int budget: maximum size, in bytes; ``0`` (or less) for no limit
+    :rtype: bool
+    """
+    return budget <= 0 or size <= budget
+
+
+def split_command_names(text):
+    """Split the names of the commands asked for in one help request.
+
+    :param str text: names separated by spaces, such as ``seen tell``
+    :return: the lower-case names, in order, without duplicates
+    :rtype: list
+    """
+    names = []
+    for name in text.lower().split():
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def pack_messages(entries, max_length=MAX_MESSAGE_LENGTH):
+    """Pack short ``entries`` into as few messages as possible.
+
+    :param list entries: the entries to pack, in order
+    :param int max_length: maximum length (in bytes) of a message
+    :return: the messages, each with one or more entries
+    :rtype: list
+
+    Entries are joined by :data:`SEPARATOR`. An entry longer than
+    ``max_length`` gets a message of its own.
+    """
+    messages = []
+    current = ''
+    for entry in entries:
+        candidate = SEPARATOR.join((current, entry)) if current else entry
+        if current and len(candidate.encode('utf-8')) > max_length:
+            messages.append(current)
+            candidate = entry
+        current = candidate
+
+    if current:
+        messages.append(current)
+    return messages
@@ -0,0 +1,143 @@
+"""Background scheduler of long help output."""
+import collections
+import threading
+
+from sopel.tools import Identifier, get_logger
+
+LOGGER = get_logger('help')
+
+
+class HelpScheduler:
+    """Drip-feed lines of help from a background thread.
+
+    :param float rate: how many lines to send per second (optional)
+    :param str name: name of the thread (optional)
+
+    Lines are scheduled for a recipient with :meth:`schedule`, and sent one
+    at a time, at most :attr:`rate` lines per second, so long help output
+    doesn't hold up the bot's other messages. Each recipient has its own
+    queue of lines, and the recipients are served in round-robin order: a
+    long listing for one user doesn't delay the help of another.
+
+    The pending lines of a recipient are dropped with :meth:`cancel`.
+    """
+    DEFAULT_RATE = 1
+    """Default number of lines sent per second."""
+    DEFAULT_STOP_TIMEOUT = 5
+    """How long (in seconds) to wait for the thread when stopping."""
+
+    def __init__(self, rate=None, name='help-scheduler'):
+        self.rate = rate or self.DEFAULT_RATE
+        self.name = name
+        self._queues = collections.OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    @property
+    def is_running(self):
+        """Tell if the scheduler's thread is running."""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def pending(self, recipient=None):
+        """Count the pending lines.
+
+        :param str recipient: count the lines of this recipient only
+                              (optional)
+        :return: the number of pending lines
+        :rtype: int
+        """
+        with self._condition:
+            if recipient is not None:
+                return len(self._queues.get(Identifier(recipient), ()))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def schedule(self, bot, recipient, lines):
+        """Schedule ``lines`` to send to ``recipient``.
+
+        :param bot: Sopel bot, to send the lines with
+        :param str recipient: nick or channel to send the lines to
+        :param list lines: lines of help
+
+        The lines are added after the recipient's pending lines, if any. The
+        scheduler's thread is started if it isn't running yet.
+        """
+        with self._condition:
+            queue = self._queues.setdefault(
+                Identifier(recipient), collections.deque())
+            queue.extend((bot, line) for line in lines)
+            self._condition.notify_all()
+
+        self.start()
+
+    def cancel(self, recipient):
+        """Drop the pending lines of ``recipient``.
+
+        :param str recipient: nick or channel
+        :return: the number of lines dropped
+        :rtype: int
+        """
+        with self._condition:
+            queue = self._queues.pop(Identifier(recipient), None)
+        return len(queue) if queue else 0
+
+    def send_next(self):
+        """Send the next pending line, if any.
+
+        :return: ``True`` if a line was sent, ``False`` otherwise
+        :rtype: bool
+
+        The next line is the first line of the next recipient in round-robin
+        order: this recipient goes last, after the others.
+        """
+        with self._condition:
+            if not self._queues:
+                return False
+            recipient, queue = self._queues.popitem(last=False)
+            bot, line = queue.popleft()
+            if queue:
+                self._queues[recipient] = queue
+
+        bot.say(line, recipient)
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._queues or not self._running)
+                if not self._running:
+                    return
+
+            try:
+                self.send_next()
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('Cannot send a scheduled help line.')
+
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._running, 1 / self.rate)
+
+    def start(self):
+        """Start the scheduler's thread, if it isn't running yet."""
+        with self._condition:
+            if self._running:
+                return
+
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler's thread, and drop all the pending lines."""
+        with self._condition:
+            thread = self._thread
+            self._running = False
+            self._thread = None
+            self._queues.clear()
+            self._condition.notify_all()
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.DEFAULT_STOP_TIMEOUT)
@@ -0,0 +1,65 @@
+"""Snapshot of the help plugin's settings."""
+import collections
+
+FIELDS = (
+    'output',
+    'channel_outputs',
+    'reply_method',
+    'origin_base_url',
+    'origin_output_name',
+    'origin_output_dir',
+    'origin_template',
+    'origin_json_index',
+    'origin_json_name',
+    'hedged_outputs',
+    'publish_attempts',
+    'publish_deadline',
+    'publish_liveness_check',
+    'publish_cache_file',
+    'publish_async',
+    'publish_max_size',
+    'privilege_filter',
+    'command_privileges',
+    'batch_limit',
+    'pinned_replies',
+    'channel_max_bytes',
+    'private_max_bytes',
+    'backlog_threshold',
+    'drip_rate',
+    'cache_max_bytes',
+    'line_threshold',
+)
+"""Name of each setting of the snapshot."""
+
+
+class HelpSettings(collections.namedtuple('HelpSettings', FIELDS)):
+    """Immutable snapshot of the ``[help]`` section.
+
+    Each field has the same name, and the same type, as the attribute of
+    :class:`sopel_help.config.HelpSection`, except that lists are stored as
+    tuples. Reading a field doesn't parse nor validate anything: this is done
+    once, when the snapshot is taken with :meth:`from_section`.
+
+    A snapshot never changes: take a new one to get the new values of the
+    settings (see :meth:`sopel_help.managers.Manager.refresh_settings`).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_section(cls, section):
+        """Take a snapshot of the help ``section``.
+
+        :param section: the bot's help section
+        :type section: :class:`sopel_help.config.HelpSection`
+        :return: the snapshot of the settings
+        :rtype: :class:`HelpSettings`
+        :raise ValueError: when a setting is invalid
+        """
+        values = {}
+        for name in FIELDS:
+            value = getattr(section, name)
+            if isinstance(value, list):
+                value = tuple(value)
+            values[name] = value
+
+        return cls(**values)
@@ -0,0 +1,286 @@
+"""Static help site, with one page per category of commands."""
+import hashlib
+import html
+import json
+import os
+import re
+import urllib.parse
+
+from sopel.tools import get_logger
+
+from sopel_help import documents, exports, providers
+
+LOGGER = get_logger('help')
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+    <head>
+        <title>{title}</title>
+        <meta charset="utf-8">
+        <meta content="light dark" name="color-scheme">
+    </head>
+    <body>
+    <h1>{title}</h1>
+    {content}
+    </body>
+</html>
+"""
+"""Template of each page of the site."""
+
+MANIFEST_NAME = '.sopel-help-manifest.json'
+"""Name of the file that records the pages of the site and their hash."""
+
+
+def get_page_name(prefix, category):
+    """Get the file name of a category's page.
+
+    :param str prefix: prefix of all the pages, such as ``help``
+    :param str category: name of the category
+    :return: the file name of the page
+    :rtype: str
+    """
+    slug = re.sub(r'[^a-z0-9_-]+', '-', category.lower()).strip('-')
+    return '%s-%s.html' % (prefix, slug or 'category')
+
+
+def render_index_page(pages):
+    """Render the index page of the site.
+
+    :param list pages: list of ``(category, page name)``
+    :return: the HTML page
+    :rtype: str
+    """
+    content = '<ul>%s</ul>' % ''.join(
+        '<li><a href="{href}">{title}</a></li>'.format(
+            href=html.escape(urllib.parse.quote(page_name)),
+            title=html.escape(category.upper()))
+        for category, page_name in pages
+    )
+    return PAGE_TEMPLATE.format(title='Sopel Help', content=content)
+
+
+def render_category_page(category, commands):
+    """Render the page of one category of commands.
+
+    :param str category: name of the category
+    :param list commands: list of ``(command, docs, examples, aliases)``
+    :return: the HTML page
+    :rtype: str
+    """
+    blocks = []
+    for command, docs, examples, aliases in commands:
+        name = html.escape(command)
+        lines = [
+            '<h2 id="command-{name}"><a href="#command-{name}">{name}</a>'
+            '</h2>'.format(name=name),
+        ]
+        lines.extend('<p>%s</p>' % html.escape(line) for line in docs if line)
+        if aliases:
+            lines.append('<p>Aliases: %s</p>' % ', '.join(
+                '<code>%s</code>' % html.escape(alias) for alias in aliases))
+        if examples:
+            lines.append('<ul>%s</ul>' % ''.join(
+                '<li><code>%s</code></li>' % html.escape(example)
+                for example in examples))
+        blocks.append(''.join(lines))
+
+    return PAGE_TEMPLATE.format(
+        title='Sopel Help: %s' % html.escape(category.upper()),
+        content='\n'.join(blocks))
+
+
+def _hash_page(*parts):
+    hasher = hashlib.sha1()
+    hasher.update(repr(parts).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class StaticSiteBuilder:
+    """Builder of a static help site, with incremental rebuilds.
+
+    :param str output_dir: directory where to save the site
+    :param str index_name: name of the index page, such as ``help.html``
+    :param executor: executor used to render the pages in parallel
+                     (optional)
+    :type executor: :class:`concurrent.futures.Executor`
+
+    The site has an index page that links to one page per category. The name
+    of each category's page is derived from the index's name (see
+    :func:`get_page_name`).
+
+    A manifest file records the pages and a hash of their content: only the
+    pages whose commands changed are written again, and the pages of
+    categories that don't exist anymore are removed.
+    """
+    def __init__(self, output_dir, index_name='help.html', executor=None):
+        self.output_dir = output_dir
+        self.index_name = index_name
+        self.executor = executor
+        self.prefix = os.path.splitext(index_name)[0]
+        self._version = None
+
+    @property
+    def manifest_filename(self):
+        """Path of the manifest file."""
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    def load_manifest(self):
+        """Load the manifest of the site, from the last build.
+
+        :return: map of (page name, hash)
+        :rtype: dict
+        """
+        try:
+            with open(self.manifest_filename, encoding='utf-8') as manifestfd:
+                return json.load(manifestfd)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get_pages(self, document):
+        """Get the pages of the site for a ``document``.
+
+        :param document: the help document, with details
+        :type document: :class:`sopel_help.documents.HelpDocument`
+        :return: map of (page name, (hash, renderer, arguments))
+        :rtype: dict
+        """
+        pages = {}
+        index_pages = []
+        for category, commands in document.categories:
+            page_name = get_page_name(self.prefix, category)
+            index_pages.append((category, page_name))
+            details = [
+                (command,) + document.details.get(command, ((), (), ()))
+                for command in commands
+            ]
+            pages[page_name] = (
+                _hash_page(category, details),
+                render_category_page,
+                (category, details),
+            )
+
+        pages[self.index_name] = (
+            _hash_page(index_pages),
+            render_index_page,
+            (index_pages,),
+        )
+        return pages
+
+    def render_pages(self, pages):
+        """Render the ``pages`` to write.
+
+        :param dict pages: map of (page name, (renderer, arguments))
+        :return: generator of ``(page name, content)``
+
+        With an :attr:`executor`, the pages are rendered in parallel. Since
+        renderers are module-level functions, this works with a process pool
+        too.
+        """
+        if self.executor is None:
+            for page_name, (renderer, arguments) in pages.items():
+                yield page_name, renderer(*arguments)
+            return
+
+        futures = [
+            (page_name, self.executor.submit(renderer, *arguments))
+            for page_name, (renderer, arguments) in pages.items()
+        ]
+        for page_name, future in futures:
+            yield page_name, future.result()
+
+    def build(self, document):
+        """Build the site for a ``document``, incrementally.
+
+        :param document: the help document, with details
+        :type document: :class:`sopel_help.documents.HelpDocument`
+        :return: a 2-value tuple with the list of pages written, and the list
+                 of pages removed
+        :rtype: tuple
+        """
+        if document.version == self._version:
+            return [], []
+
+        manifest = self.load_manifest()
+        pages = self.get_pages(document)
+
+        outdated = {
+            page_name: (renderer, arguments)
+            for page_name, (page_hash, renderer, arguments) in pages.items()
+            if manifest.get(page_name) != page_hash or not os.path.exists(
+                os.path.join(self.output_dir, page_name))
+        }
+        written = []
+        for page_name, content in self.render_pages(outdated):
+            exports.save_atomic(
+                os.path.join(self.output_dir, page_name), [content])
+            written.append(page_name)
+
+        removed = []
+        for page_name in sorted(set(manifest) - set(pages)):
+            if os.path.basename(page_name) != page_name:
+                # never remove anything outside of the output directory
+                continue
+            try:
+                os.unlink(os.path.join(self.output_dir, page_name))
+            except FileNotFoundError:
+                pass
+            removed.append(page_name)
+
+        exports.save_atomic(self.manifest_filename, [json.dumps({
+            page_name: page_hash
+            for page_name, (page_hash, _, _) in pages.items()
+        }, sort_keys=True)])
+        self._version = document.version
+
+        if written or removed:
+            LOGGER.info('Help site: %d page(s) written, %d removed',
+                        len(written), len(removed))
+
+        return sorted(written), removed
+
+
+class StaticSite(providers.LocalFile):
+    """Static site provider for the help plugin.
+
+    Like the :class:`~sopel_help.providers.LocalFile` provider, this provider
+    generates HTML files in ``help.origin_output_dir`` and sends the URL of
+    ``help.origin_output_name`` to the user. Instead of one page with all the
+    commands, it generates an index page that links to one page per category,
+    with the documentation, examples, and aliases of each command.
+
+    Only the pages whose commands changed are written again (see
+    :class:`StaticSiteBuilder`).
+    """
+    def __init__(self):
+        super().__init__()
+        self.builder = None
+
+    def setup(self, bot):
+        super().setup(bot)
+        self.builder = StaticSiteBuilder(self.output_dir, self.output_name)
+
+    def build_site(self, bot):
+        """Build the site from the bot's commands.
+
+        :param bot: Sopel bot
+        :return: a 2-value tuple with the list of pages written, and the list
+                 of pages removed
+        :rtype: tuple
+        """
+        return self.builder.build(documents.get_bot_document(bot))
+
+    def refresh_content(self, bot):
+        self.build_site(bot)
+        super().refresh_content(bot)
+
+    def help_commands(self, bot, trigger):
+        # the site doesn't need the generated list of commands
+        self.send_help_commands(bot, trigger, ())
+
+    def send_help_commands(self, bot, trigger, lines):
+        self.build_site(bot)
+        self.export_json(bot)
+        url = urllib.parse.urljoin(self.base_url, self.output_name)
+
+        reply, recipient = self.get_reply_method(bot, trigger)
+        reply("I've published a list of my commands at: %s" % url, recipient)
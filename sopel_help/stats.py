@@ -0,0 +1,178 @@
+"""Statistics of the help commands."""
+import threading
+import time
+
+
+class DecayedCounter:
+    """Counter of keys whose counts decay over time, in bounded memory.
+
+    :param float half_life: time (in seconds) for a count to lose half of its
+                            weight (optional)
+    :param int capacity: maximum number of keys to count (optional)
+
+    Each event counts for ``1`` when it happens, then its weight halves every
+    ``half_life`` seconds: recent events count more than old ones. Instead of
+    decaying every count, the weight of a new event grows with time, and the
+    counts are scaled down when reading them.
+
+    When a new key exceeds the ``capacity``, the key with the lowest count is
+    evicted first: rare keys (such as typos) can't fill the memory.
+    """
+    DEFAULT_HALF_LIFE = 86400
+    """Default half-life of a count, in seconds."""
+    DEFAULT_CAPACITY = 256
+    """Default maximum number of keys."""
+    MAX_EXPONENT = 32
+    """Number of half-lives after which the counts are scaled down."""
+
+    def __init__(self, half_life=None, capacity=None):
+        self.half_life = half_life or self.DEFAULT_HALF_LIFE
+        self.capacity = capacity or self.DEFAULT_CAPACITY
+        self._counts = {}
+        self._landmark = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _get_exponent(self, now):
+        if self._landmark is None:
+            self._landmark = now
+        return (now - self._landmark) / self.half_life
+
+    def _rescale(self, now):
+        # keep the weights of new events small enough for a float
+        factor = 2 ** -self._get_exponent(now)
+        self._counts = {
+            key: count * factor
+            for key, count in self._counts.items()
+        }
+        self._landmark = now
+
+    def add(self, key, now=None):
+        """Count one event for ``key``.
+
+        :param str key: the key to count
+        :param float now: current monotonic time (optional)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._get_exponent(now) > self.MAX_EXPONENT:
+                self._rescale(now)
+
+            if key not in self._counts and len(self._counts) >= self.capacity:
+                lowest = min(self._counts, key=self._counts.get)
+                del self._counts[lowest]
+
+            weight = 2 ** self._get_exponent(now)
+            self._counts[key] = self._counts.get(key, 0) + weight
+
+    def get(self, key, now=None):
+        """Get the decayed count of ``key``.
+
+        :param str key: the counted key
+        :param float now: current monotonic time (optional)
+        :return: the count of ``key`` at ``now``
+        :rtype: float
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            count = self._counts.get(key, 0)
+            return count * 2 ** -self._get_exponent(now)
+
+    def most_common(self, limit=None, now=None):
+        """Get the keys with the highest counts.
+
+        :param int limit: maximum number of keys (optional)
+        :param float now: current monotonic time (optional)
+        :return: list of ``(key, count)``, from the highest count
+        :rtype: list
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            factor = 2 ** -self._get_exponent(now)
+            counts = [
+                (key, count * factor)
+                for key, count in self._counts.items()
+            ]
+
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            counts = counts[:limit]
+        return counts
+
+
+class HelpStats:
+    """Statistics of the help commands: lookups, misses, and downgrades.
+
+    :param float half_life: half-life of the counts (optional; see
+                            :class:`DecayedCounter`)
+    :param int capacity: maximum number of commands counted (optional)
+
+    A lookup is a ``.help <command>`` for a known command, and a miss is one
+    for an unknown command. Both are counted by name, with a
+    :class:`DecayedCounter`. Downgrades are help replies sent in a degraded
+    mode (see :data:`sopel_help.outbound.MODES`), counted by mode.
+    """
+    MAX_NAME_LENGTH = 32
+    """Names are truncated to this length before they are counted."""
+
+    def __init__(self, half_life=None, capacity=None):
+        self.lookups = DecayedCounter(half_life, capacity)
+        self.misses = DecayedCounter(half_life, capacity)
+        self.downgrades = DecayedCounter(half_life, capacity)
+
+    def _get_key(self, name):
+        return name.strip().lower()[:self.MAX_NAME_LENGTH]
+
+    def record_lookup(self, name, now=None):
+        """Count a lookup of the command ``name``.
+
+        :param str name: name of the command
+        :param float now: current monotonic time (optional)
+        """
+        self.lookups.add(self._get_key(name), now=now)
+
+    def record_miss(self, name, now=None):
+        """Count a lookup of the unknown command ``name``.
+
+        :param str name: name of the unknown command
+        :param float now: current monotonic time (optional)
+        """
+        self.misses.add(self._get_key(name), now=now)
+
+    def record_downgrade(self, mode, now=None):
+        """Count a help reply sent in a degraded ``mode``.
+
+        :param str mode: one of :data:`sopel_help.outbound.MODES`
+        :param float now: current monotonic time (optional)
+        """
+        self.downgrades.add(mode, now=now)
+
+    def get_top_commands(self, limit, now=None):
+        """Get the names of the most requested commands.
+
+        :param int limit: maximum number of commands
+        :param float now: current monotonic time (optional)
+        :return: list of command names, from the most requested
+        :rtype: list
+        """
+        if limit <= 0:
+            return []
+        return [name for name, _ in self.lookups.most_common(limit, now)]
+
+
+def format_counts(counts):
+    """Format counts for a message, such as ``help (3.0), seen (1.5)``.
+
+    :param list counts: list of ``(key, count)``
+    :return: the formatted counts (rounded to one decimal), or ``none``
+    :rtype: str
+    """
+    if not counts:
+        return 'none'
+
+    return ', '.join(
+        '%s (%.1f)' % (key, count)
+        for key, count in counts
+    )
@@ -0,0 +1,128 @@
+"""HTML templates of the help pages."""
+import os
+import threading
+
+from sopel.tools import get_logger
+
+LOGGER = get_logger('help')
+
+PLACEHOLDER = '{content}'
+"""Placeholder replaced by the help content in a template."""
+
+DEFAULT_SOURCE = """<!DOCTYPE html>
+<html>
+    <head>
+        <title>Sopel Help</title>
+        <meta charset="utf-8">
+        <meta content="light dark" name="color-scheme">
+    </head>
+    <body>
+    <h1>Sopel Help</h1>
+    {content}
+    </body>
+</html>
+"""
+"""Source of the default template."""
+
+
+class HTMLTemplate:
+    """Compiled HTML template.
+
+    :param str source: source of the template
+    :raise ValueError: when the source has no ``{content}`` placeholder
+
+    The template is compiled once, by splitting its source around the
+    ``{content}`` placeholder: rendering only streams the parts of the
+    template around the content, without parsing anything. Only the first
+    placeholder is replaced, and the rest of the source is kept as-is, so
+    there is no need to escape braces (for example, in CSS rules).
+    """
+    def __init__(self, source):
+        head, found, tail = source.partition(PLACEHOLDER)
+        if not found:
+            raise ValueError(
+                'Template has no %s placeholder' % PLACEHOLDER)
+        self.head = head
+        self.tail = tail
+
+    def stream(self, blocks):
+        """Render the template with ``blocks`` of content, as a stream.
+
+        :param blocks: iterable of HTML blocks, separated by a new line
+        :return: generator of text chunks
+        """
+        yield self.head
+        for index, block in enumerate(blocks):
+            if index:
+                yield '\n'
+            yield block
+        yield self.tail
+
+    def render(self, blocks):
+        """Render the template with ``blocks`` of content.
+
+        :param blocks: iterable of HTML blocks, separated by a new line
+        :return: the HTML document
+        :rtype: str
+        """
+        return ''.join(self.stream(blocks))
+
+
+DEFAULT_TEMPLATE = HTMLTemplate(DEFAULT_SOURCE)
+"""Default template, used when no template file is configured."""
+
+
+class TemplateFile:
+    """HTML template stored in a file, reloaded when the file changes.
+
+    :param str filename: path to the template file
+
+    The file is read and compiled only when its modification time changes.
+    If it can't be reloaded (the file is removed, or its new source is
+    invalid), the last compiled template is used instead.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._template = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load and compile the template file, if it changed.
+
+        :return: the compiled template
+        :rtype: :class:`HTMLTemplate`
+        :raise OSError: when the file can't be read
+        :raise ValueError: when the template is invalid
+        """
+        mtime = os.stat(self.filename).st_mtime_ns
+        if mtime == self._mtime:
+            return self._template
+
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.filename, encoding='utf-8') as templatefd:
+                    self._template = HTMLTemplate(templatefd.read())
+                self._mtime = mtime
+                LOGGER.debug('Help template loaded from %s', self.filename)
+
+        return self._template
+
+    def get_template(self):
+        """Get the compiled template, reloaded if the file changed.
+
+        :return: the compiled template
+        :rtype: :class:`HTMLTemplate`
+        :raise OSError: when the file can't be read the first time
+        :raise ValueError: when the template is invalid the first time
+        """
+        if self._template is None:
+            return self.load()
+
+        try:
+            return self.load()
+        except (OSError, ValueError) as error:
+            LOGGER.warning(
+                'Cannot reload help template %s, using the last one: %s',
+                self.filename, error)
+            return self._template
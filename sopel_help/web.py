@@ -0,0 +1,135 @@
+"""HTTP requests of the help providers."""
+import contextlib
+import contextvars
+import time
+
+import requests
+from sopel.tools import get_logger
+
+from sopel_help.errors import PublishingError, RetryablePublishingError
+
+LOGGER = get_logger('help')
+
+RETRYABLE_STATUS_CODES = frozenset([408, 425, 429, 500, 502, 503, 504])
+"""HTTP status codes of transient errors."""
+DEFAULT_TIMEOUT = 30
+"""Default timeout (in seconds) of a request."""
+MIN_TIMEOUT = 1
+"""Minimum timeout (in seconds) of a request, close to the deadline."""
+
+PUBLISH_DEADLINE = contextvars.ContextVar(
+    'help_publish_deadline', default=None)
+"""Deadline (see :func:`time.monotonic`) of the current publishing, if any."""
+
+
+@contextlib.contextmanager
+def publish_deadline(deadline):
+    """Bound the timeout of the requests made in this context.
+
+    :param float deadline: the time (see :func:`time.monotonic`) by which all
+                           publishing attempts must end
+
+    Within this context, :func:`get_timeout` is never longer than the time
+    left before the ``deadline``.
+    """
+    token = PUBLISH_DEADLINE.set(deadline)
+    try:
+        yield
+    finally:
+        PUBLISH_DEADLINE.reset(token)
+
+
+def get_timeout(timeout=DEFAULT_TIMEOUT):
+    """Get the timeout of a request, within the current publishing deadline.
+
+    :param float timeout: the request's own timeout, in seconds
+    :return: the ``timeout``, or the time left before the deadline (see
+             :func:`publish_deadline`) if shorter, but at least
+             :data:`MIN_TIMEOUT`
+    :rtype: float
+    """
+    deadline = PUBLISH_DEADLINE.get()
+    if deadline is None:
+        return timeout
+
+    return max(MIN_TIMEOUT, min(timeout, deadline - time.monotonic()))
+
+
+def is_retryable_request_error(err):
+    """Tell if a request error is transient.
+
+    :param err: the error raised by ``requests``
+    :rtype: bool
+
+    Timeouts, connection errors, and some HTTP statuses (see
+    :data:`RETRYABLE_STATUS_CODES`) are transient: a new attempt may succeed.
+    """
+    if isinstance(err, (
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectionError,
+    )):
+        return True
+
+    response = getattr(err, 'response', None)
+    return (
+        response is not None and
+        response.status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+def post_content(*args, **kwargs):
+    """Send a ``POST`` request, and return its response.
+
+    :return: the successful response
+    :rtype: :class:`requests.Response`
+    :raise PublishingError: when the request fails (see
+                            :func:`is_retryable_request_error` for the
+                            :exc:`RetryablePublishingError`)
+
+    The arguments are the ones of :func:`requests.post`. The request times
+    out after 30s by default, or earlier when the publishing deadline is
+    closer (see :func:`get_timeout`).
+    """
+    # ensure we always timeout
+    timeout = get_timeout(kwargs.pop('timeout', DEFAULT_TIMEOUT))
+    try:
+        response = requests.post(*args, timeout=timeout, **kwargs)
+        response.raise_for_status()
+    except (
+            requests.exceptions.Timeout,
+            requests.exceptions.TooManyRedirects,
+            requests.exceptions.RequestException,
+            requests.exceptions.HTTPError
+    ) as err:
+        # We re-raise all expected exception types to a generic "posting error"
+        # that's easy for callers to expect, and then we pass the original
+        # exception through to provide some debugging info
+        LOGGER.exception('Error during POST request')
+        error_class = PublishingError
+        if is_retryable_request_error(err):
+            error_class = RetryablePublishingError
+        raise error_class(
+            'Could not communicate with publishing service'
+        ) from err
+
+    # successful response is left to the caller to handle
+    return response
+
+
+def check_url(url, timeout):
+    """Check that a ``url`` can be reached.
+
+    :param str url: the URL to check
+    :param float timeout: how long (in seconds) to wait for a response
+    :return: ``True`` if the URL can be reached, ``False`` otherwise
+    :rtype: bool
+
+    This sends a ``HEAD`` request to the URL, following redirects.
+    """
+    try:
+        response = requests.head(url, timeout=timeout, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        LOGGER.info('Cannot check published help at %s', url)
+        return False
+
+    return response.status_code < 400
@@ -0,0 +1,133 @@
+"""Wrapping of lists of command names into lines."""
+import unicodedata
+
+CHARS = 'chars'
+BYTES = 'bytes'
+WIDTH = 'width'
+
+UNITS = (CHARS, BYTES, WIDTH)
+"""Units to measure the length of a line."""
+
+
+def get_byte_length(text):
+    """Get the length of ``text`` in UTF-8 bytes.
+
+    :param str text: the text to measure
+    :rtype: int
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
+def get_display_width(text):
+    """Get the display width of ``text``, in terminal columns.
+
+    :param str text: the text to measure
+    :rtype: int
+
+    Wide and full-width characters (such as CJK ideographs) take two columns,
+    and combining characters take none.
+    """
+    if text.isascii():
+        return len(text)
+
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+    return width
+
+
+MEASURES = {
+    CHARS: len,
+    BYTES: get_byte_length,
+    WIDTH: get_display_width,
+}
+"""Function to measure a text, for each unit."""
+
+
+def get_measure(unit):
+    """Get the function to measure a text in ``unit``.
+
+    :param str unit: one of :data:`UNITS`
+    :return: function that takes a text and returns its length
+    :raise ValueError: when the unit is unknown
+    """
+    try:
+        return MEASURES[unit]
+    except KeyError:
+        raise ValueError('Unknown wrap unit %r' % unit) from None
+
+
+def measure_tokens(tokens, unit=CHARS):
+    """Measure the length of each token, ahead of wrapping.
+
+    :param tokens: the tokens to measure, such as command names
+    :type tokens: tuple
+    :param str unit: one of :data:`UNITS`
+    :return: the length of each token, in ``unit``
+    :rtype: tuple
+    :raise ValueError: when the unit is unknown
+    """
+    return tuple(map(get_measure(unit), tokens))
+
+
+def wrap_tokens(tokens,
+                width,
+                lengths=None,
+                separator='  ',
+                prefix='',
+                indent='',
+                unit=CHARS):
+    """Wrap ``tokens`` into lines of at most ``width``.
+
+    :param tokens: the tokens to wrap, such as command names
+    :type tokens: tuple
+    :param int width: maximum length of a line, in ``unit``
+    :param tuple lengths: the length of each token, from
+                          :func:`measure_tokens` (optional)
+    :param str separator: separator of the tokens on the same line
+    :param str prefix: beginning of the first line, such as a label
+    :param str indent: beginning of the other lines
+    :param str unit: one of :data:`UNITS`
+    :return: the wrapped lines
+    :rtype: list
+    :raise ValueError: when the unit is unknown
+
+    Tokens are never broken: a token longer than ``width`` gets a line of its
+    own. Lines are filled greedily, using only the token lengths, and each
+    line is joined only once.
+
+    With ASCII tokens and the ``chars`` unit, the lines are the same as the
+    ones from :func:`textwrap.wrap` for the tokens joined by ``separator``,
+    as long as no token contains a hyphen or is longer than ``width``.
+    """
+    if lengths is None:
+        lengths = measure_tokens(tokens, unit)
+    separator_length, indent_length, current = measure_tokens(
+        (separator, indent, prefix), unit)
+
+    lines = []
+    head = prefix
+    start = 0
+    for index, length in enumerate(lengths):
+        if index == start:
+            if not lines and prefix and current + length > width:
+                # the first token doesn't fit after the prefix
+                lines.append(prefix.rstrip())
+                head, current = indent, indent_length
+            current += length
+        elif current + separator_length + length <= width:
+            current += separator_length + length
+        else:
+            lines.append(head + separator.join(tokens[start:index]))
+            head, current, start = indent, indent_length + length, index
+
+    if start < len(lengths):
+        lines.append(head + separator.join(tokens[start:]))
+    elif prefix.strip():
+        lines.append(prefix.rstrip())
+
+    return lines
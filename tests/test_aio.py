@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pytest
+
+from sopel_help import aio, managers, providers
+
+
+@pytest.fixture
+def loop():
+    event_loop = aio.EventLoopThread(name='test-event-loop')
+    yield event_loop
+    event_loop.stop()
+
+
+def test_event_loop_run(loop):
+    async def answer():
+        return threading.current_thread().name
+
+    assert not loop.is_running
+    assert loop.run(answer(), timeout=5) == 'test-event-loop'
+    assert loop.is_running
+
+
+def test_event_loop_submit(loop):
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    futures = [loop.submit(double(value)) for value in range(5)]
+
+    assert [future.result(5) for future in futures] == [0, 2, 4, 6, 8]
+
+
+def test_event_loop_run_blocking(loop):
+    async def blocking():
+        return await aio.run_blocking(
+            lambda: threading.current_thread().name)
+
+    assert loop.run(blocking(), timeout=5).startswith(
+        'test-event-loop-blocking')
+
+
+def test_event_loop_run_from_loop(loop):
+    async def nested():
+        return loop.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        loop.run(nested(), timeout=5)
+
+
+def test_event_loop_stop(loop):
+    async def forever():
+        await asyncio.sleep(3600)
+
+    future = loop.submit(forever())
+    loop.stop()
+
+    assert future.cancelled()
+    assert not loop.is_running
+
+    # the loop starts again when required
+    assert loop.run(asyncio.sleep(0, 'restarted'), timeout=5) == 'restarted'
+
+
+class MockPublisher(providers.AbstractPublisher):
+    DEFAULT_RETRY_DELAY = 0.01
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.calls = 0
+
+    def publish(self, bot, trigger, content):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'https://example.com/%d' % self.calls
+
+
+@pytest.fixture
+def mockbot(configfactory, botfactory):
+    tmpconfig = configfactory('test.cfg', """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+""")
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_publish_with_retry_async(mockbot, loop):
+    publisher = MockPublisher([providers.RetryablePublishingError()])
+
+    url, _ = loop.run(
+        publisher.publish_with_retry_async(mockbot, None, 'content'),
+        timeout=5)
+
+    assert url == 'https://example.com/2'
+    assert publisher.calls == 2
+
+
+def test_publish_with_retry_async_error(mockbot, loop):
+    publisher = MockPublisher([providers.PublishingError()])
+
+    with pytest.raises(providers.PublishingError):
+        loop.run(
+            publisher.publish_with_retry_async(mockbot, None, 'content'),
+            timeout=5)
+
+    assert publisher.calls == 1, 'Only retryable errors are retried'
+
+
+def test_event_loop_reply_executor(loop):
+    assert loop.reply_executor is None
+
+    async def reply():
+        return await aio.run_blocking(
+            lambda: threading.current_thread().name,
+            executor=loop.reply_executor)
+
+    assert loop.run(reply(), timeout=5).startswith('test-event-loop-reply')
+
+
+def test_help_commands_async_reply_executor(mockbot, triggerfactory):
+    manager = managers.Manager()
+    manager.setup(mockbot)
+    provider = providers.Base()
+    provider.manager = manager
+    threads = []
+
+    def help_commands(bot, trigger):
+        threads.append(threading.current_thread().name)
+
+    provider.help_commands = help_commands
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help')
+
+    try:
+        manager.loop.run(
+            provider.help_commands_async(wrapper, wrapper._trigger),
+            timeout=5)
+    finally:
+        manager.loop.stop()
+
+    # the replies don't use the threads of the publishers
+    assert threads[0].startswith('help-event-loop-reply')
+
+
+def test_publish_with_retry_on_loop(mockbot):
+    manager = managers.Manager()
+    publisher = MockPublisher([providers.RetryablePublishingError()])
+    publisher.manager = manager
+
+    try:
+        url, _ = publisher.publish_with_retry(mockbot, None, 'content')
+    finally:
+        manager.loop.stop()
+
+    assert url == 'https://example.com/2'
+    assert publisher.calls == 2
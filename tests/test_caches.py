@@ -0,0 +1,232 @@
+import asyncio
+import threading
+
+import pytest
+
+from sopel_help import caches
+
+
+@pytest.fixture
+def filename(tmpdir):
+    return str(tmpdir.join('cache.db'))
+
+
+def test_shared_cache(filename):
+    cache = caches.SharedPublishCache(filename)
+
+    assert cache.get('sign') is None
+
+    cache.set('sign', 'https://example.com/a', 1000)
+
+    assert cache.get('sign', now=500) == ('https://example.com/a', 1000)
+    assert cache.get('sign', now=1000) is None
+    assert cache.get('sign', margin=600, now=500) is None
+
+    cache.set('sign', 'https://example.com/b')
+
+    assert cache.get('sign') == ('https://example.com/b', None)
+
+
+def test_shared_cache_between_instances(filename):
+    cache_a = caches.SharedPublishCache(filename)
+    cache_b = caches.SharedPublishCache(filename)
+
+    cache_a.set('sign', 'https://example.com/a')
+
+    assert cache_b.get('sign') == ('https://example.com/a', None)
+
+
+def test_shared_cache_purge(filename):
+    cache = caches.SharedPublishCache(filename)
+    cache.set('old', 'https://example.com/old', 1000)
+    cache.set('new', 'https://example.com/new', 3000)
+    cache.set('forever', 'https://example.com/forever')
+
+    cache.purge(now=2000)
+
+    assert cache.get('old', now=0) is None
+    assert cache.get('new', now=0) == ('https://example.com/new', 3000)
+    assert cache.get('forever', now=0) == ('https://example.com/forever', None)
+
+
+def test_shared_cache_acquire(filename):
+    cache_a = caches.SharedPublishCache(filename)
+    cache_b = caches.SharedPublishCache(filename)
+
+    assert cache_a.acquire('sign', now=1000)
+    assert not cache_b.acquire('sign', now=1000)
+    assert cache_b.acquire('other', now=1000)
+
+    # stale lock
+    assert cache_b.acquire('sign', now=1000 + cache_a.LOCK_DURATION)
+
+    # releasing someone else's lock is a no-op
+    cache_a.release('sign')
+    assert not cache_a.acquire('sign', now=1000 + cache_a.LOCK_DURATION)
+
+    cache_b.release('sign')
+    assert cache_a.acquire('sign', now=1000 + cache_a.LOCK_DURATION)
+
+
+def test_shared_cache_lock(filename):
+    cache_a = caches.SharedPublishCache(filename)
+    cache_b = caches.SharedPublishCache(filename)
+    cache_b.LOCK_POLL_INTERVAL = 0.01
+
+    with cache_a.lock('sign') as acquired:
+        assert acquired
+
+        with cache_b.lock('sign', timeout=0.05) as acquired_b:
+            assert not acquired_b
+
+    with cache_b.lock('sign', timeout=0.05) as acquired_b:
+        assert acquired_b
+
+
+def test_shared_cache_lock_wait(filename):
+    cache_a = caches.SharedPublishCache(filename)
+    cache_b = caches.SharedPublishCache(filename)
+    cache_b.LOCK_POLL_INTERVAL = 0.01
+    locked = threading.Event()
+    done = threading.Event()
+
+    def hold_lock():
+        with cache_a.lock('sign'):
+            locked.set()
+            done.wait(1)
+            cache_a.set('sign', 'https://example.com/a')
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    locked.wait(1)
+    done.set()
+
+    with cache_b.lock('sign', timeout=5) as acquired:
+        assert acquired
+        assert cache_b.get('sign') == ('https://example.com/a', None)
+
+    thread.join()
+
+
+def test_shared_cache_lock_async(filename):
+    cache_a = caches.SharedPublishCache(filename)
+    cache_b = caches.SharedPublishCache(filename)
+
+    async def lock_both():
+        async with cache_a.lock_async('sign') as acquired:
+            assert acquired
+            async with cache_b.lock_async('sign', timeout=0.05) as acquired_b:
+                assert not acquired_b
+
+        async with cache_b.lock_async('sign', timeout=0.05) as acquired_b:
+            assert acquired_b
+
+    asyncio.run(lock_both())
+
+    # the lock is released
+    assert cache_a.acquire('sign')
+
+
+def test_get_size():
+    assert caches.get_size('abc') > caches.get_size('')
+    assert caches.get_size(('abc', 'def')) > caches.get_size(('abc',))
+    assert caches.get_size({'key': 'value'}) > caches.get_size({})
+
+
+def test_memory_cache():
+    registry = caches.CacheRegistry()
+    cache = registry.register('test')
+
+    assert registry.register('test') is cache
+    assert cache.get('key') is None
+
+    cache.set('key', 'value')
+
+    assert 'key' in cache
+    assert cache.get('key') == 'value'
+    assert cache.peek('key') == 'value'
+    assert cache.size == caches.get_size('key') + caches.get_size('value')
+    assert registry.size == cache.size
+    assert cache.get_stats() == caches.CacheStats(
+        'test', 1, cache.size, 1, 1, 0)
+
+    assert cache.pop('key') == 'value'
+    assert cache.size == 0
+    assert len(cache) == 0
+
+
+def test_registry_budget():
+    registry = caches.CacheRegistry(budget=1000)
+    small = registry.register('small')
+    large = registry.register('large')
+
+    small.set('hit', 'a')
+    small.get('hit')
+    small.get('hit')
+    small.set('unused', 'b')
+    large.set('large', 'x' * 400)
+
+    assert registry.size <= 1000
+
+    large.set('other', 'y' * 400)
+
+    # the large value used once is evicted first
+    assert registry.size <= 1000
+    assert 'large' not in large
+    assert 'other' in large
+    assert 'hit' in small
+    assert large.evictions == 1
+
+    registry.budget = 200
+
+    assert registry.size <= 200
+    assert 'other' not in large
+    assert 'hit' in small
+
+
+def test_registry_budget_used_since_pushed():
+    registry = caches.CacheRegistry(budget=1000)
+    cache = registry.register('test')
+
+    cache.set('first', 'a' * 300)
+    cache.set('second', 'b' * 300)
+
+    # used after it was pushed: its stale heap entry is skipped
+    for _ in range(5):
+        cache.get('first')
+
+    cache.set('third', 'c' * 300)
+
+    assert registry.size <= 1000
+    assert 'first' in cache
+    assert 'second' not in cache
+    assert 'third' in cache
+    assert cache.evictions == 1
+
+
+def test_registry_get_without_lock():
+    registry = caches.CacheRegistry()
+    cache = registry.register('test')
+    cache.set('key', 'value')
+
+    with registry.lock:
+        assert cache.get('key') == 'value'
+
+
+def test_registry_value_too_large():
+    registry = caches.CacheRegistry(budget=100)
+    cache = registry.register('test')
+
+    cache.set('key', 'x' * 200)
+
+    assert 'key' not in cache
+    assert cache.size == 0
+
+
+def test_format_stats():
+    assert caches.format_size(512) == '512 B'
+    assert caches.format_size(2048) == '2.0 KiB'
+    assert caches.format_size(3 * 1024 * 1024) == '3.0 MiB'
+    assert caches.format_stats(
+        caches.CacheStats('test', 2, 2048, 3, 1, 5),
+    ) == 'test: 2 entries, 2.0 KiB, 75% hits (3/4), 5 evictions'
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from sopel_help import cli
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = {output}
+origin_output_dir = {output_dir}
+origin_json_index = {json_index}
+"""
+
+
+@pytest.fixture
+def output_dir(tmpdir):
+    return tmpdir.mkdir('docs')
+
+
+def make_config(configfactory, output_dir, output='site', json_index='no'):
+    settings = configfactory('test.cfg', TMP_CONFIG.format(
+        output=output, output_dir=str(output_dir), json_index=json_index))
+    return settings.filename
+
+
+def test_build_default(configfactory, output_dir, capsys):
+    filename = make_config(configfactory, output_dir, json_index='yes')
+
+    assert cli.main(['build', '-c', filename, '-j', '2']) == 0
+
+    assert output_dir.join('help.html').check()
+    assert output_dir.join('help-help.html').check()
+    assert output_dir.join('help.json').check()
+    assert output_dir.join('help.version').check()
+
+    out, _ = capsys.readouterr()
+    assert 'Built site in ' in out
+    assert 'Built json in ' in out
+
+
+def test_build_targets(configfactory, output_dir):
+    filename = make_config(configfactory, output_dir)
+
+    assert cli.main(['build', '-c', filename, 'json']) == 0
+
+    assert sorted(output_dir.listdir()) == [
+        output_dir.join('help.json'),
+        output_dir.join('help.version'),
+    ]
+    result = json.loads(output_dir.join('help.json').read())
+    assert 'help' in result['commands']
+
+
+def test_build_html(configfactory, output_dir, tmpdir):
+    filename = make_config(configfactory, output_dir, output='local')
+    other_dir = tmpdir.mkdir('other')
+
+    assert cli.main([
+        'build', '-c', filename, '-o', str(other_dir)]) == 0
+
+    assert other_dir.join('help.html').check()
+    assert not output_dir.join('help.html').check()
+
+
+def test_build_nothing(configfactory, output_dir, capsys):
+    filename = make_config(configfactory, output_dir, output='base')
+
+    assert cli.main(['build', '-c', filename]) == cli.ERR_CODE
+
+    _, err = capsys.readouterr()
+    assert 'Nothing to build' in err
+
+
+def test_build_error(configfactory, output_dir, capsys):
+    filename = make_config(configfactory, output_dir)
+    output_dir.remove()
+
+    assert cli.main(['build', '-c', filename, 'json']) == cli.ERR_CODE
+
+    _, err = capsys.readouterr()
+    assert 'Error building json' in err
+
+
+def test_build_unknown_target(configfactory, output_dir, capsys):
+    filename = make_config(configfactory, output_dir)
+
+    assert cli.main(['build', '-c', filename, 'pdf']) == cli.ERR_CODE
+
+    _, err = capsys.readouterr()
+    assert 'Unknown target(s): pdf' in err
+
+
+def test_build_config_not_found(tmpdir):
+    filename = str(tmpdir.join('missing.cfg'))
+
+    assert cli.main(['build', '-c', filename]) == cli.ERR_CODE
+
+
+def test_no_action(capsys):
+    assert cli.main([]) == cli.ERR_CODE
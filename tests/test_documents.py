@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from sopel_help import caches, documents
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+"""
+
+COMMAND_GROUPS = {
+    'group_b': ['command_b_b', 'command_b_a'],
+    'group_a': ['command_a_a', 'command_a_b', 'command_a_a'],
+}
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_document():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    assert document.categories == (
+        ('group_a', ('command_a_a', 'command_a_b')),
+        ('group_b', ('command_b_a', 'command_b_b')),
+    )
+
+
+def test_document_version():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+    same = documents.HelpDocument(COMMAND_GROUPS.items())
+    other = documents.HelpDocument({'group_a': ['command_a_a']}.items())
+
+    assert document.version == same.version
+    assert document.version != other.version
+
+
+def test_category_index():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    assert document.category_index == {'group_a': 0, 'group_b': 1}
+
+
+def test_get_category_block():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    block = document.get_category_block('GROUP_B', 'text', width=70)
+
+    assert block == 'GROUP_B  command_b_a  command_b_b'
+    assert block is document.render('text', width=70)[1]
+    assert document.get_category_block('unknown', 'text') is None
+
+
+def test_get_document_cached():
+    document = documents.get_document(COMMAND_GROUPS)
+
+    assert documents.get_document(dict(COMMAND_GROUPS)) is document
+    assert documents.get_document({'group_a': ['command']}) is not document
+    assert documents.DOCUMENTS.size >= caches.get_size(document)
+
+
+def test_render_cached():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    result = document.render('html')
+
+    assert document.render('html') is result
+    assert document.render('text', width=70) is not result
+    assert document.render('text', width=70) is document.render(
+        'text', width=70)
+
+
+def test_render_unknown_format():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    with pytest.raises(ValueError):
+        document.render('unknown')
+
+
+def test_render_text():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    assert list(document.render_text()) == [
+        'GROUP_A  command_a_a  command_a_b',
+        'GROUP_B  command_b_a  command_b_b',
+    ]
+
+
+def test_render_text_empty():
+    document = documents.HelpDocument([])
+
+    assert list(document.render_text()) == []
+
+
+def test_render_markdown():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    assert list(document.render_markdown()) == [
+        '## GROUP_A\n\n* `command_a_a`\n* `command_a_b`',
+        '## GROUP_B\n\n* `command_b_a`\n* `command_b_b`',
+    ]
+
+
+def test_render_json():
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    result = ''.join(document.render_json())
+
+    assert json.loads(result) == {
+        'version': document.version,
+        'categories': {
+            'group_a': ['command_a_a', 'command_a_b'],
+            'group_b': ['command_b_a', 'command_b_b'],
+        },
+        'commands': {
+            'command_a_a': {'category': 'group_a'},
+            'command_a_b': {'category': 'group_a'},
+            'command_b_a': {'category': 'group_b'},
+            'command_b_b': {'category': 'group_b'},
+        },
+    }
+    assert ' ' not in result
+
+
+def test_render_json_details():
+    document = documents.HelpDocument(
+        {'group_a': ['command_a']}.items(),
+        [('command_a', ['Do something.'], ['.command_a x'], ['ca'])])
+
+    result = json.loads(''.join(document.render_json()))
+
+    assert result['commands'] == {
+        'command_a': {
+            'category': 'group_a',
+            'doc': ['Do something.'],
+            'examples': ['.command_a x'],
+            'aliases': ['ca'],
+        },
+    }
+
+
+def test_get_bot_document(mockbot):
+    document = documents.get_bot_document(mockbot)
+
+    assert ('help', ('help', 'helpcaches', 'helpreload', 'helpstats')) in (
+        document.categories)
+    docs, examples, aliases = document.details['help']
+    assert docs == ("Generate help for Sopel's commands.",)
+    assert examples == ('.help help', '.help')
+    assert aliases == ('h',)
+    assert documents.get_bot_document(mockbot) is document
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+from sopel_help import documents, exports
+
+COMMAND_GROUPS = {
+    'group_a': ['command_a_a', 'command_a_b'],
+}
+
+
+def test_save_atomic(tmpdir):
+    filename = str(tmpdir.join('file.txt'))
+
+    assert exports.save_atomic(filename, ['a', 'b']) == filename
+    assert tmpdir.join('file.txt').read() == 'ab'
+
+    exports.save_atomic(filename, ['c'])
+    assert tmpdir.join('file.txt').read() == 'c'
+    # no temporary file left behind
+    assert os.listdir(str(tmpdir)) == ['file.txt']
+
+
+def test_save_atomic_error(tmpdir):
+    filename = str(tmpdir.join('file.txt'))
+    exports.save_atomic(filename, ['original'])
+
+    def chunks():
+        yield 'partial'
+        raise RuntimeError('error')
+
+    with pytest.raises(RuntimeError):
+        exports.save_atomic(filename, chunks())
+
+    assert tmpdir.join('file.txt').read() == 'original'
+    assert os.listdir(str(tmpdir)) == ['file.txt']
+
+
+def test_json_index_exporter(tmpdir):
+    exporter = exports.JSONIndexExporter(str(tmpdir), 'help.json')
+    document = documents.HelpDocument(COMMAND_GROUPS.items())
+
+    assert exporter.get_exported_version() is None
+    assert exporter.export(document)
+
+    result = json.loads(tmpdir.join('help.json').read())
+    assert result['version'] == document.version
+    assert result['categories'] == COMMAND_GROUPS
+    assert tmpdir.join('help.version').read() == document.version + '\n'
+
+    # same version: nothing to do
+    assert not exporter.export(document)
+
+    # from a new exporter, e.g. after a restart
+    exporter = exports.JSONIndexExporter(str(tmpdir), 'help.json')
+    assert exporter.get_exported_version() == document.version
+    assert not exporter.export(document)
+
+    other = documents.HelpDocument({'group_b': ['command_b']}.items())
+    assert exporter.export(other)
+    assert tmpdir.join('help.version').read() == other.version + '\n'
@@ -5,7 +5,9 @@ import pytest
 from sopel.tests import rawlist
 from sopel.tools import get_input
 
+from sopel_help.managers import manager
 from sopel_help.plugin import configure
+from sopel_help.scheduler import HelpScheduler
 
 TMP_CONFIG = """
 [core]
@@ -59,6 +61,101 @@ def test_help_command_unknown(irc, userfactory):
     )
 
 
+def test_help_command_batch(irc, userfactory):
+    user = userfactory('Exirel')
+    irc.pm(user, '.help help doesnotexist HELP')
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG Exirel :help: Generate help for Sopel's commands. | "
+        "Unknown command \"doesnotexist\"",
+    )
+
+
+@pytest.fixture
+def help_scheduler():
+    help_scheduler = HelpScheduler()
+    # lines stay pending: the thread isn't started
+    with mock.patch.object(help_scheduler, 'start'):
+        with mock.patch.object(manager, 'scheduler', help_scheduler):
+            yield help_scheduler
+
+
+def test_help_drip_rate(irc, userfactory, help_scheduler):
+    irc.bot.settings.help.drip_rate = 2
+    manager.refresh_settings(irc.bot)
+    try:
+        irc.pm(userfactory('Exirel'), '.help')
+    finally:
+        irc.bot.settings.help.drip_rate = 0
+        manager.refresh_settings(irc.bot)
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG Exirel :Here is my list of commands:",
+    )
+    assert help_scheduler.rate == 2
+    assert help_scheduler.pending('Exirel') > 1
+
+
+def test_help_stop(irc, userfactory, help_scheduler):
+    help_scheduler.schedule(irc.bot, 'Exirel', ['line 1', 'line 2'])
+    help_scheduler.schedule(irc.bot, 'Other', ['line 1'])
+    irc.pm(userfactory('Exirel'), '.help stop')
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG Exirel :Exirel: Stopped sending help (2 lines dropped).",
+    )
+    assert help_scheduler.pending('Exirel') == 0
+    assert help_scheduler.pending('Other') == 1
+
+
+def test_help_stop_nothing_pending(irc, userfactory, help_scheduler):
+    irc.pm(userfactory('Exirel'), '.help stop')
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG Exirel :Unknown command \"stop\"",
+    )
+
+
+def test_help_quit(irc, userfactory, help_scheduler):
+    user = userfactory('Exirel')
+    help_scheduler.schedule(irc.bot, 'Exirel', ['line 1', 'line 2'])
+    help_scheduler.schedule(irc.bot, 'Other', ['line 1'])
+    irc.bot.on_message(':%s QUIT :Quit: Bye' % user.prefix)
+
+    assert help_scheduler.pending('Exirel') == 0
+    assert help_scheduler.pending('Other') == 1
+
+
+def test_help_category(irc, userfactory):
+    user = userfactory('Exirel')
+    irc.pm(user, '.help CoreTasks')
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG Exirel :CORETASKS  blocks  execute  useserviceauth",
+    )
+
+
+def test_help_category_not_counted(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.help CoreTasks')
+
+    # a category is not a command: it's neither a lookup nor a miss
+    assert manager.stats.lookups.get('coretasks') == 0
+    assert manager.stats.misses.get('coretasks') == 0
+
+
+def test_help_alias_counted_as_command(irc, userfactory):
+    user = userfactory('Exirel')
+    before = manager.stats.lookups.get('help')
+    irc.pm(user, '.help h')
+    irc.pm(user, '.help help')
+    irc.pm(user, '.help h helpreload')
+
+    # the alias is counted as its command
+    lookups = manager.stats.lookups.get('help') - before
+    assert lookups == pytest.approx(3, abs=0.01)
+    assert manager.stats.lookups.get('h') == 0
+
+
 def test_help_command_channel(irc, userfactory):
     user = userfactory('Exirel')
     irc.say(user, '#sopel', '.help help')
@@ -69,6 +166,69 @@ def test_help_command_channel(irc, userfactory):
     )
 
 
+def test_help_reload(irc, userfactory):
+    irc.bot.settings.help.reply_method = 'notice'
+    irc.pm(userfactory('testnick'), '.helpreload')
+
+    assert irc.bot.backend.message_sent == rawlist(
+        "PRIVMSG testnick :testnick: Help settings reloaded.",
+    )
+
+    irc.bot.backend.clear_message_sent()
+    irc.say(userfactory('Exirel'), '#channel', '.help help')
+
+    assert irc.bot.backend.message_sent[0] == rawlist(
+        "NOTICE Exirel :Generate help for Sopel's commands.",
+    )[0]
+
+
+def test_help_reload_not_owner(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.helpreload')
+
+    assert irc.bot.backend.message_sent == []
+
+
+def test_help_stats(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.help help')
+    irc.pm(userfactory('Exirel'), '.help doesnotexist')
+    irc.bot.backend.clear_message_sent()
+    irc.pm(userfactory('testnick'), '.helpstats')
+
+    lines = irc.bot.backend.message_sent
+    assert len(lines) == 3
+    assert lines[0].startswith(b'PRIVMSG testnick :Most requested commands: ')
+    assert b'help (' in lines[0]
+    assert lines[1].startswith(
+        b'PRIVMSG testnick :Most requested unknown commands: ')
+    assert b'doesnotexist (' in lines[1]
+    assert lines[2].startswith(b'PRIVMSG testnick :Downgraded replies: ')
+
+
+def test_help_caches(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.help')
+    irc.bot.backend.clear_message_sent()
+    irc.pm(userfactory('testnick'), '.helpcaches')
+
+    lines = irc.bot.backend.message_sent
+    assert lines[0].startswith(b'PRIVMSG testnick :Help caches: ')
+    assert any(
+        line.startswith(b'PRIVMSG testnick :rendered blocks: ')
+        for line in lines[1:]
+    )
+
+
+def test_help_caches_not_owner(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.helpcaches')
+
+    assert irc.bot.backend.message_sent == []
+
+
+def test_help_stats_not_owner(irc, userfactory):
+    irc.pm(userfactory('Exirel'), '.helpstats')
+
+    assert irc.bot.backend.message_sent == []
+
+
 def test_configure(tmpconfig):
     with mock.patch('sopel.config.types.get_input') as mock_input:
         mock_input.side_effect = ["base", "query"]
@@ -140,3 +300,20 @@ def test_configure_local_default(tmpconfig):
     assert tmpconfig.help.origin_base_url == 'https://example.com/sopel/'
     assert tmpconfig.help.origin_output_name == 'help.html'
     assert tmpconfig.help.origin_output_dir == '/var/www/html'
+
+
+def test_configure_chain(tmpconfig):
+    with mock.patch('sopel.config.types.get_input') as mock_input:
+        mock_input.side_effect = ["0x0,clbin", "query"]
+        configure(tmpconfig)
+
+    assert tmpconfig.help.output == '0x0, clbin'
+
+
+def test_configure_chain_invalid(tmpconfig):
+    with mock.patch('sopel.config.types.get_input') as mock_input:
+        # an invalid value is asked again
+        mock_input.side_effect = ["0x0, invalid", "clbin", "query"]
+        configure(tmpconfig)
+
+    assert tmpconfig.help.output == 'clbin'
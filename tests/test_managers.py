@@ -1,5 +1,10 @@
+from unittest import mock
+
+import importlib_metadata
 import pytest
 from sopel import config
+from sopel.tests import rawlist
+from sopel.tools import Identifier
 
 from sopel_help import managers, providers
 
@@ -46,11 +51,14 @@ def test_provider_names():
     assert 'clbin' in manager.provider_names
     assert '0x0' in manager.provider_names
     assert 'termbin' in manager.provider_names
+    assert 'hedged' in manager.provider_names
+    assert 'site' in manager.provider_names
 
 
 def test_setup_invalid_provider(tmpconfig, botfactory):
     class MockHelpSection(config.types.StaticSection):
         output = config.types.ValidatedAttribute('output', str, default='base')
+        channel_outputs = config.types.ListAttribute('channel_outputs')
 
     mockbot = botfactory(tmpconfig)
     mockbot.settings.define_section('help', MockHelpSection)
@@ -59,3 +67,370 @@ def test_setup_invalid_provider(tmpconfig, botfactory):
 
     with pytest.raises(RuntimeError):
         manager.setup(mockbot)
+
+
+def test_registry_is_cached():
+    manager = managers.Manager()
+
+    with mock.patch(
+        'importlib_metadata.entry_points',
+        wraps=importlib_metadata.entry_points,
+    ) as mock_entry_points:
+        registry = manager.get_registry()
+        assert 'base' in registry
+        assert manager.get_registry() is registry
+        assert 'local' in manager.provider_names
+        manager.load_provider('base')
+        manager.load_provider('local')
+
+    assert mock_entry_points.call_count == 1
+
+
+def test_registry_refresh():
+    manager = managers.Manager()
+    registry = manager.get_registry()
+    provider_class = manager.get_provider_class('base')
+
+    manager.refresh()
+
+    assert manager.get_registry() is not registry
+    assert manager.get_provider_class('base') is provider_class
+
+
+def test_get_provider_class():
+    manager = managers.Manager()
+
+    assert manager.get_provider_class('base') is providers.Base
+    assert manager.get_provider_class('local') is providers.LocalFile
+    assert isinstance(manager.load_provider('base'), providers.Base)
+
+
+def test_get_provider_class_memoized():
+    manager = managers.Manager()
+    manager.get_provider_class('base')
+
+    with mock.patch.object(
+        importlib_metadata.EntryPoint, 'load'
+    ) as mock_load:
+        assert manager.get_provider_class('base') is providers.Base
+
+    assert not mock_load.called
+
+
+def test_get_provider_class_invalid():
+    manager = managers.Manager()
+
+    with pytest.raises(RuntimeError):
+        manager.get_provider_class('invalid')
+
+
+TMP_CONFIG_CHAIN = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = 0x0, clbin
+publish_attempts = 1
+"""
+
+CHANNEL_LINE = ':Test!test@example.com PRIVMSG #channel :.help'
+
+
+@pytest.fixture
+def chainbot(configfactory, botfactory):
+    tmpconfig = configfactory('test.cfg', TMP_CONFIG_CHAIN)
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_split_provider_names():
+    assert managers.split_provider_names('base') == ['base']
+    assert managers.split_provider_names(' 0x0 ,clbin, ') == ['0x0', 'clbin']
+    assert managers.split_provider_names('0x0, base, 0x0') == ['0x0', 'base']
+    assert managers.split_provider_names('') == []
+
+
+def test_setup_chain(chainbot):
+    manager = managers.Manager()
+    manager.setup(chainbot)
+
+    assert chainbot.settings.help.output == '0x0, clbin'
+    assert isinstance(manager.provider, providers.NullPointerPublisher)
+    assert [name for name, _ in manager.providers] == ['0x0', 'clbin', 'base']
+
+
+def test_help_commands_fallback(chainbot, triggerfactory, requests_mock):
+    requests_mock.post('https://0x0.st/', status_code=502)
+    requests_mock.post('https://clbin.com/', text='https://clbin.com/abc')
+    manager = managers.Manager()
+    manager.setup(chainbot)
+    wrapper = triggerfactory.wrapper(chainbot, CHANNEL_LINE)
+
+    manager.help_commands(wrapper, wrapper._trigger)
+
+    assert chainbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published a list of my commands at: "
+        "https://clbin.com/abc",
+    )
+    assert manager.get_health('0x0').failures == 1
+    assert manager.get_health('clbin').successes == 1
+
+
+def test_help_commands_async(chainbot, triggerfactory, requests_mock):
+    requests_mock.post('https://0x0.st/', status_code=502)
+    requests_mock.post('https://clbin.com/', text='https://clbin.com/abc')
+    manager = managers.Manager()
+    manager.setup(chainbot)
+    wrapper = triggerfactory.wrapper(chainbot, CHANNEL_LINE)
+
+    try:
+        future = manager.loop.submit(
+            manager.help_commands_async(wrapper, wrapper._trigger))
+        future.result(5)
+    finally:
+        manager.loop.stop()
+
+    assert chainbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published a list of my commands at: "
+        "https://clbin.com/abc",
+    )
+    assert manager.get_health('0x0').failures == 1
+    assert manager.get_health('clbin').successes == 1
+    assert not manager.loop.is_running
+
+
+def test_help_commands_circuit_open(chainbot, triggerfactory, requests_mock):
+    failing = requests_mock.post('https://0x0.st/', status_code=502)
+    requests_mock.post('https://clbin.com/', status_code=502)
+    manager = managers.Manager()
+    manager.setup(chainbot)
+    wrapper = triggerfactory.wrapper(chainbot, CHANNEL_LINE)
+
+    for _ in range(managers.ProviderHealth.FAILURE_THRESHOLD + 1):
+        manager.help_commands(wrapper, wrapper._trigger)
+
+    # the circuit is open after the threshold: the service isn't called
+    assert failing.call_count == managers.ProviderHealth.FAILURE_THRESHOLD
+    assert manager.get_health('0x0').is_open
+    assert manager.get_health('clbin').is_open
+    assert not manager.get_health('base').is_open
+    # always falls back to the base provider
+    assert chainbot.backend.message_sent[0] == rawlist(
+        "PRIVMSG #channel :Test: I'll send you a list of commands in private.",
+    )[0]
+
+
+def test_provider_health():
+    health = managers.ProviderHealth('test')
+    assert health.available()
+
+    for _ in range(health.FAILURE_THRESHOLD - 1):
+        health.record_failure(1.0, now=100)
+        assert health.available(now=100)
+
+    health.record_failure(1.0, now=100)
+    assert health.is_open
+    assert not health.available(now=100)
+    assert health.available(now=100 + health.RECOVERY_TIMEOUT)
+
+    # half-open: one failure opens the circuit again
+    health.record_failure(1.0, now=500)
+    assert not health.available(now=500)
+
+    health.record_success(0.5)
+    assert not health.is_open
+    assert health.available(now=500)
+    assert health.successes == 1
+    assert health.failures == health.FAILURE_THRESHOLD + 1
+    assert 0.5 < health.latency < 1.0
+
+
+def test_provider_health_half_open():
+    health = managers.ProviderHealth('test')
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record_failure(1.0, now=100)
+
+    recovery = 100 + health.RECOVERY_TIMEOUT
+
+    # only one caller can try while the circuit is half-open
+    assert health.available(now=recovery)
+    assert not health.available(now=recovery)
+    assert not health.available(now=recovery + 1)
+
+    # the attempt never reported its result: allow another one
+    assert health.available(now=recovery + health.RECOVERY_TIMEOUT)
+
+    health.record_success(0.5)
+    assert health.available(now=recovery)
+    assert health.available(now=recovery)
+
+
+def test_refresh_content(chainbot, requests_mock):
+    requests_mock.post('https://0x0.st/', text='https://0x0.st/abc')
+    manager = managers.Manager()
+    manager.setup(chainbot)
+
+    manager.refresh_content(chainbot)
+
+    # one document for the owner (with .helpreload), one for everyone else
+    assert requests_mock.call_count == 2
+
+
+def test_refresh_content_pinned_replies(chainbot, requests_mock):
+    requests_mock.post('https://0x0.st/', text='https://0x0.st/abc')
+    manager = managers.Manager()
+    manager.setup(chainbot)
+    manager.stats.record_lookup('help')
+    manager.stats.record_lookup('help')
+    manager.stats.record_lookup('helpreload')
+    manager.stats.record_miss('unknown')
+
+    manager.refresh_content(chainbot)
+
+    pinned_replies = manager.provider.pinned_replies
+    assert len(pinned_replies) == 2
+    assert 'help' in pinned_replies
+    assert 'helpreload' in pinned_replies
+
+    chainbot.settings.help.pinned_replies = 1
+    manager.refresh_settings(chainbot)
+    manager.refresh_content(chainbot)
+
+    assert len(pinned_replies) == 1
+    assert 'help' in pinned_replies
+
+
+def test_refresh_content_error(chainbot, requests_mock):
+    requests_mock.post('https://0x0.st/', status_code=502)
+    manager = managers.Manager()
+    manager.setup(chainbot)
+
+    # errors are not raised
+    manager.refresh_content(chainbot)
+
+    assert requests_mock.call_count == 1
+
+
+TMP_CONFIG_CHANNELS = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = clbin
+publish_attempts = 1
+channel_outputs =
+    "#small:base"
+    "#large:0x0, clbin"
+"""
+
+
+@pytest.fixture
+def channelsbot(configfactory, botfactory):
+    tmpconfig = configfactory('test.cfg', TMP_CONFIG_CHANNELS)
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_split_channel_output():
+    assert managers.split_channel_output('#chan:local') == (
+        '#chan', ['local'])
+    assert managers.split_channel_output('#chan: 0x0, clbin') == (
+        '#chan', ['0x0', 'clbin'])
+
+    with pytest.raises(ValueError):
+        managers.split_channel_output('local')
+
+    with pytest.raises(ValueError):
+        managers.split_channel_output('#chan:')
+
+
+def test_setup_pool(channelsbot):
+    manager = managers.Manager()
+    with mock.patch.object(
+            providers.Base, 'setup', autospec=True) as mock_setup:
+        manager.setup(channelsbot)
+
+    # each provider is set up once
+    assert sorted(manager.pool) == ['0x0', 'base', 'clbin']
+    assert mock_setup.call_count == 1
+    assert [name for name, _ in manager.providers] == ['clbin', 'base']
+    # providers are shared between chains
+    chain = manager.get_chain(mock.Mock(sender=Identifier('#LARGE')))
+    assert [name for name, _ in chain] == ['0x0', 'clbin', 'base']
+    assert chain[1][1] is manager.provider
+
+
+def test_refresh_settings_error(channelsbot):
+    manager = managers.Manager()
+    manager.setup(channelsbot)
+    settings = manager.settings
+
+    channelsbot.settings.help.pinned_replies = 1
+    with mock.patch.object(
+            providers.Base, 'setup', autospec=True,
+            side_effect=[RuntimeError('invalid'), None]) as mock_setup:
+        with pytest.raises(RuntimeError):
+            manager.refresh_settings(channelsbot)
+
+    # the providers are set up again with the current settings
+    assert mock_setup.call_count == 2
+    assert manager.settings is settings
+    assert manager.settings.pinned_replies != 1
+    assert all(
+        provider.settings is settings
+        for provider in manager.pool.values()
+    )
+
+
+def test_get_provider_channel(channelsbot, triggerfactory):
+    manager = managers.Manager()
+    manager.setup(channelsbot)
+
+    small = triggerfactory.wrapper(
+        channelsbot, ':Test!test@example.com PRIVMSG #small :.help')
+    other = triggerfactory.wrapper(
+        channelsbot, ':Test!test@example.com PRIVMSG #other :.help')
+    private = triggerfactory.wrapper(
+        channelsbot, ':Test!test@example.com PRIVMSG TestBot :.help')
+
+    assert manager.get_provider(small._trigger) is manager.pool['base']
+    assert manager.get_provider(other._trigger) is manager.provider
+    assert manager.get_provider(private._trigger) is manager.provider
+
+
+def test_help_commands_channel(channelsbot, triggerfactory, requests_mock):
+    requests_mock.post('https://0x0.st/', text='https://0x0.st/abc')
+    manager = managers.Manager()
+    manager.setup(channelsbot)
+    wrapper = triggerfactory.wrapper(
+        channelsbot, ':Test!test@example.com PRIVMSG #large :.help')
+
+    manager.help_commands(wrapper, wrapper._trigger)
+
+    assert channelsbot.backend.message_sent == rawlist(
+        "PRIVMSG #large :Test: I've published a list of my commands at: "
+        "https://0x0.st/abc",
+    )
+
+
+def test_refresh_content_channels(channelsbot, requests_mock):
+    requests_mock.post('https://0x0.st/', text='https://0x0.st/abc')
+    requests_mock.post('https://clbin.com/', text='https://clbin.com/abc')
+    manager = managers.Manager()
+    manager.setup(channelsbot)
+
+    manager.refresh_content(channelsbot)
+
+    # the first provider of each chain: clbin, base, and 0x0; each with one
+    # document for the owner, and one for everyone else
+    assert requests_mock.call_count == 4
+
+
+def test_setup_invalid_channel_output(configfactory, botfactory):
+    tmpconfig = configfactory('test.cfg', TMP_CONFIG_CHANNELS.replace(
+        '#small:base', '#small:invalid'))
+
+    with pytest.raises(ValueError):
+        botfactory.preloaded(tmpconfig, preloads=['help'])
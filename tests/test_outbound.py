@@ -0,0 +1,23 @@
+from sopel_help import outbound
+
+
+class MockBot:
+    def __init__(self, stack=None):
+        if stack is not None:
+            self.stack = stack
+
+
+def test_get_backlog():
+    bot = MockBot({
+        '#channel': {'messages': [(80, 'old'), (95, 'a'), (100, 'b')]},
+        'Exirel': {'messages': [(91, 'c')], 'flood_left': 0},
+        'Other': {'messages': []},
+    })
+
+    assert outbound.get_backlog(bot, window=10, now=100) == 3
+    assert outbound.get_backlog(bot, window=30, now=100) == 4
+    assert outbound.get_backlog(bot, window=10, now=200) == 0
+
+
+def test_get_backlog_no_stack():
+    assert outbound.get_backlog(MockBot(), now=100) == 0
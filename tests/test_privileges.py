@@ -0,0 +1,130 @@
+from unittest import mock
+
+import pytest
+from sopel import plugin
+from sopel.plugins import rules as plugin_rules
+from sopel.tools import Identifier, target
+
+from sopel_help import privileges
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+admins = adminnick
+nick = TestBot
+enable = coretasks, help
+"""
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+@pytest.mark.parametrize('nick, level, expected', (
+    ('testnick', 0, privileges.OWNER),
+    ('adminnick', 0, privileges.ADMIN),
+    ('Test', 0, privileges.USER),
+    ('Test', plugin.VOICE, privileges.VOICE),
+    ('Test', plugin.HALFOP, privileges.HALFOP),
+    ('Test', plugin.OP, privileges.OP),
+    ('Test', plugin.OWNER, privileges.OP),
+))
+def test_get_trigger_tier(mockbot, triggerfactory, nick, level, expected):
+    channel = target.Channel(Identifier('#channel'))
+    channel.privileges[Identifier(nick)] = level
+    mockbot.channels[channel.name] = channel
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':%s!test@example.com PRIVMSG #channel :.help' % nick)
+
+    assert privileges.get_trigger_tier(mockbot, wrapper._trigger) == expected
+
+
+def test_get_trigger_tier_private(mockbot, triggerfactory):
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG TestBot :.help')
+
+    assert privileges.get_trigger_tier(
+        mockbot, wrapper._trigger) == privileges.USER
+
+
+def test_get_usages_tier():
+    assert privileges.get_usages_tier([]) == privileges.USER
+    assert privileges.get_usages_tier([
+        {'is_owner': True},
+    ]) == privileges.OWNER
+    assert privileges.get_usages_tier([
+        {'is_owner': True},
+        {'is_admin': True},
+    ]) == privileges.ADMIN
+    assert privileges.get_usages_tier([
+        {'is_owner': True},
+        {},
+    ]) == privileges.USER
+
+
+def test_parse_command_privileges():
+    assert privileges.parse_command_privileges(
+        ('Kick:op', 'restart: owner', 'invalid', 'ban:unknown')
+    ) == (('kick', 'op'), ('restart', 'owner'))
+
+
+def test_help_views():
+    views = privileges.HelpViews(
+        (('admin', ('restart', 'set')), ('chan', ('kick', 'topic'))),
+        (('restart', 'owner'), ('set', 'admin'), ('kick', 'op')),
+    )
+
+    assert views.get(privileges.USER) == {'chan': ['topic']}
+    assert views.get(privileges.OP) == {'chan': ['kick', 'topic']}
+    assert views.get(privileges.ADMIN) == {
+        'admin': ['set'],
+        'chan': ['kick', 'topic'],
+    }
+    assert views.get(privileges.OWNER) == {
+        'admin': ['restart', 'set'],
+        'chan': ['kick', 'topic'],
+    }
+    assert [tier for tier, _ in views.items()] == list(privileges.TIERS)
+
+
+def test_get_views(mockbot):
+    mockbot.settings.help.command_privileges = ['help:op']
+
+    views = privileges.get_views(mockbot)
+
+    assert 'help' not in views.get(privileges.USER)
+    assert views.get(privileges.OP)['help'] == ['help']
+    # built once for the same commands
+    assert privileges.get_views(mockbot) is views
+
+
+def test_get_views_commands_unchanged(mockbot):
+    views = privileges.get_views(mockbot)
+
+    # the commands are not read again until they change
+    with mock.patch.object(
+            privileges, 'get_usages_tier') as mock_get_usages_tier:
+        assert privileges.get_views(mockbot) is views
+
+    assert not mock_get_usages_tier.called
+
+
+def test_get_views_commands_changed(mockbot):
+    views = privileges.get_views(mockbot)
+
+    command = plugin_rules.Command('secret', plugin='secretplugin', usages=[
+        {'example': '.secret', 'is_owner': True},
+    ])
+    mockbot._rules_manager.register_command(command)
+    updated = privileges.get_views(mockbot)
+
+    assert updated is not views
+    assert 'secretplugin' not in updated.get(privileges.ADMIN)
+    assert updated.get(privileges.OWNER)['secretplugin'] == ['secret']
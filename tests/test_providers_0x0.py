@@ -1,4 +1,5 @@
 import pytest
+import requests
 
 from sopel_help import providers
 
@@ -20,6 +21,25 @@ def test_publish(requests_mock):
         'The CLBinPublisher must return the response text as-is')
 
 
+def test_publish_document(requests_mock):
+    requests_mock.post(
+        MOCK_URL, text=MOCK_RESULT, headers={'X-Expires': '1700000000000'})
+    provider = providers.NullPointerPublisher()
+
+    result = provider.publish_document(None, None, 'This is my content.')
+
+    assert result == (MOCK_RESULT, 1700000000)
+
+
+def test_publish_document_no_expiry(requests_mock):
+    requests_mock.post(MOCK_URL, text=MOCK_RESULT)
+    provider = providers.NullPointerPublisher()
+
+    result = provider.publish_document(None, None, 'This is my content.')
+
+    assert result == (MOCK_RESULT, None)
+
+
 def test_publish_error(requests_mock):
     requests_mock.post(MOCK_URL, status_code=404)
 
@@ -29,3 +49,30 @@ def test_publish_error(requests_mock):
 
     with pytest.raises(providers.PublishingError):
         provider.publish(None, None, 'This is my content.')
+
+
+@pytest.mark.parametrize('status_code', [429, 500, 502, 503, 504])
+def test_publish_error_retryable(requests_mock, status_code):
+    requests_mock.post(MOCK_URL, status_code=status_code)
+    provider = providers.NullPointerPublisher()
+
+    with pytest.raises(providers.RetryablePublishingError):
+        provider.publish(None, None, 'This is my content.')
+
+
+def test_publish_error_fatal(requests_mock):
+    requests_mock.post(MOCK_URL, status_code=400)
+    provider = providers.NullPointerPublisher()
+
+    with pytest.raises(providers.PublishingError) as excinfo:
+        provider.publish(None, None, 'This is my content.')
+
+    assert not isinstance(excinfo.value, providers.RetryablePublishingError)
+
+
+def test_publish_error_timeout(requests_mock):
+    requests_mock.post(MOCK_URL, exc=requests.exceptions.ConnectTimeout)
+    provider = providers.NullPointerPublisher()
+
+    with pytest.raises(providers.RetryablePublishingError):
+        provider.publish(None, None, 'This is my content.')
@@ -1,3 +1,5 @@
+from unittest import mock
+
 import pytest
 
 from sopel_help import providers
@@ -15,6 +17,32 @@ def test_help_command():
         abstract.help_command(None, None, 'test')
 
 
+class MockProvider(providers.AbstractProvider):
+    def __init__(self):
+        self.names = []
+
+    def help_command(self, bot, trigger, name):
+        if name == 'unknown':
+            raise providers.UnknownCommand('Unknown command "%s"' % name)
+        self.names.append(name)
+        return name
+
+
+def test_help_command_batch():
+    provider = MockProvider()
+    bot = mock.Mock()
+    bot.settings.help.batch_limit = 3
+
+    found, unknown = provider.help_command_batch(
+        bot, None, ['help', 'unknown', 'seen', 'tell'])
+
+    # one help_command per name, up to the batch limit
+    assert found == ['help', 'seen']
+    assert unknown == ['unknown']
+    assert provider.names == ['help', 'seen']
+    bot.reply.assert_called_once_with('Unknown command "unknown"')
+
+
 def test_generate_help_commands():
     abstract = providers.AbstractGeneratedProvider()
     with pytest.raises(NotImplementedError):
@@ -1,9 +1,12 @@
+import asyncio
+import datetime
 import time
+from unittest import mock
 
 import pytest
 from sopel.tests import rawlist
 
-from sopel_help import providers
+from sopel_help import providers, web
 
 TMP_CONFIG = """
 [core]
@@ -108,3 +111,508 @@ def test_send_help_commands_cache(mockbot, triggerfactory):
     provider.send_help_commands(wrapper, wrapper._trigger, lines + ['line 3'])
 
     assert provider.get_cached_value(signature) is None
+
+
+class MockFlakyPublisher(providers.AbstractPublisher):
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.attempts = 0
+
+    def publish(self, bot, trigger, content):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'https://example.com/content'
+
+
+def test_get_retry_delay():
+    provider = providers.AbstractPublisher()
+
+    for attempt in range(1, 10):
+        delay = provider.get_retry_delay(attempt)
+        assert 0 <= delay <= provider.DEFAULT_RETRY_MAX_DELAY
+        assert delay <= provider.DEFAULT_RETRY_DELAY * 2 ** (attempt - 1)
+
+
+def test_publish_with_retry(mockbot):
+    provider = MockFlakyPublisher([
+        providers.RetryablePublishingError('502'),
+        providers.RetryablePublishingError('502'),
+    ])
+
+    with mock.patch('asyncio.sleep', new_callable=mock.AsyncMock) as mock_sleep:
+        result = provider.publish_with_retry(mockbot, None, 'content')
+
+    assert result == ('https://example.com/content', None)
+    assert provider.attempts == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_publish_with_retry_fatal(mockbot):
+    provider = MockFlakyPublisher([
+        providers.PublishingError('404'),
+    ])
+
+    with mock.patch('asyncio.sleep', new_callable=mock.AsyncMock) as mock_sleep:
+        with pytest.raises(providers.PublishingError):
+            provider.publish_with_retry(mockbot, None, 'content')
+
+    assert provider.attempts == 1
+    assert not mock_sleep.called
+
+
+def test_publish_with_retry_max_attempts(mockbot):
+    mockbot.settings.help.publish_attempts = 2
+    provider = MockFlakyPublisher([
+        providers.RetryablePublishingError('502'),
+        providers.RetryablePublishingError('502'),
+        providers.RetryablePublishingError('502'),
+    ])
+
+    with mock.patch('asyncio.sleep', new_callable=mock.AsyncMock):
+        with pytest.raises(providers.RetryablePublishingError):
+            provider.publish_with_retry(mockbot, None, 'content')
+
+    assert provider.attempts == 2
+
+
+def test_publish_with_retry_deadline(mockbot):
+    mockbot.settings.help.publish_deadline = 0
+    provider = MockFlakyPublisher([
+        providers.RetryablePublishingError('502'),
+    ])
+
+    with mock.patch('asyncio.sleep', new_callable=mock.AsyncMock) as mock_sleep:
+        with pytest.raises(providers.RetryablePublishingError):
+            provider.publish_with_retry(mockbot, None, 'content')
+
+    assert provider.attempts == 1
+    assert not mock_sleep.called
+
+
+def test_publish_with_retry_timeout(mockbot, requests_mock):
+    mockbot.settings.help.publish_deadline = 5
+    requests_mock.post('https://example.com/', [
+        {'status_code': 502},
+        {'text': 'https://example.com/content'},
+    ])
+
+    class MockPostPublisher(providers.AbstractPublisher):
+        def publish(self, bot, trigger, content):
+            return web.post_content('https://example.com/').text
+
+    provider = MockPostPublisher()
+    with mock.patch('asyncio.sleep', new_callable=mock.AsyncMock):
+        result = provider.publish_with_retry(mockbot, None, 'content')
+
+    assert result == ('https://example.com/content', None)
+    # each request times out before the deadline, not after 30s
+    timeouts = [request.timeout for request in requests_mock.request_history]
+    assert len(timeouts) == 2
+    assert all(0 < timeout <= 5 for timeout in timeouts)
+    # out of the publishing attempts, the default timeout is used
+    assert web.get_timeout() == web.DEFAULT_TIMEOUT
+
+
+def test_prepare_cache():
+    provider = providers.AbstractPublisher()
+    provider.save_cache('sign', 'value')
+    provider.prepare_cache('next sign', 'next value')
+
+    assert provider.get_cached_value('sign') == 'value'
+    assert provider.get_cached_value('next sign') == 'next value'
+    # the prepared value replaced the cached value
+    assert provider.get_cached_value('sign') is None
+    assert provider.get_cached_value('next sign') == 'next value'
+
+
+def test_refresh_content_ahead(mockbot, triggerfactory):
+    provider = MockTimePublisher()
+    now = datetime.datetime(2026, 10, 18, 23, 30)
+
+    provider.refresh_content(mockbot, now=now)
+
+    lines = provider.generate_help_commands(mockbot.command_groups)
+    content = provider.render(mockbot, None, lines)
+    today = provider.make_cache_signature(mockbot, content, now.date())
+    tomorrow = provider.make_cache_signature(
+        mockbot, content, now.date() + datetime.timedelta(days=1))
+
+    # nothing for today: the URL is prepared for tomorrow
+    # (all the commands: this is the owner's view)
+    assert provider.get_cached_value(today) is None
+    url = provider.get_cache_entry('owner', pending=True)[1]
+    assert url is not None
+
+    # published only once
+    provider.refresh_content(mockbot, now=now)
+    assert provider.get_cache_entry('owner', pending=True)[1] == url
+
+    # the first help command of the next day doesn't publish again
+    wrapper = triggerfactory.wrapper(
+        mockbot,
+        '@time=2026-10-19T00:05:00.000Z '
+        ':Test!test@example.com PRIVMSG #channel :.help')
+    with mock.patch.object(provider, 'publish') as mock_publish:
+        provider.send_help_commands(
+            wrapper, wrapper._trigger,
+            provider.generate_help_commands(mockbot.command_groups))
+
+    assert not mock_publish.called
+    assert provider.get_cached_value(tomorrow) == url
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published a list of my commands at: "
+        "%s" % url,
+    )
+
+
+def test_refresh_content_cold(mockbot):
+    provider = MockTimePublisher()
+    now = datetime.datetime(2026, 10, 18, 12, 0)
+
+    provider.refresh_content(mockbot, now=now)
+
+    lines = provider.generate_help_commands(mockbot.command_groups)
+    content = provider.render(mockbot, None, lines)
+    today = provider.make_cache_signature(mockbot, content, now.date())
+
+    assert provider.get_cached_value(today) is not None
+
+
+def test_refresh_content_views(mockbot):
+    mockbot.settings.help.command_privileges = ['help:owner']
+    provider = MockTimePublisher()
+    now = datetime.datetime(2026, 10, 18, 12, 0)
+
+    with mock.patch.object(
+            provider, 'publish', wraps=provider.publish) as mock_publish:
+        provider.refresh_content(mockbot, now=now)
+
+    # one document for the owner, one shared by all the other tiers
+    assert mock_publish.call_count == 2
+    user_url = provider.get_cache_entry('user')[1]
+    assert provider.get_cache_entry('op')[1] == user_url
+    assert provider.get_cache_entry('owner')[1] != user_url
+
+
+class MockExpiringPublisher(MockTimePublisher):
+    RETENTION = datetime.timedelta(days=1)
+
+
+def test_publish_document():
+    provider = MockPublisher()
+
+    assert provider.publish_document(None, None, 'content') == (
+        'https://example.com/content', None)
+
+    provider = MockExpiringPublisher()
+    before = time.time()
+    url, expires_at = provider.publish_document(None, None, 'content')
+
+    assert url.startswith('https://example.com/')
+    assert before + 86400 <= expires_at <= time.time() + 86400
+
+
+def test_use_cache_expiry():
+    provider = providers.AbstractPublisher()
+    provider.save_cache('sign', 'value', expires_at=10000)
+
+    assert provider.get_cached_value('sign', now=5000) == 'value'
+    assert provider.get_cached_expiry('sign') == 10000
+    assert provider.get_cached_value('sign', now=10000) is None
+    # too close to the expiry
+    assert provider.get_cached_value(
+        'sign', now=10000 - provider.DEFAULT_EXPIRY_MARGIN) is None
+
+
+def test_send_help_commands_expired(mockbot, triggerfactory):
+    lines = ['line 1', 'line 2']
+    provider = MockTimePublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG %s :.help' % mockbot.nick)
+    content = provider.render(wrapper, wrapper._trigger, lines)
+    signature = provider.get_cache_signature(
+        wrapper, wrapper._trigger, content)
+    provider.save_cache(signature, 'https://example.com/dead', time.time())
+
+    provider.send_help_commands(wrapper, wrapper._trigger, lines)
+
+    assert provider.get_cached_value(signature) != 'https://example.com/dead'
+
+
+def test_send_help_commands_liveness(mockbot, triggerfactory, requests_mock):
+    mockbot.settings.help.publish_liveness_check = True
+    lines = ['line 1', 'line 2']
+    provider = MockTimePublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG %s :.help' % mockbot.nick)
+    content = provider.render(wrapper, wrapper._trigger, lines)
+    signature = provider.get_cache_signature(
+        wrapper, wrapper._trigger, content)
+    expires_at = time.time() + 3600
+
+    # alive: the URL is used
+    requests_mock.head('https://example.com/alive', status_code=200)
+    provider.save_cache(signature, 'https://example.com/alive', expires_at)
+    provider.send_help_commands(wrapper, wrapper._trigger, lines)
+    assert provider.get_cached_value(signature) == 'https://example.com/alive'
+
+    # dead: content is published again
+    requests_mock.head('https://example.com/dead', status_code=404)
+    provider.save_cache(signature, 'https://example.com/dead', expires_at)
+    provider.send_help_commands(wrapper, wrapper._trigger, lines)
+    assert provider.get_cached_value(signature) != 'https://example.com/dead'
+
+
+def test_refresh_content_expiring(mockbot):
+    provider = MockExpiringPublisher()
+    now = datetime.datetime(2026, 10, 18, 12, 0)
+    lines = provider.generate_help_commands(mockbot.command_groups)
+    content = provider.render(mockbot, None, lines)
+    today = provider.make_cache_signature(mockbot, content, now.date())
+    provider.save_cache(today, 'https://example.com/expiring', 0)
+
+    provider.refresh_content(mockbot, now=now)
+
+    assert provider.get_cache_entry()[1] != 'https://example.com/expiring'
+
+
+def test_get_or_publish_shared(mockbot, tmpdir):
+    mockbot.settings.help.publish_cache_file = str(tmpdir.join('cache.db'))
+    provider_a = MockTimePublisher()
+    provider_b = MockTimePublisher()
+
+    url_a, _ = provider_a.get_or_publish(mockbot, None, 'content', 'sign')
+
+    with mock.patch.object(provider_b, 'publish') as mock_publish:
+        url_b, _ = provider_b.get_or_publish(
+            mockbot, None, 'content', 'sign')
+
+    assert not mock_publish.called
+    assert url_a == url_b
+
+
+def test_get_or_publish_shared_lock_timeout(mockbot, tmpdir):
+    mockbot.settings.help.publish_cache_file = str(tmpdir.join('cache.db'))
+    mockbot.settings.help.publish_deadline = 0.1
+    provider = MockTimePublisher()
+    shared_cache = provider.get_shared_cache(mockbot)
+
+    # another instance holds the lock until the deadline
+    assert shared_cache.acquire('sign')
+
+    with mock.patch.object(provider, 'publish') as mock_publish:
+        with pytest.raises(providers.RetryablePublishingError):
+            provider.get_or_publish(mockbot, None, 'content', 'sign')
+
+    assert not mock_publish.called
+
+
+def test_get_publish_deadline(mockbot):
+    provider = MockTimePublisher()
+    deadline = time.monotonic() + 1
+
+    with web.publish_deadline(deadline):
+        assert provider.get_publish_deadline(mockbot) == deadline
+
+    assert provider.get_publish_deadline(mockbot) > deadline
+
+
+def test_get_or_publish_no_shared_cache(mockbot):
+    provider = MockTimePublisher()
+
+    assert provider.get_shared_cache(mockbot) is None
+
+    url_a, _ = provider.get_or_publish(mockbot, None, 'content', 'sign')
+    url_b, _ = provider.get_or_publish(mockbot, None, 'content', 'sign')
+
+    assert url_a != url_b
+
+
+class MockRecordPublisher(providers.AbstractPublisher):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, bot, trigger, content):
+        self.published.append(content)
+        return 'https://example.com/%d' % len(self.published)
+
+
+def test_split_chunks():
+    provider = providers.AbstractPublisher()
+    lines = ['a' * 10, 'b' * 10, 'c' * 10, 'd1\nd2\n' + 'd' * 30]
+
+    chunks = provider.split_chunks(lines, 25)
+
+    assert chunks == [
+        'a' * 10 + '\n\n' + 'b' * 10,
+        'c' * 10 + '\n\n' + 'd1' + '\n' + 'd2',
+        'd' * 30,
+    ]
+
+
+def test_publish_content_chunked(mockbot):
+    mockbot.settings.help.publish_max_size = 25
+    provider = MockRecordPublisher()
+    lines = ['a' * 10, 'b' * 10, 'c' * 10]
+    content = provider.render(mockbot, None, lines)
+    date = datetime.date(2026, 10, 18)
+
+    url, expires_at = provider.publish_content(
+        mockbot, None, lines, content, 'sign', date)
+
+    assert url == 'https://example.com/3'
+    assert expires_at is None
+    assert sorted(provider.published[:2]) == [
+        'a' * 10 + '\n\n' + 'b' * 10,
+        'c' * 10,
+    ]
+    assert provider.published[2] == '\n'.join([
+        'Part 1/2: https://example.com/%s' % (
+            provider.published.index('a' * 10 + '\n\n' + 'b' * 10) + 1),
+        'Part 2/2: https://example.com/%s' % (
+            provider.published.index('c' * 10) + 1),
+    ])
+
+    # only the changed chunk and the index are published again
+    lines = ['a' * 10, 'b' * 10, 'e' * 10]
+    content = provider.render(mockbot, None, lines)
+    provider.publish_content(mockbot, None, lines, content, 'sign', date)
+
+    assert len(provider.published) == 5
+    assert provider.published[3] == 'e' * 10
+
+
+class MockConcurrentPublisher(providers.AbstractPublisher):
+    def __init__(self):
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+
+    async def publish_document_async(self, bot, trigger, content):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return 'https://example.com/%s' % len(content), None
+
+
+def test_publish_chunks_concurrent(mockbot):
+    provider = MockConcurrentPublisher()
+    chunks = ['a' * size for size in range(1, 11)]
+
+    url, _ = provider.publish_chunks(
+        mockbot, None, chunks, datetime.date(2026, 10, 18))
+
+    assert url.startswith('https://example.com/')
+    # the chunks are uploaded at once, up to the limit
+    assert provider.max_running == provider.DEFAULT_CHUNK_WORKERS
+
+
+def test_publish_content_not_chunked(mockbot):
+    provider = MockRecordPublisher()
+    lines = ['a' * 10, 'b' * 10, 'c' * 10]
+    content = provider.render(mockbot, None, lines)
+
+    provider.publish_content(
+        mockbot, None, lines, content, 'sign', datetime.date(2026, 10, 18))
+
+    assert provider.published == [content]
+
+
+def test_send_help_lines(mockbot, triggerfactory):
+    provider = MockPublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b')
+
+    provider.send_help_lines(
+        wrapper, wrapper._trigger, 'these commands', ['line 1', 'line 2'])
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: line 1",
+        "PRIVMSG #channel :line 2",
+    )
+
+
+def test_send_help_lines_private(mockbot, triggerfactory):
+    provider = MockPublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b')
+    lines = ['line %d' % index for index in range(4)]
+
+    with mock.patch.object(provider, 'publish') as mock_publish:
+        provider.send_help_lines(
+            wrapper, wrapper._trigger, 'these commands', lines)
+
+    assert not mock_publish.called
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The help for these commands is too long; "
+        "I'm sending it to you in a private message.",
+        "PRIVMSG Test :line 0",
+        "PRIVMSG Test :line 1",
+        "PRIVMSG Test :line 2",
+        "PRIVMSG Test :line 3",
+    )
+
+
+def test_send_help_lines_backed_up(mockbot, triggerfactory):
+    mockbot.settings.help.backlog_threshold = 1
+    mockbot.stack['#other'] = {'messages': [(time.time(), 'spam')]}
+    provider = MockPublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b')
+
+    provider.send_help_lines(
+        wrapper, wrapper._trigger, 'these commands', ['line 1', 'line 2'])
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published the help for these commands "
+        "at: https://example.com/content",
+    )
+
+
+def test_send_help_lines_too_long(mockbot, triggerfactory):
+    mockbot.settings.help.private_max_bytes = 50
+    provider = MockPublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b')
+    lines = ['line %d' % index for index in range(10)]
+
+    with mock.patch.object(
+        provider, 'publish', wraps=provider.publish,
+    ) as mock_publish:
+        provider.send_help_lines(
+            wrapper, wrapper._trigger, 'these commands', lines)
+
+    mock_publish.assert_called_once_with(
+        wrapper, wrapper._trigger, '\n'.join(lines))
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published the help for these commands "
+        "at: https://example.com/content",
+    )
+
+
+def test_send_help_lines_too_long_error(mockbot, triggerfactory):
+    mockbot.settings.help.private_max_bytes = 20
+    provider = MockPublisher()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b')
+    lines = ['line %d' % index for index in range(5)]
+
+    with mock.patch.object(
+        provider, 'publish', side_effect=providers.PublishingError(),
+    ):
+        provider.send_help_lines(
+            wrapper, wrapper._trigger, 'these commands', lines)
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The help for these commands is too long; "
+        "I'm sending it to you in a private message.",
+        "PRIVMSG Test :line 0",
+        "PRIVMSG Test :line 1",
+        "PRIVMSG Test :line 2",
+        "PRIVMSG Test :line 3",
+        "PRIVMSG Test :line 4",
+    )
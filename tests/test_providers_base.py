@@ -1,3 +1,6 @@
+import time
+from unittest import mock
+
 import pytest
 from sopel.plugins import rules
 from sopel.tests import rawlist
@@ -352,6 +355,106 @@ def test_help_commands_private(mockbot, triggerfactory):
     )[0]
 
 
+def fill_backlog(mockbot, count):
+    mockbot.stack['#other'] = {
+        'messages': [(time.time(), 'spam %d' % index)
+                     for index in range(count)],
+        'flood_left': 0,
+    }
+
+
+def test_help_commands_backed_up(mockbot, triggerfactory):
+    mockbot.settings.help.backlog_threshold = 5
+    provider = providers.Base()
+    provider.setup(mockbot)
+    provider.manager = mock.Mock()
+    fill_backlog(mockbot, 5)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help')
+
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I'm busy right now; "
+        "I'll send you a short list in private.",
+        "PRIVMSG Test :Ask me for the commands of one of these categories "
+        "with .help <category>:",
+        "PRIVMSG Test :CORETASKS | HELP",
+    )
+    provider.manager.stats.record_downgrade.assert_called_once_with(
+        'short-list')
+
+
+def test_help_commands_backlog_default(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+    fill_backlog(mockbot, 100)
+
+    # disabled by default
+    assert mockbot.settings.help.backlog_threshold == 0
+    assert not provider.is_backed_up(mockbot)
+
+
+def test_help_commands_backlog_disabled(mockbot, triggerfactory):
+    mockbot.settings.help.backlog_threshold = 0
+    provider = providers.Base()
+    provider.setup(mockbot)
+    fill_backlog(mockbot, 10)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help')
+
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert mockbot.backend.message_sent[0] == rawlist(
+        "PRIVMSG #channel :Test: I'll send you a list of commands in private.",
+    )[0]
+
+
+def test_help_commands_privileges(mockbot, triggerfactory):
+    mockbot.rules.register_command(rules.Command(
+        'restart', plugin='admin', usages=(
+            {'example': '.restart', 'is_owner': True},
+        )))
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG %s :.help' % mockbot.nick)
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert not any(
+        b'restart' in message for message in mockbot.backend.message_sent)
+
+    mockbot.backend.clear_message_sent()
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':testnick!test@example.com PRIVMSG %s :.help' % mockbot.nick)
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert rawlist(
+        "PRIVMSG testnick :ADMIN      restart",
+    )[0] in mockbot.backend.message_sent
+
+
+def test_help_commands_no_privilege_filter(mockbot, triggerfactory):
+    mockbot.settings.help.privilege_filter = False
+    mockbot.rules.register_command(rules.Command(
+        'restart', plugin='admin', usages=(
+            {'example': '.restart', 'is_owner': True},
+        )))
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG %s :.help' % mockbot.nick)
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert rawlist(
+        "PRIVMSG Test :ADMIN      restart",
+    )[0] in mockbot.backend.message_sent
+
+
 def test_help_command(mockbot, triggerfactory):
     provider = providers.Base()
     provider.setup(mockbot)
@@ -439,6 +542,70 @@ def test_help_command_too_long(mockbot, triggerfactory):
     )
 
 
+def test_help_command_too_large(mockbot, triggerfactory):
+    mockbot.settings.help.channel_max_bytes = 100
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    doc = 'The command test docstring, %s.' % ('very ' * 20).strip()
+    mockbot.rules.register_command(make_fake_command(name='test', doc=doc))
+
+    provider.help_command(wrapper, wrapper._trigger, 'test')
+
+    # one line only, but too large for the channel
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The help for command test is too long; "
+        "I'm sending it to you in a private message.",
+        "PRIVMSG Test :%s" % doc,
+    )
+
+
+def test_help_command_too_large_private(mockbot, triggerfactory):
+    mockbot.settings.help.private_max_bytes = 10
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG Bot :.help test')
+
+    mockbot.rules.register_command(make_fake_command(
+        name='test', doc='The command test docstring.'))
+
+    provider.help_command(wrapper, wrapper._trigger, 'test')
+
+    # the base provider can't publish it: it is sent anyway
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG Test :The command test docstring.",
+    )
+
+
+def test_help_command_backed_up(mockbot, triggerfactory):
+    mockbot.settings.help.backlog_threshold = 5
+    provider = providers.Base()
+    provider.setup(mockbot)
+    fill_backlog(mockbot, 5)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    mockbot.rules.register_command(make_fake_command(
+        name='test',
+        doc='The command test docstring.\nSecond line of docstring.',
+        examples=('.test',),
+    ))
+
+    provider.help_command(wrapper, wrapper._trigger, 'test')
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The command test docstring.",
+        "PRIVMSG #channel :I'm busy right now; ask me again later for the "
+        "rest of the help for command test.",
+    )
+
+
 def test_help_command_too_long_settings(mockbot, triggerfactory):
     """Test settings can override message length in lines for command help."""
     mockbot.settings.help.line_threshold = 5
@@ -471,3 +638,184 @@ def test_help_command_too_long_settings(mockbot, triggerfactory):
         "PRIVMSG #channel :Fourth line of docstring.",
         "PRIVMSG #channel :e.g. .test, .test arg or .test else",
     )
+
+
+def test_help_command_pinned(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    mockbot.rules.register_command(make_fake_command(
+        name='test',
+        doc='The command test docstring.',
+        examples=('.test',),
+    ))
+    provider.pin_help_commands(mockbot, ['test', 'unknown'])
+
+    assert 'test' in provider.pinned_replies
+    assert len(provider.pinned_replies) == 1, 'Unknown commands are ignored'
+
+    with mock.patch.object(provider, 'get_command_doc') as mock_doc:
+        provider.help_command(wrapper, wrapper._trigger, 'TEST')
+
+    assert not mock_doc.called, 'A pinned reply must be used as-is'
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The command test docstring.",
+        "PRIVMSG #channel :e.g. .test",
+    )
+
+
+def test_help_command_pinned_removed(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    mockbot.rules.register_command(make_fake_command(
+        name='test',
+        doc='The command test docstring.',
+    ))
+    provider.pin_help_commands(mockbot, ['test'])
+    mockbot.rules.unregister_plugin('test')
+
+    with pytest.raises(providers.UnknownCommand):
+        provider.help_command(wrapper, wrapper._trigger, 'test')
+
+
+def test_help_command_category(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help Test')
+
+    mockbot.rules.register_command(make_fake_command('command_a'))
+    mockbot.rules.register_command(make_fake_command('command_b'))
+
+    provider.help_command(wrapper, wrapper._trigger, 'Test')
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: TEST       command_a  command_b",
+    )
+
+
+def test_help_command_category_clash(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    mockbot.rules.register_command(make_fake_command(
+        'test', doc='The command test docstring.'))
+    mockbot.rules.register_command(make_fake_command('other'))
+
+    provider.help_command(wrapper, wrapper._trigger, 'test')
+
+    # the command wins over the category
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: The command test docstring.",
+    )
+
+
+def test_help_command_category_too_long(mockbot, triggerfactory):
+    mockbot.settings.help.line_threshold = 1
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help test')
+
+    for index in range(20):
+        mockbot.rules.register_command(
+            make_fake_command('command_%02d' % index))
+
+    provider.help_command(wrapper, wrapper._trigger, 'test')
+
+    assert mockbot.backend.message_sent[0] == rawlist(
+        "PRIVMSG #channel :Test: The help for category TEST is too long; "
+        "I'm sending it to you in a private message.",
+    )[0]
+    assert len(mockbot.backend.message_sent) > 2
+    assert all(
+        line.startswith(b'PRIVMSG Test :')
+        for line in mockbot.backend.message_sent[1:]
+    )
+
+
+def test_help_command_batch(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b c')
+
+    mockbot.rules.register_command(make_fake_command(
+        'test', doc='The command test docstring.\nSecond line.',
+        examples=('.test',)))
+    mockbot.rules.register_command(make_fake_command(
+        'other', doc='The other docstring.'))
+    provider.pin_help_commands(mockbot, ['other'])
+
+    with mock.patch.object(
+        provider, 'get_command_docs', wraps=provider.get_command_docs,
+    ) as mock_docs:
+        result = provider.help_command_batch(
+            wrapper, wrapper._trigger, ['test', 'unknown', 'other'])
+
+    # pinned replies are not looked up again
+    mock_docs.assert_called_once_with(wrapper, ['test', 'unknown'])
+    assert result == (['test', 'other'], ['unknown'])
+    assert mockbot.backend.message_sent == rawlist(
+        'PRIVMSG #channel :Test: test: The command test docstring. | '
+        'Unknown command "unknown" | other: The other docstring.',
+    )
+
+
+def test_help_command_batch_limit(mockbot, triggerfactory):
+    mockbot.settings.help.batch_limit = 2
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b c')
+
+    result = provider.help_command_batch(
+        wrapper, wrapper._trigger, ['a', 'b', 'c', 'd'])
+
+    assert result == ([], ['a', 'b'])
+    assert mockbot.backend.message_sent == rawlist(
+        'PRIVMSG #channel :Test: Unknown command "a" | Unknown command "b" | '
+        'Too many commands; ignored: c, d',
+    )
+
+
+def test_help_command_batch_packed(mockbot, triggerfactory):
+    provider = providers.Base()
+    provider.setup(mockbot)
+
+    wrapper = triggerfactory.wrapper(
+        mockbot, ':Test!test@example.com PRIVMSG #channel :.help a b c')
+
+    names = []
+    for index in range(5):
+        name = 'command_%d' % index
+        names.append(name)
+        mockbot.rules.register_command(
+            make_fake_command(name, doc='%s docstring. %s' % (
+                name, 'Long text. ' * 8)))
+
+    commands, unknown = provider.help_command_batch(
+        wrapper, wrapper._trigger, names)
+
+    assert commands == names
+    assert not unknown
+    # 5 entries of ~120 bytes fit in 2 messages
+    assert len(mockbot.backend.message_sent) == 2
+    assert mockbot.backend.message_sent[0].startswith(
+        b'PRIVMSG #channel :Test: command_0: ')
+    assert mockbot.backend.message_sent[1].startswith(
+        b'PRIVMSG #channel :command_3: ')
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from sopel_help import hedged, managers, providers
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = hedged
+hedged_outputs = 0x0, clbin
+"""
+
+MOCK_0X0_URL = 'https://0x0.st/'
+MOCK_CLBIN_URL = 'https://clbin.com/'
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+@pytest.fixture
+def provider(mockbot):
+    provider = hedged.HedgedPublisher()
+    provider.manager = managers.Manager()
+    provider.setup(mockbot)
+    return provider
+
+
+def test_setup(provider):
+    assert [name for name, _ in provider.publishers] == ['0x0', 'clbin']
+    assert isinstance(
+        provider.publishers[0][1], providers.NullPointerPublisher)
+    assert isinstance(provider.publishers[1][1], providers.CLBinPublisher)
+
+
+def test_setup_not_a_publisher(mockbot):
+    mockbot.settings.help.hedged_outputs = ['0x0', 'base']
+    provider = hedged.HedgedPublisher()
+    provider.manager = managers.Manager()
+
+    with pytest.raises(RuntimeError):
+        provider.setup(mockbot)
+
+
+def test_publish_first_success(provider, requests_mock):
+    requests_mock.post(MOCK_0X0_URL, status_code=502)
+    requests_mock.post(MOCK_CLBIN_URL, text='https://clbin.com/abc')
+
+    result = provider.publish(None, None, 'This is my content.')
+
+    assert result == 'https://clbin.com/abc'
+    assert provider.wins == {'clbin': 1}
+    assert provider.manager.get_health('clbin').successes == 1
+
+
+def test_publish_error(provider, requests_mock):
+    requests_mock.post(MOCK_0X0_URL, status_code=502)
+    requests_mock.post(MOCK_CLBIN_URL, status_code=502)
+
+    with pytest.raises(providers.PublishingError):
+        provider.publish(None, None, 'This is my content.')
+
+    assert not provider.wins
+    assert provider.manager.get_health('0x0').failures == 1
+    assert provider.manager.get_health('clbin').failures == 1
+
+
+def test_publish_unexpected_error(provider, requests_mock):
+    requests_mock.post(MOCK_0X0_URL, exc=TypeError)
+    requests_mock.post(MOCK_CLBIN_URL, text='https://clbin.com/abc')
+
+    result = provider.publish(None, None, 'This is my content.')
+
+    assert result == 'https://clbin.com/abc'
+    assert provider.wins == {'clbin': 1}
+
+
+def test_publish_unexpected_error_all(provider, requests_mock):
+    requests_mock.post(MOCK_0X0_URL, exc=TypeError)
+    requests_mock.post(MOCK_CLBIN_URL, exc=ValueError)
+
+    with pytest.raises(providers.PublishingError):
+        provider.publish(None, None, 'This is my content.')
+
+    assert provider.manager.get_health('0x0').failures == 1
+    assert provider.manager.get_health('clbin').failures == 1
+
+
+def test_get_publishers_skip_open_circuit(provider):
+    health = provider.manager.get_health('0x0')
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record_failure(1.0)
+
+    assert [name for name, _ in provider.get_publishers()] == ['clbin']
+
+    health = provider.manager.get_health('clbin')
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record_failure(1.0)
+
+    # none available: use them all anyway
+    assert [name for name, _ in provider.get_publishers()] == [
+        '0x0', 'clbin']
+
+
+def test_setup_requires_manager(mockbot):
+    provider = hedged.HedgedPublisher()
+
+    with pytest.raises(RuntimeError):
+        provider.setup(mockbot)
+
+
+def test_manager_setup(mockbot):
+    manager = managers.Manager()
+    manager.setup(mockbot)
+
+    assert isinstance(manager.provider, hedged.HedgedPublisher)
+    assert manager.provider.manager is manager
+
+
+class MockAsyncPublisher(providers.AbstractPublisher):
+    def __init__(self, url, delay):
+        super().__init__()
+        self.url = url
+        self.delay = delay
+        self.cancelled = False
+
+    async def publish_document_async(self, bot, trigger, content):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.url, None
+
+
+def test_publish_document_async(provider):
+    fast = MockAsyncPublisher('https://example.com/fast', 0)
+    slow = MockAsyncPublisher('https://example.com/slow', 10)
+    provider.publishers = [('slow', slow), ('fast', fast)]
+
+    async def race():
+        result = await provider.publish_document_async(
+            None, None, 'This is my content.')
+        # let the cancelled loser handle its cancellation
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(race())
+
+    assert result == ('https://example.com/fast', None)
+    assert provider.wins == {'fast': 1}
+    assert slow.cancelled
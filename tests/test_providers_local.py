@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from sopel.tests import rawlist
 
@@ -45,3 +47,68 @@ def test_send_help_commands(mockbot, triggerfactory, tmpdir):
         "PRIVMSG #channel :Test: I've published a list of my commands at: "
         "https://example.com/sopel/help.html",
     )
+
+
+def test_send_help_commands_json_index(mockbot, triggerfactory, tmpdir):
+    output_dir = tmpdir.mkdir('docs')
+    mockbot.settings.help.origin_output_dir = str(output_dir)
+    mockbot.settings.help.origin_json_index = True
+
+    provider = providers.LocalFile()
+    provider.setup(mockbot)
+    wrapper = triggerfactory.wrapper(mockbot, CHANNEL_LINE)
+
+    provider.send_help_commands(
+        wrapper, wrapper._trigger, ['line 1', 'line 2'])
+
+    result = json.loads(output_dir.join('help.json').read())
+    assert 'help' in result['commands']
+    assert result['commands']['help']['aliases'] == ['h']
+    assert output_dir.join('help.version').read() == result['version'] + '\n'
+
+    # nothing changed: the index isn't written again
+    assert not provider.export_json(mockbot)
+
+
+def test_send_help_commands_no_json_index(mockbot, triggerfactory, tmpdir):
+    output_dir = tmpdir.mkdir('docs')
+    mockbot.settings.help.origin_output_dir = str(output_dir)
+
+    provider = providers.LocalFile()
+    provider.setup(mockbot)
+    wrapper = triggerfactory.wrapper(mockbot, CHANNEL_LINE)
+
+    provider.send_help_commands(
+        wrapper, wrapper._trigger, ['line 1', 'line 2'])
+
+    assert output_dir.listdir() == [output_dir.join('help.html')]
+
+
+def test_send_help_commands_template(mockbot, triggerfactory, tmpdir):
+    output_dir = tmpdir.mkdir('docs')
+    template = tmpdir.join('template.html')
+    template.write('<style>body { color: red; }</style><main>{content}</main>')
+    mockbot.settings.help.origin_output_dir = str(output_dir)
+    mockbot.settings.help.origin_template = str(template)
+
+    provider = providers.LocalFile()
+    provider.setup(mockbot)
+    wrapper = triggerfactory.wrapper(mockbot, CHANNEL_LINE)
+
+    provider.send_help_commands(
+        wrapper, wrapper._trigger, ['line 1', 'line 2'])
+
+    assert output_dir.join('help.html').read() == (
+        '<style>body { color: red; }</style>'
+        '<main><div>line 1</div>\n<div>line 2</div></main>'
+    )
+
+
+def test_setup_template_invalid(mockbot, tmpdir):
+    template = tmpdir.join('template.html')
+    template.write('<main>no placeholder</main>')
+    mockbot.settings.help.origin_template = str(template)
+
+    provider = providers.LocalFile()
+    with pytest.raises(ValueError):
+        provider.setup(mockbot)
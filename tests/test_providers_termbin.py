@@ -1,3 +1,4 @@
+import asyncio
 import socket
 from unittest import mock
 
@@ -14,13 +15,17 @@ def test_publish():
     provider.setup(None)
 
     with mock.patch('socket.socket') as mock_socket:
-        mock_socket.return_value.recv.side_effect = [MOCK_RESULT, ""]
+        mock_socket.return_value.recv.side_effect = [
+            MOCK_RESULT.encode('utf-8') + b'\n\x00', b'']
 
         # this provider doesn't need any bot or trigger, just the content
         result = provider.publish(None, None, 'This is my content.')
 
     assert result == MOCK_RESULT, (
-        'The CLBinPublisher must return the response text as-is')
+        'The TermBinPublisher must return the URL sent by termbin')
+    mock_socket.return_value.sendall.assert_called_once_with(
+        b'This is my content.')
+    mock_socket.return_value.close.assert_called_once_with()
 
 
 def test_publish_error():
@@ -33,3 +38,37 @@ def test_publish_error():
 
         with pytest.raises(providers.PublishingError):
             provider.publish(None, None, 'This is my content.')
+
+
+def test_publish_document_async():
+    provider = providers.TermBinPublisher()
+    provider.setup(None)
+    reader = mock.Mock()
+    reader.read = mock.AsyncMock(return_value=MOCK_RESULT.encode() + b'\n')
+    writer = mock.Mock()
+
+    with mock.patch(
+        'asyncio.open_connection',
+        new=mock.AsyncMock(return_value=(reader, writer)),
+    ):
+        url, expires_at = asyncio.run(provider.publish_document_async(
+            None, None, 'This is my content.'))
+
+    assert url == MOCK_RESULT
+    assert expires_at is not None
+    writer.write.assert_called_once_with(b'This is my content.')
+    writer.write_eof.assert_called_once_with()
+    writer.close.assert_called_once_with()
+
+
+def test_publish_document_async_error():
+    provider = providers.TermBinPublisher()
+    provider.setup(None)
+
+    with mock.patch(
+        'asyncio.open_connection',
+        new=mock.AsyncMock(side_effect=ConnectionRefusedError()),
+    ):
+        with pytest.raises(providers.RetryablePublishingError):
+            asyncio.run(provider.publish_document_async(
+                None, None, 'This is my content.'))
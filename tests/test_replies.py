@@ -0,0 +1,76 @@
+from unittest import mock
+
+import pytest
+
+from sopel_help import replies
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+"""
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_get_rules():
+    # Sopel 8
+    bot = mock.Mock(spec=['rules'])
+    assert replies.get_rules(bot) is bot.rules
+
+    # Sopel 7
+    bot = mock.Mock(spec=['_rules_manager'])
+    assert replies.get_rules(bot) is bot._rules_manager
+
+
+def test_get_command_name(mockbot):
+    assert replies.get_command_name(mockbot, 'help') == 'help'
+    assert replies.get_command_name(mockbot, 'h') == 'help'
+    assert replies.get_command_name(mockbot, 'unknown') is None
+
+
+def test_split_command_names():
+    assert replies.split_command_names('seen') == ['seen']
+    assert replies.split_command_names(' Seen tell  SEEN ') == [
+        'seen', 'tell']
+    assert replies.split_command_names('') == []
+
+
+def test_pack_messages():
+    entries = ['a' * 4, 'b' * 4, 'c' * 4, 'd' * 20]
+
+    assert replies.pack_messages(entries, max_length=11) == [
+        'aaaa | bbbb', 'cccc', 'd' * 20]
+    assert replies.pack_messages(entries, max_length=100) == [
+        ' | '.join(entries)]
+    assert replies.pack_messages([]) == []
+
+
+def test_pack_messages_bytes():
+    # 2 bytes per character
+    entries = ['é' * 4, 'è' * 4]
+
+    assert replies.pack_messages(entries, max_length=15) == ['é' * 4, 'è' * 4]
+    assert replies.pack_messages(entries, max_length=19) == [
+        'éééé | èèèè']
+
+
+def test_measure_reply():
+    result = replies.measure_reply(('héllo', 'a' * 401, ''))
+
+    assert result == replies.ReplySize(407, 4)
+
+
+def test_fits_budget():
+    assert replies.fits_budget(100, 100)
+    assert not replies.fits_budget(101, 100)
+    assert replies.fits_budget(10000, 0)
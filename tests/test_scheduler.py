@@ -0,0 +1,85 @@
+import threading
+
+from sopel_help import scheduler
+
+
+class MockBot:
+    def __init__(self):
+        self.sent = []
+        self.done = threading.Event()
+
+    def say(self, message, recipient):
+        self.sent.append((recipient, message))
+        if message == 'last':
+            self.done.set()
+
+
+def test_send_next_round_robin():
+    bot = MockBot()
+    help_scheduler = scheduler.HelpScheduler()
+    # don't start the thread: lines are sent by hand
+    help_scheduler._running = True
+    help_scheduler.schedule(bot, 'Exirel', ['a1', 'a2', 'a3'])
+    help_scheduler.schedule(bot, 'Other', ['b1'])
+    help_scheduler.schedule(bot, 'Third', ['c1', 'c2'])
+
+    assert help_scheduler.pending() == 6
+    assert help_scheduler.pending('exirel') == 3
+
+    while help_scheduler.send_next():
+        pass
+
+    assert bot.sent == [
+        ('Exirel', 'a1'),
+        ('Other', 'b1'),
+        ('Third', 'c1'),
+        ('Exirel', 'a2'),
+        ('Third', 'c2'),
+        ('Exirel', 'a3'),
+    ]
+    assert help_scheduler.pending() == 0
+    assert not help_scheduler.send_next()
+
+
+def test_cancel():
+    bot = MockBot()
+    help_scheduler = scheduler.HelpScheduler()
+    help_scheduler._running = True
+    help_scheduler.schedule(bot, 'Exirel', ['a1', 'a2'])
+    help_scheduler.schedule(bot, 'Other', ['b1'])
+
+    assert help_scheduler.cancel('EXIREL') == 2
+    assert help_scheduler.cancel('Exirel') == 0
+    assert help_scheduler.pending() == 1
+
+    help_scheduler.send_next()
+
+    assert bot.sent == [('Other', 'b1')]
+
+
+def test_thread():
+    bot = MockBot()
+    help_scheduler = scheduler.HelpScheduler(rate=1000)
+    try:
+        help_scheduler.schedule(bot, 'Exirel', ['a1', 'a2', 'last'])
+        assert help_scheduler.is_running
+        assert bot.done.wait(5)
+    finally:
+        help_scheduler.stop()
+
+    assert not help_scheduler.is_running
+    assert bot.sent == [
+        ('Exirel', 'a1'),
+        ('Exirel', 'a2'),
+        ('Exirel', 'last'),
+    ]
+
+
+def test_stop_drops_lines():
+    bot = MockBot()
+    help_scheduler = scheduler.HelpScheduler(rate=0.01)
+    help_scheduler.schedule(bot, 'Exirel', ['a1', 'a2', 'a3'])
+    help_scheduler.stop()
+
+    assert help_scheduler.pending() == 0
+    assert len(bot.sent) <= 1
@@ -0,0 +1,75 @@
+import pytest
+
+from sopel_help import managers, providers
+from sopel_help.settings import HelpSettings
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = base
+line_threshold = 5
+hedged_outputs = 0x0
+"""
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def test_from_section(mockbot):
+    settings = HelpSettings.from_section(mockbot.settings.help)
+
+    assert settings.output == 'base'
+    assert settings.line_threshold == 5
+    assert settings.reply_method == 'channel'
+    assert settings.hedged_outputs == ('0x0',)
+    assert settings.channel_outputs == ()
+    assert settings.publish_deadline == 10.0
+
+
+def test_immutable(mockbot):
+    settings = HelpSettings.from_section(mockbot.settings.help)
+
+    with pytest.raises(AttributeError):
+        settings.line_threshold = 10
+
+
+def test_manager_setup(mockbot):
+    manager = managers.Manager()
+    manager.setup(mockbot)
+
+    assert manager.provider.settings is manager.settings
+    assert manager.provider.get_settings(mockbot) is manager.settings
+
+    # the snapshot doesn't change with the bot's settings
+    mockbot.settings.help.line_threshold = 10
+    assert manager.provider.get_settings(mockbot).line_threshold == 5
+
+
+def test_manager_refresh_settings(mockbot):
+    manager = managers.Manager()
+    manager.setup(mockbot)
+    provider = manager.provider
+
+    mockbot.settings.help.line_threshold = 10
+    manager.refresh_settings(mockbot)
+
+    # same provider, new settings
+    assert manager.provider is provider
+    assert provider.get_settings(mockbot).line_threshold == 10
+
+
+def test_get_settings_no_setup(mockbot):
+    provider = providers.Base()
+
+    assert provider.get_settings(mockbot) is mockbot.settings.help
@@ -0,0 +1,124 @@
+import pytest
+from sopel.tests import rawlist
+
+from sopel_help import documents, sites
+
+TMP_CONFIG = """
+[core]
+owner = testnick
+nick = TestBot
+enable = coretasks, help
+
+[help]
+output = site
+origin_base_url = https://example.com/sopel/
+origin_output_name = help.html
+origin_output_dir = /tmp/
+"""
+
+CHANNEL_LINE = ':Test!test@example.com PRIVMSG #channel :.help'
+
+
+@pytest.fixture
+def tmpconfig(configfactory):
+    return configfactory('test.cfg', TMP_CONFIG)
+
+
+@pytest.fixture
+def mockbot(tmpconfig, botfactory):
+    return botfactory.preloaded(tmpconfig, preloads=['help'])
+
+
+def make_document(command_groups, details=()):
+    return documents.HelpDocument(command_groups.items(), details)
+
+
+def test_get_page_name():
+    assert sites.get_page_name('help', 'admin') == 'help-admin.html'
+    assert sites.get_page_name('help', 'My Plugin!') == 'help-my-plugin.html'
+    assert sites.get_page_name('help', '???') == 'help-category.html'
+
+
+def test_render_category_page():
+    result = sites.render_category_page('admin', [
+        ('join', ('Join a channel.',), ('.join #sopel',), ('j',)),
+    ])
+
+    assert '<title>Sopel Help: ADMIN</title>' in result
+    assert '<h2 id="command-join">' in result
+    assert '<p>Join a channel.</p>' in result
+    assert '<code>j</code>' in result
+    assert '<li><code>.join #sopel</code></li>' in result
+
+
+def test_render_index_page():
+    result = sites.render_index_page([('admin', 'help-admin.html')])
+
+    assert '<li><a href="help-admin.html">ADMIN</a></li>' in result
+
+
+def test_build(tmpdir):
+    builder = sites.StaticSiteBuilder(str(tmpdir), 'help.html')
+    document = make_document({
+        'admin': ['join', 'part'],
+        'help': ['help'],
+    })
+
+    written, removed = builder.build(document)
+
+    assert written == ['help-admin.html', 'help-help.html', 'help.html']
+    assert removed == []
+    assert tmpdir.join('help-admin.html').check()
+    assert 'help-admin.html' in tmpdir.join('help.html').read()
+
+    # same document: nothing to do
+    assert builder.build(document) == ([], [])
+
+
+def test_build_incremental(tmpdir):
+    builder = sites.StaticSiteBuilder(str(tmpdir), 'help.html')
+    builder.build(make_document({
+        'admin': ['join', 'part'],
+        'help': ['help'],
+        'old': ['old'],
+    }))
+
+    # from a new builder, e.g. after a restart
+    builder = sites.StaticSiteBuilder(str(tmpdir), 'help.html')
+    written, removed = builder.build(make_document({
+        'admin': ['join', 'part', 'quit'],
+        'help': ['help'],
+    }))
+
+    assert written == ['help-admin.html', 'help.html']
+    assert removed == ['help-old.html']
+    assert not tmpdir.join('help-old.html').check()
+
+
+def test_build_missing_page(tmpdir):
+    builder = sites.StaticSiteBuilder(str(tmpdir), 'help.html')
+    builder.build(make_document({'admin': ['join']}))
+    tmpdir.join('help-admin.html').remove()
+
+    builder = sites.StaticSiteBuilder(str(tmpdir), 'help.html')
+    written, _ = builder.build(make_document({'admin': ['join']}))
+
+    assert written == ['help-admin.html']
+
+
+def test_help_commands(mockbot, triggerfactory, tmpdir):
+    output_dir = tmpdir.mkdir('docs')
+    mockbot.settings.help.origin_output_dir = str(output_dir)
+    provider = sites.StaticSite()
+    provider.setup(mockbot)
+    wrapper = triggerfactory.wrapper(mockbot, CHANNEL_LINE)
+
+    provider.help_commands(wrapper, wrapper._trigger)
+
+    assert mockbot.backend.message_sent == rawlist(
+        "PRIVMSG #channel :Test: I've published a list of my commands at: "
+        "https://example.com/sopel/help.html",
+    )
+    assert output_dir.join('help.html').check()
+    assert "Generate help for Sopel&#x27;s commands." in output_dir.join(
+        'help-help.html').read()
@@ -0,0 +1,81 @@
+import pytest
+
+from sopel_help import stats
+
+
+def test_decayed_counter():
+    counter = stats.DecayedCounter(half_life=10)
+    counter.add('help', now=0)
+    counter.add('help', now=0)
+    counter.add('seen', now=0)
+
+    assert counter.get('help', now=0) == 2
+    assert counter.get('seen', now=0) == 1
+    assert counter.get('unknown', now=0) == 0
+    assert counter.get('help', now=10) == pytest.approx(1)
+    assert counter.get('help', now=20) == pytest.approx(0.5)
+
+
+def test_decayed_counter_recent_events():
+    counter = stats.DecayedCounter(half_life=10)
+    counter.add('old', now=0)
+    counter.add('old', now=0)
+    counter.add('new', now=30)
+
+    # 2 events 3 half-lives ago count less than 1 event now
+    assert counter.most_common(now=30) == [
+        ('new', pytest.approx(1)),
+        ('old', pytest.approx(0.25)),
+    ]
+
+
+def test_decayed_counter_rescale():
+    counter = stats.DecayedCounter(half_life=1)
+    counter.add('help', now=0)
+    counter.add('help', now=1000)
+
+    assert counter.get('help', now=1000) == pytest.approx(1)
+    assert counter.get('help', now=1001) == pytest.approx(0.5)
+
+
+def test_decayed_counter_capacity():
+    counter = stats.DecayedCounter(capacity=2)
+    counter.add('help', now=0)
+    counter.add('help', now=0)
+    counter.add('seen', now=0)
+    counter.add('typo', now=0)
+
+    assert len(counter) == 2
+    assert counter.get('help', now=0) == 2
+    assert counter.get('seen', now=0) == 0, 'The lowest count is evicted'
+    assert counter.get('typo', now=0) == 1
+
+
+def test_decayed_counter_most_common():
+    counter = stats.DecayedCounter()
+    for key in ('help', 'seen', 'help', 'tell', 'seen', 'help'):
+        counter.add(key, now=0)
+
+    assert counter.most_common(now=0) == [
+        ('help', 3), ('seen', 2), ('tell', 1)]
+    assert counter.most_common(2, now=0) == [('help', 3), ('seen', 2)]
+
+
+def test_help_stats():
+    help_stats = stats.HelpStats()
+    help_stats.record_lookup('Help ', now=0)
+    help_stats.record_lookup('seen', now=0)
+    help_stats.record_lookup('help', now=0)
+    help_stats.record_miss('x' * 100, now=0)
+
+    assert help_stats.get_top_commands(1, now=0) == ['help']
+    assert help_stats.get_top_commands(5, now=0) == ['help', 'seen']
+    assert help_stats.get_top_commands(0, now=0) == []
+    assert help_stats.misses.most_common(now=0) == [
+        ('x' * stats.HelpStats.MAX_NAME_LENGTH, 1)]
+
+
+def test_format_counts():
+    assert stats.format_counts([]) == 'none'
+    assert stats.format_counts([('help', 3), ('seen', 1.25)]) == (
+        'help (3.0), seen (1.2)')
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from sopel_help import templates
+
+
+def test_html_template():
+    template = templates.HTMLTemplate('<p>{content}</p>{content}')
+
+    assert template.head == '<p>'
+    assert template.tail == '</p>{content}'
+    assert template.render(['a', 'b']) == '<p>a\nb</p>{content}'
+    assert list(template.stream(['a'])) == ['<p>', 'a', '</p>{content}']
+
+
+def test_html_template_no_placeholder():
+    with pytest.raises(ValueError):
+        templates.HTMLTemplate('<p>{title}</p>')
+
+
+def test_default_template():
+    result = templates.DEFAULT_TEMPLATE.render(['<div>line</div>'])
+
+    assert result.startswith('<!DOCTYPE html>')
+    assert '<div>line</div>' in result
+
+
+def test_template_file_reload(tmpdir):
+    filename = tmpdir.join('template.html')
+    filename.write('<p>{content}</p>')
+    template_file = templates.TemplateFile(str(filename))
+
+    first = template_file.get_template()
+    assert first.render(['a']) == '<p>a</p>'
+    # not compiled again when the file doesn't change
+    assert template_file.get_template() is first
+
+    filename.write('<div>{content}</div>')
+    stat = os.stat(str(filename))
+    os.utime(str(filename), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    second = template_file.get_template()
+    assert second is not first
+    assert second.render(['a']) == '<div>a</div>'
+
+
+def test_template_file_keep_last(tmpdir):
+    filename = tmpdir.join('template.html')
+    filename.write('<p>{content}</p>')
+    template_file = templates.TemplateFile(str(filename))
+    first = template_file.get_template()
+
+    filename.remove()
+
+    assert template_file.get_template() is first
+
+
+def test_template_file_missing(tmpdir):
+    template_file = templates.TemplateFile(str(tmpdir.join('missing.html')))
+
+    with pytest.raises(OSError):
+        template_file.get_template()
@@ -0,0 +1,74 @@
+import textwrap
+
+import pytest
+
+from sopel_help import wrapping
+
+
+COMMANDS = tuple('command_%02d' % index for index in range(20))
+
+
+@pytest.mark.parametrize('width', [20, 35, 70, 200])
+def test_wrap_tokens_textwrap(width):
+    prefix = 'GROUP     '
+    indent = ' ' * len(prefix)
+    expected = textwrap.wrap(
+        prefix + '  '.join(COMMANDS), width=width, subsequent_indent=indent)
+
+    assert wrapping.wrap_tokens(
+        COMMANDS, width, prefix=prefix, indent=indent) == expected
+
+
+def test_wrap_tokens_lengths():
+    lengths = wrapping.measure_tokens(COMMANDS)
+    result = wrapping.wrap_tokens(COMMANDS, 35, lengths=lengths)
+
+    assert result == wrapping.wrap_tokens(COMMANDS, 35)
+    assert result[0] == 'command_00  command_01  command_02'
+    assert len(result) == 7
+
+
+def test_wrap_tokens_empty():
+    assert wrapping.wrap_tokens((), 70) == []
+    assert wrapping.wrap_tokens((), 70, prefix='GROUP  ') == ['GROUP']
+
+
+def test_wrap_tokens_long_token():
+    tokens = ('a', 'b' * 12, 'c')
+
+    assert wrapping.wrap_tokens(tokens, 10, indent='  ') == [
+        'a',
+        '  ' + 'b' * 12,
+        '  c',
+    ]
+
+
+def test_wrap_tokens_prefix_too_long():
+    assert wrapping.wrap_tokens(
+        ('command',), 10, prefix='GROUP  ', indent='  ',
+    ) == ['GROUP', '  command']
+
+
+def test_wrap_tokens_bytes():
+    tokens = ('café', 'thé', 'eau')
+
+    assert wrapping.wrap_tokens(tokens, 10) == ['café  thé', 'eau']
+    assert wrapping.wrap_tokens(tokens, 10, unit=wrapping.BYTES) == [
+        'café',
+        'thé  eau',
+    ]
+
+
+def test_wrap_tokens_width():
+    tokens = ('日本', 'abc', 'ét́é')
+
+    assert wrapping.measure_tokens(tokens, wrapping.WIDTH) == (4, 3, 3)
+    assert wrapping.wrap_tokens(tokens, 8, unit=wrapping.WIDTH) == [
+        '日本',
+        'abc  ét́é',
+    ]
+
+
+def test_wrap_tokens_unknown_unit():
+    with pytest.raises(ValueError):
+        wrapping.wrap_tokens(COMMANDS, 70, unit='unknown')